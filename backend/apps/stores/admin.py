@@ -12,6 +12,8 @@ from django.db.models import Count, Avg
 from django.contrib.admin import SimpleListFilter
 
 from backend.apps.stores.models import District, Store, Item, Inventory, Review
+from backend.apps.stores.utils.district_index import district_index
+from backend.apps.stores.utils.response_cache import bump_cache_versions
 
 
 class DistrictTypeFilter(SimpleListFilter):
@@ -94,30 +96,29 @@ class DistrictAdmin(OSMGeoAdmin):
     
     def store_count(self, obj):
         """Display the number of stores in this district."""
-        count = obj.get_store_count()
+        count = obj.total_store_count
         if count > 0:
             url = reverse('admin:stores_store_changelist') + f'?district_obj__id__exact={obj.id}'
             return format_html('<a href="{}">{} stores</a>', url, count)
         return '0 stores'
     store_count.short_description = 'Stores'
-    
-    def get_queryset(self, request):
-        """Annotate queryset with store count."""
-        return super().get_queryset(request).annotate(
-            store_count=Count('stores')
-        ).select_related()
+    store_count.admin_order_field = 'total_store_count'
     
     actions = ['activate_districts', 'deactivate_districts']
     
     def activate_districts(self, request, queryset):
         """Activate selected districts."""
         updated = queryset.update(is_active=True)
+        district_index.invalidate()
+        bump_cache_versions(District)
         self.message_user(request, f'{updated} districts were successfully activated.')
     activate_districts.short_description = "Activate selected districts"
     
     def deactivate_districts(self, request, queryset):
         """Deactivate selected districts."""
         updated = queryset.update(is_active=False)
+        district_index.invalidate()
+        bump_cache_versions(District)
         self.message_user(request, f'{updated} districts were successfully deactivated.')
     deactivate_districts.short_description = "Deactivate selected districts"
 
@@ -159,30 +160,31 @@ class StoreAdmin(OSMGeoAdmin):
     
     def inventory_count(self, obj):
         """Display the number of inventory items."""
-        count = obj.inventories.count()
+        count = obj.inventory_count
         if count > 0:
             url = reverse('admin:stores_inventory_changelist') + f'?store__id__exact={obj.id}'
             return format_html('<a href="{}">{} items</a>', url, count)
         return '0 items'
     inventory_count.short_description = 'Inventory Items'
+    inventory_count.admin_order_field = 'inventory_count'
     
     def get_queryset(self, request):
-        """Annotate queryset with inventory count."""
-        return super().get_queryset(request).annotate(
-            inventory_count=Count('inventories')
-        ).select_related('district_obj')
+        """Select the district; inventory counts are stored on the row."""
+        return super().get_queryset(request).select_related('district_obj')
     
     actions = ['activate_stores', 'deactivate_stores', 'set_location_from_coordinates']
     
     def activate_stores(self, request, queryset):
         """Activate selected stores."""
         updated = queryset.update(is_active=True)
+        bump_cache_versions(Store)
         self.message_user(request, f'{updated} stores were successfully activated.')
     activate_stores.short_description = "Activate selected stores"
     
     def deactivate_stores(self, request, queryset):
         """Deactivate selected stores."""
         updated = queryset.update(is_active=False)
+        bump_cache_versions(Store)
         self.message_user(request, f'{updated} stores were successfully deactivated.')
     deactivate_stores.short_description = "Deactivate selected stores"
     
@@ -257,12 +259,14 @@ class ItemAdmin(admin.ModelAdmin):
     def activate_items(self, request, queryset):
         """Activate selected items."""
         updated = queryset.update(is_active=True)
+        bump_cache_versions(Item)
         self.message_user(request, f'{updated} items were successfully activated.')
     activate_items.short_description = "Activate selected items"
     
     def deactivate_items(self, request, queryset):
         """Deactivate selected items."""
         updated = queryset.update(is_active=False)
+        bump_cache_versions(Item)
         self.message_user(request, f'{updated} items were successfully deactivated.')
     deactivate_items.short_description = "Deactivate selected items"
 
@@ -306,12 +310,14 @@ class InventoryAdmin(admin.ModelAdmin):
     def mark_available(self, request, queryset):
         """Mark selected items as available."""
         updated = queryset.update(is_available=True)
+        bump_cache_versions(Inventory, Store)
         self.message_user(request, f'{updated} items were marked as available.')
     mark_available.short_description = "Mark items as available"
     
     def mark_unavailable(self, request, queryset):
         """Mark selected items as unavailable."""
         updated = queryset.update(is_available=False)
+        bump_cache_versions(Inventory, Store)
         self.message_user(request, f'{updated} items were marked as unavailable.')
     mark_unavailable.short_description = "Mark items as unavailable"
 
@@ -355,12 +361,14 @@ class ReviewAdmin(admin.ModelAdmin):
     def approve_reviews(self, request, queryset):
         """Approve selected reviews."""
         updated = queryset.update(is_approved=True)
+        bump_cache_versions(Review, Store)
         self.message_user(request, f'{updated} reviews were successfully approved.')
     approve_reviews.short_description = "Approve selected reviews"
     
     def disapprove_reviews(self, request, queryset):
         """Disapprove selected reviews."""
         updated = queryset.update(is_approved=False)
+        bump_cache_versions(Review, Store)
         self.message_user(request, f'{updated} reviews were successfully disapproved.')
     disapprove_reviews.short_description = "Disapprove selected reviews"
 
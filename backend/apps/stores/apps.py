@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class StoresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField' 
     name = 'backend.apps.stores'
-    verbose_name = 'Convenience Stores' 
\ No newline at end of file
+    verbose_name = 'Convenience Stores'
+
+    def ready(self):
+        from . import signals  # noqa: F401  Connect signal handlers
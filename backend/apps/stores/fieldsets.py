@@ -0,0 +1,245 @@
+"""
+Sparse fieldsets for the stores API.
+
+List and detail endpoints accept:
+
+* ``fields=id,name,rating``: only return these fields
+* ``exclude=location,location_geojson``: return everything except these
+* ``expand=district_obj``: include nested related objects
+
+Nested related objects (a serializer's ``Meta.expandable_fields``) are returned
+as before when none of these parameters is given. Once a client asks for
+``fields`` or ``expand``, they are only returned when named.
+
+The queryset is trimmed to match: ``only()`` loads the columns behind the
+returned fields, and joins/prefetches are kept only for relations those fields
+read, so a skipped field also skips the work of computing it.
+
+With ``sideload=true``, related objects (a serializer's ``Meta.sideload_fields``)
+are not nested: rows carry their ids and each related object is serialized
+once, in a top-level ``included`` map keyed by type and id, e.g.
+``{"results": [{"id": 1, "district_obj": 3}], "included": {"districts": {"3": {...}}}}``.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+def _parse_names(value):
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldset:
+    """The fields, exclusions and expansions requested by a client."""
+
+    def __init__(self, fields=None, exclude=None, expand=None):
+        self.fields = fields
+        self.exclude = exclude or set()
+        self.expand = expand
+
+    @classmethod
+    def from_query_params(cls, query_params):
+        """Return a SparseFieldset, or None if the request did not ask for one."""
+        fields = _parse_names(query_params.get('fields'))
+        exclude = _parse_names(query_params.get('exclude'))
+        expand = _parse_names(query_params.get('expand'))
+        if fields is None and exclude is None and expand is None:
+            return None
+        return cls(fields, exclude, expand)
+
+    def includes(self, name, expandable=False):
+        """Return True if the field ``name`` should be serialized."""
+        if name in self.exclude:
+            return False
+        if expandable:
+            if self.expand is not None and name in self.expand:
+                return True
+            if self.fields is not None:
+                return name in self.fields
+            return self.expand is None
+        return self.fields is None or name in self.fields
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Drops the fields a request did not ask for.
+
+    Only applies to top-level serializers given a ``sparse_fieldset`` in their
+    context; nested serializers always render in full.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fieldset = self.context.get('sparse_fieldset')
+        if fieldset is not None:
+            expandable = getattr(self.Meta, 'expandable_fields', ())
+            for name in list(self.fields):
+                if not fieldset.includes(name, expandable=name in expandable):
+                    self.fields.pop(name)
+
+        if self.context.get('sideload'):
+            # Related objects become ids; the view emits them under "included"
+            for name in getattr(self.Meta, 'sideload_fields', {}):
+                if name in self.fields or fieldset is None or fieldset.includes(name, expandable=True):
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class SparseFieldsetViewMixin:
+    """
+    Adds ``fields``/``exclude``/``expand`` support to a viewset.
+
+    Serializers declare which model paths each output field reads in
+    ``Meta.field_sources`` (e.g. ``{'latitude': ('location',),
+    'district_name': ('district_obj__name',)}``); fields not listed there read
+    the model field of the same name, if any.
+    """
+    sparse_fieldset_actions = ('list', 'retrieve')
+
+    def get_sparse_fieldset(self):
+        """The requested SparseFieldset for this request, or None."""
+        if not hasattr(self, '_sparse_fieldset'):
+            self._sparse_fieldset = None
+            request = getattr(self, 'request', None)
+            if request is not None and request.method == 'GET' and self.action in self.sparse_fieldset_actions:
+                self._sparse_fieldset = SparseFieldset.from_query_params(request.query_params)
+        return self._sparse_fieldset
+
+    def is_sideloading(self):
+        """True if the client asked for related objects in a top-level ``included`` map."""
+        request = getattr(self, 'request', None)
+        return (
+            request is not None
+            and self.action in self.sparse_fieldset_actions
+            and request.query_params.get('sideload', '').lower() in ('true', '1')
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sparse_fieldset'] = self.get_sparse_fieldset()
+        context['sideload'] = self.is_sideloading()
+        return context
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_sideloading():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objects = list(page if page is not None else queryset)
+        serializer = self.get_serializer(objects, many=True)
+        if page is not None:
+            response = self.get_paginated_response(serializer.data)
+        else:
+            response = Response({'results': serializer.data})
+        response.data['included'] = self.build_included(serializer.child, objects)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.is_sideloading():
+            return super().retrieve(request, *args, **kwargs)
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        data = dict(serializer.data)
+        data['included'] = self.build_included(serializer, [instance])
+        return Response(data)
+
+    def build_included(self, serializer, objects):
+        """
+        Serialize the related objects referenced by ``objects``, once each.
+
+        Related objects are themselves serialized in sideload mode, so their own
+        relations (e.g. the district of an included store) are collected too.
+        """
+        context = {**self.get_serializer_context(), 'sparse_fieldset': None}
+        included = {}
+        pending = [(serializer, objects)]
+        while pending:
+            serializer, objects = pending.pop()
+            sideload_fields = getattr(serializer.Meta, 'sideload_fields', {})
+            for name, (key, related_serializer_class) in sideload_fields.items():
+                if name not in serializer.fields:
+                    continue
+                bucket = included.setdefault(key, {})
+                related = {}
+                for obj in objects:
+                    value = getattr(obj, name, None)
+                    if value is not None and str(value.pk) not in bucket:
+                        related[str(value.pk)] = value
+                if not related:
+                    continue
+                related_serializer = related_serializer_class(list(related.values()), many=True, context=context)
+                for pk, data in zip(related, related_serializer.data):
+                    bucket[pk] = data
+                pending.append((related_serializer.child, list(related.values())))
+        return included
+
+    def get_field_sources(self, serializer_class):
+        """Model paths read by each output field of ``serializer_class``."""
+        return dict(getattr(serializer_class.Meta, 'field_sources', {}))
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fieldset = self.get_sparse_fieldset()
+        if fieldset is None:
+            return queryset
+        return self.restrict_queryset(queryset, fieldset)
+
+    def restrict_queryset(self, queryset, fieldset):
+        """Load only the columns and relations read by the requested fields."""
+        serializer_class = self.get_serializer_class()
+        serializer = serializer_class(context=self.get_serializer_context())
+        field_sources = self.get_field_sources(serializer_class)
+        model = queryset.model
+
+        paths = {model._meta.pk.name}
+        paths.update(name.lstrip('-') for name in getattr(self, 'keyset_ordering', ()) or ())
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in field_sources:
+                paths.update(field_sources[name])
+            else:
+                paths.add(name)
+
+        columns, joins, prefetches = set(), set(), set()
+        for path in paths:
+            self._resolve_path(model, path, columns, joins, prefetches)
+        # A related object rendered in full loads all its columns
+        whole = {column for column in columns if column in joins}
+        columns = {
+            column for column in columns
+            if not any(column.startswith(f'{relation}__') for relation in whole)
+        }
+
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if joins:
+            queryset = queryset.select_related(*sorted(joins))
+        if prefetches:
+            queryset = queryset.prefetch_related(*sorted(prefetches))
+        return queryset.only(*sorted(columns))
+
+    def _resolve_path(self, model, path, columns, joins, prefetches):
+        """Sort a model path into loaded columns, select_related joins and prefetches."""
+        parts = path.split('__')
+        current = model
+        for depth, part in enumerate(parts):
+            try:
+                field = current._meta.get_field(part)
+            except FieldDoesNotExist:
+                return  # Annotation or computed value with no column behind it
+            prefix = '__'.join(parts[:depth + 1])
+            if field.many_to_many or field.one_to_many:
+                prefetches.add(prefix)
+                return
+            if field.is_relation:
+                if depth == len(parts) - 1:
+                    # The whole related object is rendered
+                    columns.add(prefix)
+                    joins.add(prefix)
+                    return
+                joins.add(prefix)
+                current = field.related_model
+                continue
+            columns.add(prefix)
+            return
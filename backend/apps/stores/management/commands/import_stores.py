@@ -0,0 +1,58 @@
+"""
+Django management command to bulk import stores from a CSV, NDJSON or GeoJSON file.
+
+Stores are matched to existing ones by name; matched stores are updated and
+the rest are created. Districts are assigned from the store coordinates.
+
+Usage: python manage.py import_stores PATH [--format csv|ndjson|geojson]
+"""
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.apps.stores.utils.store_import import IMPORT_FORMATS, import_stores
+
+EXTENSION_FORMATS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.geojson': 'geojson',
+    '.json': 'geojson',
+}
+
+
+class Command(BaseCommand):
+    help = 'Bulk import stores from a CSV, NDJSON or GeoJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument(
+            '--format',
+            choices=IMPORT_FORMATS,
+            help='Input format (default: from the file extension)',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format'] or EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower())
+        if input_format is None:
+            raise CommandError(f'Cannot tell the format of {path}; pass --format')
+
+        try:
+            with open(path, encoding='utf-8', newline='') as lines:
+                result = import_stores(lines, input_format)
+        except FileNotFoundError:
+            raise CommandError(f'File not found: {path}')
+        except UnicodeDecodeError:
+            raise CommandError(f'{path} is not UTF-8 encoded')
+
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f"Line {error['line']}: {error['error']}"))
+        self.stdout.write(
+            f"Read {result['received']} stores: {result['invalid']} invalid, "
+            f"{result['duplicates']} duplicate names, {result['nearest_district']} outside every district"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} stores and updated {result['updated']}"
+        ))
@@ -0,0 +1,67 @@
+"""
+Django management command to apply queued inventory availability events.
+
+Run one worker per buffer. Events are acknowledged only after they are
+written: a flush that fails is retried, and a worker that stops mid-flush
+replays them when restarted under the same --consumer name.
+
+Usage: python manage.py ingest_inventory_events [--window SECONDS] [--batch-size N] [--consumer NAME]
+"""
+
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.apps.stores.utils.inventory_events import InventoryEventWorker, get_event_buffer
+
+# Seconds to wait before retrying a failed flush
+RETRY_DELAY = 5
+
+
+class Command(BaseCommand):
+    help = 'Coalesce queued inventory events per store and item and apply them in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window',
+            type=float,
+            help='Seconds of events to coalesce per flush (default: INVENTORY_EVENTS["WINDOW"])',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Rows written per INSERT statement (default: INVENTORY_EVENTS["BATCH_SIZE"])',
+        )
+        parser.add_argument(
+            '--consumer',
+            default=socket.gethostname(),
+            help='Stream consumer name; keep it stable across restarts (default: host name)',
+        )
+
+    def handle(self, *args, **options):
+        worker = InventoryEventWorker(
+            get_event_buffer(consumer=options['consumer']),
+            window=options['window'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(f'Applying inventory events every {worker.window}s; press Ctrl+C to stop')
+        try:
+            while True:
+                try:
+                    flush = worker.run_once()
+                except Exception as e:
+                    self.stderr.write(f'Flush failed, retrying: {e}')
+                    time.sleep(RETRY_DELAY)
+                    continue
+                if flush:
+                    self.stdout.write(
+                        f"{flush['events']} events -> {flush['coalesced_rows']} rows "
+                        f"({flush['rows_written']} written, {flush['rejected']} rejected), "
+                        f"max lag {flush['max_lag_seconds']}s, {flush['events_per_second']} events/s"
+                    )
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS(
+                f"Stopped after {worker.metrics['events_total']} events "
+                f"({worker.metrics['rows_written_total']} rows written)"
+            ))
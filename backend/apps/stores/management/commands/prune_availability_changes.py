@@ -0,0 +1,37 @@
+"""
+Django management command to prune the inventory availability change feed.
+
+Schedule it periodically (e.g. hourly from cron) so the feed the availability
+bitmaps replay from does not grow without bound.
+
+Usage: python manage.py prune_availability_changes [--retention SECONDS]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.apps.stores.utils.availability_index import (
+    FEED_RETENTION,
+    REBUILD_INTERVAL,
+    prune_availability_changes,
+)
+
+
+class Command(BaseCommand):
+    help = 'Delete inventory availability change feed entries older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention',
+            type=int,
+            default=FEED_RETENTION,
+            help=f'Seconds of changes to keep (default: {FEED_RETENTION})',
+        )
+
+    def handle(self, *args, **options):
+        retention = options['retention']
+        # Workers replay the feed between rebuilds, so it must cover at least one rebuild interval
+        if retention < REBUILD_INTERVAL:
+            raise CommandError(f'--retention must be at least {REBUILD_INTERVAL} seconds')
+
+        deleted = prune_availability_changes(retention)
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} availability changes'))
@@ -0,0 +1,36 @@
+"""
+Django management command to rebuild the analytics dashboard counters.
+
+Usage: python manage.py rebuild_analytics_counters [--verify-only]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.apps.stores.utils.analytics_counters import (
+    rebuild_analytics_counters,
+    verify_analytics_counters,
+)
+
+
+class Command(BaseCommand):
+    help = 'Recount the analytics counters from the live tables and verify them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify-only',
+            action='store_true',
+            help='Only compare the counters with the live tables; do not rebuild',
+        )
+
+    def handle(self, *args, **options):
+        if not options['verify_only']:
+            self.stdout.write('Rebuilding analytics counters...')
+            written = rebuild_analytics_counters()
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} counters'))
+
+        mismatches = verify_analytics_counters()
+        for scope, key, stored, expected in mismatches:
+            self.stdout.write(self.style.WARNING(f'{scope}:{key} is {stored}, expected {expected}'))
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} analytics counters do not match the live tables')
+        self.stdout.write(self.style.SUCCESS('Analytics counters match the live tables'))
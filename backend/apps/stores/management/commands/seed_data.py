@@ -1,34 +1,37 @@
 """
 Django management command to seed the database with Ho Chi Minh City data.
-Main coordinator command that runs individual seed parts.
+Main coordinator command that runs the seed pipeline (see seed_pipeline.py).
 
-Usage: 
+Usage:
   python manage.py seed_data                    # Run all parts
   python manage.py seed_data --part 1           # Run only districts
   python manage.py seed_data --part 2           # Run only stores
-  python manage.py seed_data --part 3           # Run only products  
+  python manage.py seed_data --part 3           # Run only products
   python manage.py seed_data --part 4           # Run only inventory
+  python manage.py seed_data --part 5           # Run only reviews
+  python manage.py seed_data --scale 400 --seed 7   # ~1M inventory rows, reproducible
 """
 
-from django.core.management.base import BaseCommand
-from django.core.management import call_command
-from backend.apps.stores.models import District, Store, Item, Inventory
+from django.core.management.base import BaseCommand, CommandError
+from backend.apps.stores.models import District, Store, Item, Inventory, Review
+
+from .seed_pipeline import BATCH_SIZE, STAGES, SeedPipeline
 
 
 class Command(BaseCommand):
-    help = 'Seed the database with Ho Chi Minh City districts, stores, and inventory data'
+    help = 'Seed the database with Ho Chi Minh City districts, stores, products, inventory and reviews'
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--clear',
             action='store_true',
-            help='Clear existing data before seeding',
+            help='Clear existing data of the seeded parts (and the data that depends on it) first',
         )
         parser.add_argument(
             '--part',
             type=int,
-            choices=[1, 2, 3, 4],
-            help='Run specific part: 1=districts, 2=stores, 3=products, 4=inventory',
+            choices=[1, 2, 3, 4, 5],
+            help='Run specific part: 1=districts, 2=stores, 3=products, 4=inventory, 5=reviews',
         )
         parser.add_argument(
             '--districts-only',
@@ -41,88 +44,56 @@ class Command(BaseCommand):
             default='stores.json',
             help='JSON file containing store data (default: stores.json)',
         )
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Dataset size as a multiple of stores.json and the product catalog (default: 1)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed; the same seed and scale produce the same data (default: 42)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help=f'Rows per bulk insert (default: {BATCH_SIZE})',
+        )
 
     def handle(self, *args, **options):
         # Handle legacy --districts-only flag
         if options['districts_only']:
             options['part'] = 1
-        
-        # Determine which parts to run
+        if options['scale'] <= 0:
+            raise CommandError('--scale must be positive')
+
         part = options.get('part')
-        stores_file = options.get('stores_file', 'stores.json')
-        clear = options.get('clear', False)
-        
-        if clear:
+        stages = (STAGES[part - 1],) if part else STAGES
+        pipeline = SeedPipeline(
+            scale=options['scale'],
+            seed=options['seed'],
+            stdout=self.stdout,
+            stores_file=options['stores_file'],
+            batch_size=options['batch_size'],
+        )
+
+        if options['clear']:
             self.stdout.write('🗑️  Clearing existing data...')
-            if part is None or part >= 4:
-                Inventory.objects.all().delete()
-                self.stdout.write('   Cleared inventory data')
-            if part is None or part >= 3:
-                Item.objects.all().delete()
-                self.stdout.write('   Cleared item data')
-            if part is None or part >= 2:
-                Store.objects.all().delete()
-                self.stdout.write('   Cleared store data')
-            if part is None or part >= 1:
-                District.objects.all().delete()
-                self.stdout.write('   Cleared district data')
+            pipeline.clear(stages)
             self.stdout.write(self.style.SUCCESS('✅ Existing data cleared'))
 
-        if part == 1:
-            self.stdout.write('🏛️  PART 1: Seeding districts...')
-            call_command('seed_districts', '--clear' if clear else '')
-            districts_count = District.objects.count()
-            self.stdout.write(self.style.SUCCESS(f'✅ Part 1 complete: {districts_count} districts'))
-            
-        elif part == 2:
-            self.stdout.write('🏪 PART 2: Seeding stores...')
-            call_command('seed_stores', f'--stores-file={stores_file}', '--clear' if clear else '')
-            stores_count = Store.objects.count()
-            self.stdout.write(self.style.SUCCESS(f'✅ Part 2 complete: {stores_count} stores'))
-            
-        elif part == 3:
-            self.stdout.write('📦 PART 3: Seeding product catalog...')
-            call_command('seed_products', '--clear' if clear else '')
-            items_count = Item.objects.count()
-            self.stdout.write(self.style.SUCCESS(f'✅ Part 3 complete: {items_count} products'))
-            
-        elif part == 4:
-            self.stdout.write('📋 PART 4: Seeding inventory...')
-            call_command('seed_inventory', '--clear' if clear else '')
-            inventory_count = Inventory.objects.count()
-            self.stdout.write(self.style.SUCCESS(f'✅ Part 4 complete: {inventory_count} inventory entries'))
-            
-        else:
-            # Run all parts
-            self.stdout.write('🚀 Seeding all Ho Chi Minh City data...')
-            
-            # Part 1: Districts
-            self.stdout.write('🏛️  PART 1: Creating districts...')
-            call_command('seed_districts')
-            districts_count = District.objects.count()
-            self.stdout.write(f'✅ Created {districts_count} districts')
-            
-            # Part 2: Stores 
-            self.stdout.write('🏪 PART 2: Creating stores...')
-            call_command('seed_stores', f'--stores-file={stores_file}')
-            stores_count = Store.objects.count()
-            self.stdout.write(f'✅ Created {stores_count} stores')
-            
-            # Part 3: Product catalog
-            self.stdout.write('📦 PART 3: Creating product catalog...')
-            call_command('seed_products')
-            items_count = Item.objects.count()
-            self.stdout.write(f'✅ Created {items_count} products')
-            
-            # Part 4: Inventory
-            self.stdout.write('📋 PART 4: Creating inventory...')
-            call_command('seed_inventory')
-            inventory_count = Inventory.objects.count()
-            self.stdout.write(f'✅ Created {inventory_count} inventory entries')
-            
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'🎉 Successfully seeded all data: {districts_count} districts, '
-                    f'{stores_count} stores, {items_count} products, {inventory_count} inventory entries'
-                )
-            ) 
\ No newline at end of file
+        self.stdout.write(
+            f"🚀 Seeding {', '.join(stages)} (scale {options['scale']:g}, seed {options['seed']})..."
+        )
+        pipeline.run(stages)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'🎉 Database now has {District.objects.count()} districts, {Store.objects.count()} stores, '
+                f'{Item.objects.count()} products, {Inventory.objects.count()} inventory entries '
+                f'and {Review.objects.count()} reviews'
+            )
+        )
@@ -0,0 +1,327 @@
+"""
+Deterministic, scalable seed pipeline: districts -> stores -> items -> inventory -> reviews.
+
+Every random choice comes from a NumPy generator seeded with ``--seed`` and
+the stage (or, per store, the store name), so the same seed and scale always
+produce the same content, and re-running one stage does not change the
+others. ``--scale`` multiplies the dataset: scale 1 is the stores in
+``stores.json`` with the predefined product catalog, and each extra unit adds
+as many synthetic stores and ``ITEMS_PER_SCALE`` synthetic products. With the
+default 15-35 items per store, ``--scale 400`` gives about 39,000 stores and
+1M inventory rows.
+
+Rows are written in bulk rather than one ``get_or_create`` at a time: stores
+through the COPY-based store import, items, inventory and reviews with
+batched ``bulk_create``. Re-running a stage adds what is missing and leaves
+existing rows alone (stores are refreshed by name).
+"""
+import json
+import time
+import zlib
+
+import numpy as np
+from django.core.management import call_command
+from django.db import connection
+
+from backend.apps.stores.models import District, Inventory, Item, Review, Store
+from backend.apps.stores.utils.availability_index import availability_index
+from backend.apps.stores.utils.district_index import district_index
+from backend.apps.stores.utils.response_cache import bump_cache_versions
+from backend.apps.stores.utils.statistics_cube import statistics_cube
+from backend.apps.stores.utils.store_import import import_stores
+from .seed_utils import PRODUCT_CATALOG, STREET_NAMES, get_stores_json_path
+
+STAGES = ('districts', 'stores', 'items', 'inventory', 'reviews')
+# Stages whose rows reference each stage's rows, and so are cleared with it
+STAGE_DEPENDENTS = {
+    'districts': (),
+    'stores': ('inventory', 'reviews'),
+    'items': ('inventory',),
+    'inventory': (),
+    'reviews': (),
+}
+CLEAR_ORDER = (
+    ('reviews', 'stores_review'),
+    ('inventory', 'stores_inventory'),
+    ('stores', 'stores_store'),
+    ('items', 'stores_item'),
+)
+BATCH_SIZE = 5000
+ITEMS_PER_SCALE = 10
+# Synthetic stores cluster around the stores.json locations
+STORE_JITTER_DEGREES = 0.01
+HCM_BOUNDS = (106.55, 10.65, 106.85, 10.90)
+
+STORE_BRANDS = [
+    (value, label) for value, label in Store._meta.get_field('store_type').choices if value != 'other'
+]
+# Larger formats stock more of the catalog
+STORE_TYPE_ITEM_MULTIPLIERS = {
+    'coopxtra': 1.8,
+    'bach-hoa-xanh': 1.5,
+    'winmart': 1.3,
+}
+# Convenience stores favor these categories when --category-bias is set
+CATEGORY_WEIGHTS = {
+    'beverages': 1.5,
+    'snacks': 1.4,
+    'personal_care': 1.2,
+    'household': 0.8,
+}
+CATEGORY_AVAILABILITY = {
+    'beverages': 0.9,
+    'snacks': 0.9,
+    'household': 1.1,
+}
+
+SYNTHETIC_BRANDS = [
+    'Generic', 'Premium', 'Value', 'Fresh', 'Quality', 'Daily', 'Essential',
+    'Eco', 'Natural', 'Organic', 'Quick', 'Easy', 'Pro', 'Max', 'Ultra'
+]
+SYNTHETIC_PRODUCT_TYPES = {
+    'beverages': ['Water', 'Juice', 'Soda', 'Tea', 'Coffee', 'Energy Drink', 'Milk'],
+    'snacks': ['Chips', 'Cookies', 'Candy', 'Crackers', 'Nuts', 'Chocolate', 'Gum'],
+    'household': ['Cleaner', 'Detergent', 'Soap', 'Paper', 'Sponge', 'Brush', 'Spray'],
+    'personal_care': ['Shampoo', 'Cream', 'Lotion', 'Deodorant', 'Toothpaste', 'Razor'],
+    'other': ['Batteries', 'Lighter', 'Pen', 'Bandage', 'Medicine', 'Charger']
+}
+
+REVIEWER_NAMES = ['Minh', 'Lan', 'Huy', 'Trang', 'Nam', 'Thao', 'Khoa', 'Linh', 'Duc', 'Mai', 'Tuan', 'Ngoc']
+REVIEW_COMMENTS = {
+    1: ['Often out of stock.', 'Staff were unhelpful.'],
+    2: ['Small selection.', 'Checkout was slow.'],
+    3: ['Okay for a quick stop.', 'Average store.'],
+    4: ['Clean and well stocked.', 'Convenient location.'],
+    5: ['Great service, open late.', 'Always has what I need.'],
+}
+REVIEW_RATING_WEIGHTS = [0.05, 0.07, 0.18, 0.35, 0.35]
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class SeedPipeline:
+    """Runs the seed stages with one scale factor and seed."""
+
+    def __init__(self, scale=1.0, seed=42, stdout=None, stores_file='stores.json', batch_size=BATCH_SIZE,
+                 min_items=15, max_items=35, availability_rate=0.75, store_type_bias=False,
+                 category_bias=False, max_reviews=6):
+        self.scale = scale
+        self.seed = seed
+        self.stdout = stdout
+        self.stores_file = stores_file
+        self.batch_size = batch_size
+        self.min_items = min_items
+        self.max_items = max_items
+        self.availability_rate = availability_rate
+        self.store_type_bias = store_type_bias
+        self.category_bias = category_bias
+        self.max_reviews = max_reviews
+
+    def _rng(self, stage, key=None):
+        """Generator for a stage, or for one store within a stage."""
+        entropy = [self.seed, STAGES.index(stage)]
+        if key is not None:
+            entropy.append(zlib.crc32(key.encode('utf-8')))
+        return np.random.default_rng(entropy)
+
+    def _write(self, message):
+        if self.stdout:
+            self.stdout.write(message)
+
+    def run(self, stages=STAGES):
+        """
+        Run ``stages`` in pipeline order.
+
+        Returns:
+            Dictionary of stage -> number of rows created (stores: created or updated)
+        """
+        counts = {}
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            started = time.monotonic()
+            counts[stage] = getattr(self, f'seed_{stage}')()
+            self._write(f'   {stage}: {counts[stage]} rows in {time.monotonic() - started:.1f}s')
+        self.invalidate_caches()
+        return counts
+
+    def clear(self, stages=STAGES):
+        """
+        Delete the data of ``stages`` and of the stages that reference it.
+
+        Tables are emptied with plain SQL so that large ones are not loaded
+        into memory; the counter triggers still run.
+        """
+        targets = set(stages)
+        for stage in stages:
+            targets.update(STAGE_DEPENDENTS[stage])
+        with connection.cursor() as cursor:
+            for stage, table in CLEAR_ORDER:
+                if stage in targets:
+                    cursor.execute(f'DELETE FROM {table}')
+        if 'districts' in targets:
+            District.objects.all().delete()  # type: ignore[attribute-defined]
+        self.invalidate_caches()
+
+    def invalidate_caches(self):
+        """Bulk writes skip model signals; expire everything derived from the seeded tables."""
+        bump_cache_versions(District, Store, Item, Inventory, Review)
+        statistics_cube.invalidate()
+        availability_index.invalidate()
+        district_index.invalidate()
+
+    def seed_districts(self):
+        """Districts come from the real GeoJSON boundaries and are not scaled."""
+        before = District.objects.count()  # type: ignore[attribute-defined]
+        call_command('seed_districts')
+        return District.objects.count() - before  # type: ignore[attribute-defined]
+
+    def store_records(self):
+        """
+        The stores.json stores plus synthetic ones, ``len(stores.json) * scale``
+        in total. Contact details, hours and ratings missing from the file are
+        generated.
+        """
+        try:
+            with open(get_stores_json_path(self.stores_file), encoding='utf-8') as f:
+                base = json.load(f)
+        except FileNotFoundError:
+            self._write(f'   {self.stores_file} not found; generating every store')
+            base = []
+        target = max(1, round((len(base) or 100) * self.scale))
+        records = [dict(record) for record in base[:target]]
+        count = target - len(records)
+
+        rng = self._rng('stores')
+        if base:
+            centers = np.array([
+                (float(store.get('longitude') or store.get('lng')), float(store.get('latitude') or store.get('lat')))
+                for store in base
+            ])
+            points = centers[rng.integers(0, len(centers), count)] + rng.normal(0, STORE_JITTER_DEGREES, (count, 2))
+        else:
+            west, south, east, north = HCM_BOUNDS
+            points = np.column_stack([rng.uniform(west, east, count), rng.uniform(south, north, count)])
+        brands = rng.integers(0, len(STORE_BRANDS), count)
+        for index in range(count):
+            store_type, label = STORE_BRANDS[brands[index]]
+            records.append({
+                'name': f'{label} #{index + 1:06d}',
+                'store_type': store_type,
+                'longitude': round(float(points[index, 0]), 6),
+                'latitude': round(float(points[index, 1]), 6),
+                'is_active': bool(rng.random() < 0.95),
+            })
+
+        streets = rng.integers(0, len(STREET_NAMES), target)
+        numbers = rng.integers(1, 500, target)
+        phones = rng.integers(1000000, 9999999, target)
+        opening = rng.integers(6, 9, target)
+        closing = rng.integers(21, 24, target)
+        ratings = rng.uniform(3.5, 5.0, target).round(1)
+        for index, record in enumerate(records):
+            record.setdefault('address', f'{numbers[index]} {STREET_NAMES[streets[index]]}, Ho Chi Minh City')
+            record.setdefault('phone', f'+84-28-{phones[index]}')
+            record.setdefault('email', f"store{index + 1}@{record['name'].split()[0].lower()}.com")
+            record.setdefault('opening_hours', f'{opening[index]}:00-{closing[index]}:00')
+            record.setdefault('rating', float(ratings[index]))
+        return records
+
+    def seed_stores(self):
+        """Create or refresh stores through the COPY-based store import."""
+        if not District.objects.exists():  # type: ignore[attribute-defined]
+            self._write('   No districts found; stores will have no district')
+        lines = (json.dumps(record) + '\n' for record in self.store_records())
+        result = import_stores(lines, 'ndjson')
+        for error in result['errors']:
+            self._write(f"   Skipped store {error['line']}: {error['error']}")
+        return result['created'] + result['updated']
+
+    def item_records(self):
+        """The predefined catalog plus ``ITEMS_PER_SCALE`` synthetic products per extra scale unit."""
+        records = list(PRODUCT_CATALOG)
+        count = max(0, round((self.scale - 1) * ITEMS_PER_SCALE))
+        rng = self._rng('items')
+        categories = list(SYNTHETIC_PRODUCT_TYPES)
+        for index in range(count):
+            category = categories[rng.integers(len(categories))]
+            product_type = SYNTHETIC_PRODUCT_TYPES[category][rng.integers(len(SYNTHETIC_PRODUCT_TYPES[category]))]
+            brand = SYNTHETIC_BRANDS[rng.integers(len(SYNTHETIC_BRANDS))]
+            records.append({
+                'name': f'{brand} {product_type} {index + 1:05d}',
+                'category': category,
+                'brand': brand,
+                'description': f'High quality {product_type.lower()} from {brand}',
+            })
+        return records
+
+    def seed_items(self):
+        """Create the product catalog; existing names are skipped."""
+        return self._bulk_create(Item, (Item(**record) for record in self.item_records()))
+
+    def seed_inventory(self):
+        """Stock each store with a random sample of the catalog."""
+        items = list(Item.objects.order_by('name').values_list('id', 'category'))  # type: ignore[attribute-defined]
+        stores = list(Store.objects.order_by('name').values_list('id', 'name', 'store_type'))  # type: ignore[attribute-defined]
+        if not items:
+            self._write('   No items found; skipping inventory')
+            return 0
+        item_ids = np.array([item_id for item_id, _ in items])
+        categories = [category for _, category in items]
+        weights = None
+        rates = np.full(len(items), self.availability_rate)
+        if self.category_bias:
+            weights = np.array([CATEGORY_WEIGHTS.get(category, 1.0) for category in categories])
+            weights /= weights.sum()
+            rates *= np.array([CATEGORY_AVAILABILITY.get(category, 1.0) for category in categories])
+
+        def rows():
+            for store_id, name, store_type in stores:
+                rng = self._rng('inventory', name)
+                count = rng.integers(self.min_items, self.max_items + 1)
+                if self.store_type_bias:
+                    count = int(count * STORE_TYPE_ITEM_MULTIPLIERS.get(store_type, 1.0))
+                chosen = rng.choice(len(items), size=min(count, len(items)), replace=False, p=weights)
+                available = rng.random(len(chosen)) < rates[chosen]
+                for position, is_available in zip(chosen, available):
+                    yield Inventory(store_id=store_id, item_id=int(item_ids[position]), is_available=bool(is_available))
+
+        return self._bulk_create(Inventory, rows())
+
+    def seed_reviews(self):
+        """Add guest reviews to stores that have none yet."""
+        stores = list(
+            Store.objects.filter(reviews__isnull=True).order_by('name').values_list('id', 'name')  # type: ignore[attribute-defined]
+        )
+
+        def rows():
+            for store_id, name in stores:
+                rng = self._rng('reviews', name)
+                for _ in range(rng.integers(0, self.max_reviews + 1)):
+                    rating = int(rng.choice(5, p=REVIEW_RATING_WEIGHTS)) + 1
+                    comments = REVIEW_COMMENTS[rating]
+                    yield Review(
+                        store_id=store_id,
+                        guest_name=REVIEWER_NAMES[rng.integers(len(REVIEWER_NAMES))],
+                        rating=rating,
+                        comment=comments[rng.integers(len(comments))],
+                        is_approved=bool(rng.random() < 0.95),
+                    )
+
+        return self._bulk_create(Review, rows())
+
+    def _bulk_create(self, model, objects):
+        """Insert ``objects`` in batches, skipping conflicts; returns the number of new rows."""
+        before = model.objects.count()
+        for batch in _batches(objects, self.batch_size):
+            model.objects.bulk_create(batch, batch_size=self.batch_size, ignore_conflicts=True)
+        return model.objects.count() - before
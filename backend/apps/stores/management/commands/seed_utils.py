@@ -2,55 +2,116 @@
 Shared utilities for seed data commands.
 """
 
-import random
 import os
-from django.contrib.gis.geos import Point
-from backend.apps.stores.models import District
-
-
-def detect_district_from_coordinates(longitude, latitude, stdout=None):
-    """Detect district from coordinates using spatial query (like frontend does)."""
-    try:
-        point = Point(longitude, latitude, srid=4326)
-        district = District.objects.filter(boundary__contains=point).first()
-        if district:
-            return district
-        else:
-            # Fallback: find nearest district
-            if stdout:
-                stdout.write(f'Point ({longitude}, {latitude}) not within any district boundary, using nearest')
-            nearest_district = District.objects.filter(boundary__isnull=False).extra(
-                select={'distance': 'ST_Distance(boundary, ST_GeomFromText(%s, 4326))'},
-                select_params=[point.wkt],
-                order_by=['distance']
-            ).first()
-            return nearest_district
-    except Exception as e:
-        if stdout:
-            stdout.write(f'Error detecting district for ({longitude}, {latitude}): {e}')
-        return District.objects.first()  # Fallback to first district
-
-
-def generate_address_from_coordinates(longitude, latitude, district_name):
-    """Generate a realistic address from coordinates and district name."""
-    # Ho Chi Minh City street names
-    street_names = [
-        'Nguyen Hue', 'Le Loi', 'Dong Khoi', 'Pasteur', 'Vo Van Tan', 'Truong Dinh',
-        'Nam Ky Khoi Nghia', 'Tran Hung Dao', 'Hai Ba Trung', 'Ly Tu Trong',
-        'Nguyen Du', 'Mac Dinh Chi', 'Vo Thi Sau', 'Cach Mang Thang Tam',
-        'Pham Ngu Lao', 'De Tham', 'Bui Vien', 'Nguyen Thai Hoc', 'Le Thanh Ton',
-        'Dinh Tien Hoang', 'Nguyen Dinh Chieu', 'Cong Quynh', 'An Duong Vuong',
-        'Lac Long Quan', 'Tran Phu', 'Phan Xich Long', 'Hoang Van Thu',
-        'Le Van Sy', 'Nguyen Tat Thanh', 'Vo Van Kiet', 'Tran Quoc Toan',
-        'Dien Bien Phu', 'Xo Viet Nghe Tinh', 'Nguyen Thi Minh Khai', 'Ba Huyen Thanh Quan'
-    ]
-    
-    # Generate address based on coordinates (use them to seed random for consistency)
-    random.seed(int((longitude + latitude) * 10000))
-    street_name = random.choice(street_names)
-    street_number = random.randint(1, 500)
-    
-    return f"{street_number} {street_name}, {district_name}, Ho Chi Minh City"
+
+
+# Ho Chi Minh City street names
+STREET_NAMES = [
+    'Nguyen Hue', 'Le Loi', 'Dong Khoi', 'Pasteur', 'Vo Van Tan', 'Truong Dinh',
+    'Nam Ky Khoi Nghia', 'Tran Hung Dao', 'Hai Ba Trung', 'Ly Tu Trong',
+    'Nguyen Du', 'Mac Dinh Chi', 'Vo Thi Sau', 'Cach Mang Thang Tam',
+    'Pham Ngu Lao', 'De Tham', 'Bui Vien', 'Nguyen Thai Hoc', 'Le Thanh Ton',
+    'Dinh Tien Hoang', 'Nguyen Dinh Chieu', 'Cong Quynh', 'An Duong Vuong',
+    'Lac Long Quan', 'Tran Phu', 'Phan Xich Long', 'Hoang Van Thu',
+    'Le Van Sy', 'Nguyen Tat Thanh', 'Vo Van Kiet', 'Tran Quoc Toan',
+    'Dien Bien Phu', 'Xo Viet Nghe Tinh', 'Nguyen Thi Minh Khai', 'Ba Huyen Thanh Quan'
+]
+
+# Realistic Vietnamese convenience store products
+PRODUCT_CATALOG = [
+    # Vietnamese Beverages - Most Popular
+    {'name': 'Trà Ô Long Tea+ 500ml', 'category': 'beverages', 'brand': 'Tea+', 'description': 'Oolong tea drink, very popular in Vietnam'},
+    {'name': 'Number 1 Energy Drink 330ml', 'category': 'beverages', 'brand': 'Number 1', 'description': 'Vietnamese energy drink'},
+    {'name': 'Sting Energy Drink 330ml', 'category': 'beverages', 'brand': 'Sting', 'description': 'Popular energy drink in Vietnam'},
+    {'name': 'Aquafina Water 500ml', 'category': 'beverages', 'brand': 'Aquafina', 'description': 'Purified drinking water'},
+    {'name': 'Coca-Cola 330ml', 'category': 'beverages', 'brand': 'Coca-Cola', 'description': 'Classic cola drink'},
+    {'name': 'Trà Xanh C2 455ml', 'category': 'beverages', 'brand': 'C2', 'description': 'Green tea with jasmine flavor'},
+    
+    # Vietnamese Snacks - Very Popular
+    {'name': 'Lays Potato Chips', 'category': 'snacks', 'brand': 'Lays', 'description': 'Classic potato chips, popular in Vietnam'},
+    {'name': 'Phồng Tôm Calbee', 'category': 'snacks', 'brand': 'Calbee', 'description': 'Shrimp crackers, Vietnamese favorite'},
+    {'name': 'Oishi Snack', 'category': 'snacks', 'brand': 'Oishi', 'description': 'Popular Vietnamese snack brand'},
+    {'name': 'Mì Hảo Hảo Tôm Chua Cay', 'category': 'snacks', 'brand': 'Acecook', 'description': 'Spicy sour shrimp instant noodles'},
+    {'name': 'Orion Choco Pie', 'category': 'snacks', 'brand': 'Orion', 'description': 'Soft cake with chocolate and marshmallow'},
+    {'name': 'Bánh Tráng Nướng', 'category': 'snacks', 'brand': 'Tân Hương', 'description': 'Grilled rice paper, Vietnamese street snack'},
+    
+    # Essential Personal Care
+    {'name': 'Kem Đánh Răng P/S', 'category': 'personal_care', 'brand': 'P/S', 'description': 'Popular Vietnamese toothpaste brand'},
+    {'name': 'Dầu Gội Clear Men', 'category': 'personal_care', 'brand': 'Clear', 'description': 'Anti-dandruff shampoo for men'},
+    {'name': 'Xà Phòng Lifebuoy', 'category': 'personal_care', 'brand': 'Lifebuoy', 'description': 'Antibacterial soap bar'},
+    {'name': 'Khăn Giấy Tempo', 'category': 'household', 'brand': 'Tempo', 'description': 'Facial tissue paper'},
+    
+    # Common Health/Medicine
+    {'name': 'Thuốc Đau Đầu Panadol', 'category': 'other', 'brand': 'Panadol', 'description': 'Headache relief medicine'},
+    {'name': 'Nước Súc Miệng Listerine', 'category': 'personal_care', 'brand': 'Listerine', 'description': 'Mouthwash for oral care'},
+    
+    # Convenience Items
+    {'name': 'Bao Cao Su Durex', 'category': 'personal_care', 'brand': 'Durex', 'description': 'Condoms, commonly sold in convenience stores'},
+    {'name': 'Bật Lửa Gas', 'category': 'other', 'brand': 'Generic', 'description': 'Gas lighter, essential item'},
+    
+    # More Vietnamese Beverages
+    {'name': 'Café Sữa Đá G7', 'category': 'beverages', 'brand': 'G7', 'description': 'Vietnamese iced coffee with condensed milk'},
+    {'name': 'Nước Cam Tipco 1L', 'category': 'beverages', 'brand': 'Tipco', 'description': 'Fresh orange juice'},
+    {'name': 'Nước Mía Vinamit', 'category': 'beverages', 'brand': 'Vinamit', 'description': 'Sugarcane juice drink'},
+    {'name': 'Trà Thanh Nhiệt Dr Thanh', 'category': 'beverages', 'brand': 'Dr Thanh', 'description': 'Herbal cooling tea'},
+    {'name': 'Yakult Probiotics', 'category': 'beverages', 'brand': 'Yakult', 'description': 'Probiotic drink for digestion'},
+    {'name': 'Nước Tăng Lực Warrior', 'category': 'beverages', 'brand': 'Warrior', 'description': 'Vietnamese energy drink'},
+    {'name': 'Trà Đá Lipton 300ml', 'category': 'beverages', 'brand': 'Lipton', 'description': 'Iced tea ready to drink'},
+    
+    # More Vietnamese Snacks & Food
+    {'name': 'Bánh Mì Sandwich Kinh Đô', 'category': 'food', 'brand': 'Kinh Đô', 'description': 'Vietnamese sandwich bread'},
+    {'name': 'Mì Gói Hảo Hảo', 'category': 'food', 'brand': 'Acecook', 'description': 'Instant noodles, Vietnam\'s favorite'},
+    {'name': 'Bánh Quy Cosy', 'category': 'snacks', 'brand': 'Cosy', 'description': 'Vietnamese biscuit brand'},
+    {'name': 'Snack Oshi Corn', 'category': 'snacks', 'brand': 'Oshi', 'description': 'Corn snack with different flavors'},
+    {'name': 'Mứt Tết Bibica', 'category': 'snacks', 'brand': 'Bibica', 'description': 'Vietnamese preserved fruit candy'},
+    {'name': 'Bánh Tráng Phơi Sương', 'category': 'snacks', 'brand': 'Tây Ninh', 'description': 'Rice paper specialty from Tay Ninh'},
+    {'name': 'Kẹo Dừa Bến Tre', 'category': 'snacks', 'brand': 'Bến Tre', 'description': 'Coconut candy from Ben Tre province'},
+    
+    # Ice Cream & Frozen
+    {'name': 'Kem Cây Merino', 'category': 'food', 'brand': 'Merino', 'description': 'Popular Vietnamese ice cream brand'},
+    {'name': 'Kem Tươi Wall\'s', 'category': 'food', 'brand': 'Wall\'s', 'description': 'International ice cream brand'},
+    
+    # Cigarettes (Very Common in Vietnamese Convenience Stores)
+    {'name': 'Thuốc Lá Craven A', 'category': 'tobacco', 'brand': 'Craven A', 'description': 'Popular cigarette brand in Vietnam'},
+    {'name': 'Thuốc Lá Marlboro', 'category': 'tobacco', 'brand': 'Marlboro', 'description': 'International cigarette brand'},
+    {'name': 'Thuốc Lá Vinataba', 'category': 'tobacco', 'brand': 'Vinataba', 'description': 'Vietnamese tobacco brand'},
+    
+    # More Personal Care
+    {'name': 'Sữa Tắm Romano', 'category': 'personal_care', 'brand': 'Romano', 'description': 'Popular men\'s body wash in Vietnam'},
+    {'name': 'Dầu Gội Sunsilk', 'category': 'personal_care', 'brand': 'Sunsilk', 'description': 'Popular women\'s shampoo brand'},
+    {'name': 'Kem Dưỡng Da Pond\'s', 'category': 'personal_care', 'brand': 'Pond\'s', 'description': 'Facial moisturizing cream'},
+    {'name': 'Lăn Khử Mùi Rexona', 'category': 'personal_care', 'brand': 'Rexona', 'description': 'Roll-on deodorant'},
+    {'name': 'Nước Rửa Tay Antibac', 'category': 'personal_care', 'brand': 'Antibac', 'description': 'Hand sanitizer, popular after COVID'},
+    
+    # Household Items
+    {'name': 'Nước Rửa Chén Sunlight', 'category': 'household', 'brand': 'Sunlight', 'description': 'Dishwashing liquid'},
+    {'name': 'Nước Giặt Omo', 'category': 'household', 'brand': 'Omo', 'description': 'Laundry detergent'},
+    {'name': 'Khăn Ướt Bobby', 'category': 'household', 'brand': 'Bobby', 'description': 'Wet wipes for cleaning'},
+    {'name': 'Túi Đựng Rác Saigon', 'category': 'household', 'brand': 'Saigon', 'description': 'Garbage bags'},
+    
+    # Stationery & Electronics
+    {'name': 'Bút Bi Thiên Long', 'category': 'stationery', 'brand': 'Thiên Long', 'description': 'Popular Vietnamese pen brand'},
+    {'name': 'Pin Panasonic AA', 'category': 'electronics', 'brand': 'Panasonic', 'description': 'AA batteries for devices'},
+    {'name': 'Cáp Sạc USB Type-C', 'category': 'electronics', 'brand': 'Generic', 'description': 'USB charging cable'},
+    {'name': 'Tai Nghe Bluetooth', 'category': 'electronics', 'brand': 'Generic', 'description': 'Wireless earphones'},
+    
+    # Medicines & Health
+    {'name': 'Thuốc Cảm Cúm Decolgen', 'category': 'medicine', 'brand': 'Decolgen', 'description': 'Cold and flu medicine'},
+    {'name': 'Dầu Nóng Thái Dương', 'category': 'medicine', 'brand': 'Thái Dương', 'description': 'Vietnamese medicated oil'},
+    {'name': 'Thuốc Đau Bụng Smecta', 'category': 'medicine', 'brand': 'Smecta', 'description': 'Stomach ache medicine'},
+    {'name': 'Vitamin C Redoxon', 'category': 'medicine', 'brand': 'Redoxon', 'description': 'Vitamin C supplement'},
+    
+    # Additional Food Items
+    {'name': 'Bánh Mì Hamburger', 'category': 'food', 'brand': 'Kinh Đô', 'description': 'Hamburger buns'},
+    {'name': 'Sữa Chua Vinamilk', 'category': 'food', 'brand': 'Vinamilk', 'description': 'Vietnamese yogurt'},
+    {'name': 'Bánh Kẹp Chocolate', 'category': 'food', 'brand': 'Orion', 'description': 'Chocolate wafer sandwich'},
+    {'name': 'Mì Ly Kokomi', 'category': 'food', 'brand': 'Kokomi', 'description': 'Cup noodles instant meal'},
+    
+    # Miscellaneous
+    {'name': 'Que Tăm Chỉ Dental Floss', 'category': 'personal_care', 'brand': 'Generic', 'description': 'Dental floss picks'},
+    {'name': 'Khẩu Trang Y Tế', 'category': 'personal_care', 'brand': 'Generic', 'description': 'Medical face masks'},
+    {'name': 'Bao Tay Nhựa', 'category': 'household', 'brand': 'Generic', 'description': 'Disposable plastic gloves'},
+]
 
 
 def get_geojson_path():
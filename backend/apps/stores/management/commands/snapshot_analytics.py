@@ -0,0 +1,36 @@
+"""
+Django management command to record the daily analytics snapshot.
+
+Schedule it once a day (e.g. from cron); running it again the same day
+replaces that day's snapshot.
+
+Usage: python manage.py snapshot_analytics [--date YYYY-MM-DD]
+"""
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from backend.apps.stores.utils.analytics_snapshots import take_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Record the analytics metrics for today (or --date) as a daily snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Day to record the snapshot under (YYYY-MM-DD); defaults to today',
+        )
+
+    def handle(self, *args, **options):
+        date = None
+        if options['date']:
+            try:
+                date = datetime.date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+
+        rows = take_snapshot(date)
+        self.stdout.write(self.style.SUCCESS(f'Recorded {rows} snapshot rows for {date or timezone.localdate()}'))
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-17 09:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations
+
+
+# Accent/case folding used by both the search document and the trigram indexes.
+# unaccent() is only STABLE, so it is wrapped in an IMMUTABLE function that pins
+# the dictionary; this makes it usable in index expressions.
+CREATE_FOLD_FUNCTION = """
+CREATE OR REPLACE FUNCTION stores_search_fold(text) RETURNS text
+AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1)) $$
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+"""
+
+DROP_FOLD_FUNCTION = "DROP FUNCTION IF EXISTS stores_search_fold(text);"
+
+# Keep stores_store.search_vector in sync on every write path, including
+# bulk_create(), queryset.update() and raw COPY imports that bypass signals.
+CREATE_SEARCH_TRIGGER = """
+CREATE OR REPLACE FUNCTION stores_store_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', stores_search_fold(coalesce(NEW.name, ''))), 'A') ||
+        setweight(to_tsvector('simple', stores_search_fold(coalesce(NEW.district, ''))), 'B') ||
+        setweight(to_tsvector('simple', stores_search_fold(coalesce(NEW.address, ''))), 'C') ||
+        setweight(to_tsvector('simple', stores_search_fold(coalesce(NEW.city, ''))), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_store_search_vector_trigger
+BEFORE INSERT OR UPDATE OF name, address, city, district ON stores_store
+FOR EACH ROW EXECUTE FUNCTION stores_store_search_vector_update();
+
+UPDATE stores_store SET name = name;
+"""
+
+DROP_SEARCH_TRIGGER = """
+DROP TRIGGER IF EXISTS stores_store_search_vector_trigger ON stores_store;
+DROP FUNCTION IF EXISTS stores_store_search_vector_update();
+"""
+
+# Trigram indexes over the folded text back fuzzy name matching and
+# substring (LIKE '%...%') matching on name and address.
+CREATE_TRIGRAM_INDEXES = """
+CREATE INDEX stores_store_name_trgm
+    ON stores_store USING gin (stores_search_fold(name) gin_trgm_ops);
+CREATE INDEX stores_store_address_trgm
+    ON stores_store USING gin (stores_search_fold(address) gin_trgm_ops);
+"""
+
+DROP_TRIGRAM_INDEXES = """
+DROP INDEX IF EXISTS stores_store_name_trgm;
+DROP INDEX IF EXISTS stores_store_address_trgm;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0009_review_guest_name_alter_review_user'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.AddField(
+            model_name='store',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, help_text='Accent-folded search document over name, district, address and city', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='stores_store_search_gin'),
+        ),
+        migrations.RunSQL(CREATE_FOLD_FUNCTION, DROP_FOLD_FUNCTION),
+        migrations.RunSQL(CREATE_SEARCH_TRIGGER, DROP_SEARCH_TRIGGER),
+        migrations.RunSQL(CREATE_TRIGRAM_INDEXES, DROP_TRIGRAM_INDEXES),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:00
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+# Mirror stores_store.location into a geography column on every write path so
+# radius and distance queries run in meters against their own GiST index.
+CREATE_GEOG_TRIGGER = """
+CREATE OR REPLACE FUNCTION stores_store_location_geog_update() RETURNS trigger AS $$
+BEGIN
+    NEW.location_geog := NEW.location::geography;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_store_location_geog_trigger
+BEFORE INSERT OR UPDATE OF location ON stores_store
+FOR EACH ROW EXECUTE FUNCTION stores_store_location_geog_update();
+
+UPDATE stores_store SET location_geog = location::geography WHERE location IS NOT NULL;
+"""
+
+DROP_GEOG_TRIGGER = """
+DROP TRIGGER IF EXISTS stores_store_location_geog_trigger ON stores_store;
+DROP FUNCTION IF EXISTS stores_store_location_geog_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0010_store_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='location_geog',
+            field=django.contrib.gis.db.models.fields.PointField(blank=True, editable=False, geography=True, help_text='Geography copy of location for metric distance queries, maintained by a database trigger', null=True, srid=4326),
+        ),
+        migrations.RunSQL(CREATE_GEOG_TRIGGER, DROP_GEOG_TRIGGER),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0011_store_location_geog'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['created_at', 'id'], name='stores_inve_created_007c44_idx'),
+        ),
+    ]
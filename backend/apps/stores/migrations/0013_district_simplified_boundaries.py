@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:00
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+# Keep the simplified boundaries in step with District.boundary on every write
+# path. Tolerances (degrees) match BOUNDARY_DETAIL_LEVELS in utils/boundary_helpers.py.
+CREATE_SIMPLIFY_TRIGGER = """
+CREATE OR REPLACE FUNCTION stores_district_simplify_boundary() RETURNS trigger AS $$
+BEGIN
+    NEW.boundary_high := ST_Multi(ST_SimplifyPreserveTopology(NEW.boundary, 0.0001));
+    NEW.boundary_medium := ST_Multi(ST_SimplifyPreserveTopology(NEW.boundary, 0.0005));
+    NEW.boundary_low := ST_Multi(ST_SimplifyPreserveTopology(NEW.boundary, 0.002));
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_district_simplify_boundary_trigger
+BEFORE INSERT OR UPDATE OF boundary ON stores_district
+FOR EACH ROW EXECUTE FUNCTION stores_district_simplify_boundary();
+
+UPDATE stores_district SET boundary = boundary WHERE boundary IS NOT NULL;
+"""
+
+DROP_SIMPLIFY_TRIGGER = """
+DROP TRIGGER IF EXISTS stores_district_simplify_boundary_trigger ON stores_district;
+DROP FUNCTION IF EXISTS stores_district_simplify_boundary();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0012_inventory_stores_inve_created_007c44_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='district',
+            name='boundary_high',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, editable=False, help_text='Boundary simplified to ~10 m for close zoom levels', null=True, spatial_index=False, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='district',
+            name='boundary_medium',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, editable=False, help_text='Boundary simplified to ~50 m for mid zoom levels', null=True, spatial_index=False, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='district',
+            name='boundary_low',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, editable=False, help_text='Boundary simplified to ~200 m for overview zoom levels', null=True, spatial_index=False, srid=4326),
+        ),
+        migrations.RunSQL(CREATE_SIMPLIFY_TRIGGER, DROP_SIMPLIFY_TRIGGER),
+    ]
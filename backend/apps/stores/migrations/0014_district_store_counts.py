@@ -0,0 +1,88 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:00
+
+from django.db import migrations, models
+
+
+# Keep District.total_store_count/active_store_count in step with the stores
+# inside each district (same rule as District.get_stores(): location within the
+# boundary, or matching district name when there is no boundary). Store writes
+# adjust the counts incrementally; boundary or name changes recount the district.
+CREATE_COUNT_TRIGGERS = """
+CREATE OR REPLACE FUNCTION stores_store_district_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE stores_district d
+        SET total_store_count = d.total_store_count - 1,
+            active_store_count = d.active_store_count - OLD.is_active::integer
+        WHERE (d.boundary IS NOT NULL AND ST_Contains(d.boundary, OLD.location))
+           OR (d.boundary IS NULL AND d.name = OLD.district);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE stores_district d
+        SET total_store_count = d.total_store_count + 1,
+            active_store_count = d.active_store_count + NEW.is_active::integer
+        WHERE (d.boundary IS NOT NULL AND ST_Contains(d.boundary, NEW.location))
+           OR (d.boundary IS NULL AND d.name = NEW.district);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_store_district_counts_insert_delete
+AFTER INSERT OR DELETE ON stores_store
+FOR EACH ROW EXECUTE FUNCTION stores_store_district_counts();
+
+CREATE TRIGGER stores_store_district_counts_update
+AFTER UPDATE OF location, is_active, district ON stores_store
+FOR EACH ROW
+WHEN (OLD.location IS DISTINCT FROM NEW.location
+      OR OLD.is_active IS DISTINCT FROM NEW.is_active
+      OR OLD.district IS DISTINCT FROM NEW.district)
+EXECUTE FUNCTION stores_store_district_counts();
+
+CREATE OR REPLACE FUNCTION stores_district_recount_stores() RETURNS trigger AS $$
+BEGIN
+    SELECT count(*), count(*) FILTER (WHERE s.is_active)
+    INTO NEW.total_store_count, NEW.active_store_count
+    FROM stores_store s
+    WHERE CASE WHEN NEW.boundary IS NOT NULL THEN ST_Contains(NEW.boundary, s.location)
+               ELSE s.district = NEW.name END;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_district_recount_stores_trigger
+BEFORE INSERT OR UPDATE OF boundary, name ON stores_district
+FOR EACH ROW EXECUTE FUNCTION stores_district_recount_stores();
+
+UPDATE stores_district SET name = name;
+"""
+
+DROP_COUNT_TRIGGERS = """
+DROP TRIGGER IF EXISTS stores_district_recount_stores_trigger ON stores_district;
+DROP FUNCTION IF EXISTS stores_district_recount_stores();
+DROP TRIGGER IF EXISTS stores_store_district_counts_update ON stores_store;
+DROP TRIGGER IF EXISTS stores_store_district_counts_insert_delete ON stores_store;
+DROP FUNCTION IF EXISTS stores_store_district_counts();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0013_district_simplified_boundaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='district',
+            name='total_store_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of stores in the district'),
+        ),
+        migrations.AddField(
+            model_name='district',
+            name='active_store_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of active stores in the district'),
+        ),
+        migrations.RunSQL(CREATE_COUNT_TRIGGERS, DROP_COUNT_TRIGGERS),
+    ]
@@ -0,0 +1,131 @@
+# Generated by Django 4.2.7 on 2026-10-17 14:00
+
+from django.db import migrations, models
+
+
+# Per-store inventory and review counters. They are adjusted by triggers on
+# every inventory/review write (including bulk_create and queryset.update()),
+# and a guard trigger keeps ordinary Store saves, which write every column from
+# a possibly stale instance, from overwriting them.
+CREATE_COUNTER_TRIGGERS = """
+CREATE OR REPLACE FUNCTION stores_inventory_store_counters() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE stores_store
+        SET inventory_count = inventory_count - 1,
+            available_inventory_count = available_inventory_count - OLD.is_available::integer
+        WHERE id = OLD.store_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE stores_store
+        SET inventory_count = inventory_count + 1,
+            available_inventory_count = available_inventory_count + NEW.is_available::integer
+        WHERE id = NEW.store_id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_inventory_store_counters_insert_delete
+AFTER INSERT OR DELETE ON stores_inventory
+FOR EACH ROW EXECUTE FUNCTION stores_inventory_store_counters();
+
+CREATE TRIGGER stores_inventory_store_counters_update
+AFTER UPDATE OF store_id, is_available ON stores_inventory
+FOR EACH ROW
+WHEN (OLD.store_id IS DISTINCT FROM NEW.store_id OR OLD.is_available IS DISTINCT FROM NEW.is_available)
+EXECUTE FUNCTION stores_inventory_store_counters();
+
+CREATE OR REPLACE FUNCTION stores_review_store_counters() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE stores_store
+        SET approved_review_count = approved_review_count - OLD.is_approved::integer
+        WHERE id = OLD.store_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE stores_store
+        SET approved_review_count = approved_review_count + NEW.is_approved::integer
+        WHERE id = NEW.store_id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_review_store_counters_insert_delete
+AFTER INSERT OR DELETE ON stores_review
+FOR EACH ROW EXECUTE FUNCTION stores_review_store_counters();
+
+CREATE TRIGGER stores_review_store_counters_update
+AFTER UPDATE OF store_id, is_approved ON stores_review
+FOR EACH ROW
+WHEN (OLD.store_id IS DISTINCT FROM NEW.store_id OR OLD.is_approved IS DISTINCT FROM NEW.is_approved)
+EXECUTE FUNCTION stores_review_store_counters();
+
+UPDATE stores_store s
+SET inventory_count = c.inventory_count,
+    available_inventory_count = c.available_inventory_count,
+    approved_review_count = c.approved_review_count
+FROM (
+    SELECT st.id,
+           (SELECT count(*) FROM stores_inventory i WHERE i.store_id = st.id) AS inventory_count,
+           (SELECT count(*) FROM stores_inventory i WHERE i.store_id = st.id AND i.is_available) AS available_inventory_count,
+           (SELECT count(*) FROM stores_review r WHERE r.store_id = st.id AND r.is_approved) AS approved_review_count
+    FROM stores_store st
+) c
+WHERE s.id = c.id;
+
+-- Only the counter triggers above (which run nested, at trigger depth > 1) may
+-- change the counters of an existing store.
+CREATE OR REPLACE FUNCTION stores_store_protect_counters() RETURNS trigger AS $$
+BEGIN
+    IF pg_trigger_depth() = 1 THEN
+        NEW.inventory_count := OLD.inventory_count;
+        NEW.available_inventory_count := OLD.available_inventory_count;
+        NEW.approved_review_count := OLD.approved_review_count;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_store_protect_counters_trigger
+BEFORE UPDATE OF inventory_count, available_inventory_count, approved_review_count ON stores_store
+FOR EACH ROW EXECUTE FUNCTION stores_store_protect_counters();
+"""
+
+DROP_COUNTER_TRIGGERS = """
+DROP TRIGGER IF EXISTS stores_store_protect_counters_trigger ON stores_store;
+DROP FUNCTION IF EXISTS stores_store_protect_counters();
+DROP TRIGGER IF EXISTS stores_review_store_counters_update ON stores_review;
+DROP TRIGGER IF EXISTS stores_review_store_counters_insert_delete ON stores_review;
+DROP FUNCTION IF EXISTS stores_review_store_counters();
+DROP TRIGGER IF EXISTS stores_inventory_store_counters_update ON stores_inventory;
+DROP TRIGGER IF EXISTS stores_inventory_store_counters_insert_delete ON stores_inventory;
+DROP FUNCTION IF EXISTS stores_inventory_store_counters();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0014_district_store_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='inventory_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of inventory entries for the store'),
+        ),
+        migrations.AddField(
+            model_name='store',
+            name='available_inventory_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of available inventory entries for the store'),
+        ),
+        migrations.AddField(
+            model_name='store',
+            name='approved_review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of approved reviews for the store'),
+        ),
+        migrations.RunSQL(CREATE_COUNTER_TRIGGERS, DROP_COUNTER_TRIGGERS),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:00
+
+from django.db import migrations, models
+
+
+# Dashboard counters kept in stores_analyticscounter. Statement-level triggers
+# with transition tables fold every write (including bulk_create and
+# queryset.update()) into one upsert per touched counter, so bulk writes cost
+# one counter update per statement rather than one per row. Counters are
+# upserted in (scope, key) order so concurrent writers lock them in the same
+# order.
+UPSERT_COUNTERS = """
+        INSERT INTO stores_analyticscounter (scope, key, value)
+        SELECT scope, key, sum(delta) FROM ({deltas}) deltas
+        GROUP BY scope, key
+        HAVING sum(delta) <> 0
+        ORDER BY scope, key
+        ON CONFLICT (scope, key) DO UPDATE SET value = stores_analyticscounter.value + EXCLUDED.value;
+"""
+
+STORE_DELTAS = """
+            SELECT 'total' AS scope, 'stores' AS key, c.sign AS delta FROM ({changes}) c
+            UNION ALL SELECT 'total', 'active_stores', c.sign * c.is_active::integer FROM ({changes}) c
+            UNION ALL SELECT 'district', COALESCE(NULLIF(c.district, ''), 'Unknown'), c.sign FROM ({changes}) c
+            UNION ALL SELECT 'store_type', COALESCE(NULLIF(c.store_type, ''), 'unknown'), c.sign FROM ({changes}) c
+"""
+
+INVENTORY_DELTAS = """
+            SELECT 'total' AS scope, 'inventory' AS key, c.sign AS delta FROM ({changes}) c
+            UNION ALL SELECT 'total', 'available_inventory', c.sign * c.is_available::integer FROM ({changes}) c
+            UNION ALL SELECT 'category', COALESCE(NULLIF(it.category, ''), 'other'), c.sign
+                FROM ({changes}) c LEFT JOIN stores_item it ON it.id = c.item_id
+"""
+
+# An item changing category moves its inventory entries between categories
+ITEM_DELTAS = """
+            SELECT 'total' AS scope, 'items' AS key, c.sign AS delta FROM ({changes}) c
+            UNION ALL SELECT 'category', COALESCE(NULLIF(c.category, ''), 'other'),
+                c.sign * (SELECT count(*) FROM stores_inventory i WHERE i.item_id = c.id)
+                FROM ({changes}) c
+"""
+
+DISTRICT_DELTAS = """
+            SELECT 'total' AS scope, 'districts' AS key, c.sign AS delta FROM ({changes}) c
+"""
+
+TABLES = [
+    # (table, deltas, columns read)
+    ('stores_store', STORE_DELTAS, 'is_active, district, store_type'),
+    ('stores_inventory', INVENTORY_DELTAS, 'is_available, item_id'),
+    ('stores_item', ITEM_DELTAS, 'id, category'),
+    ('stores_district', DISTRICT_DELTAS, 'id'),
+]
+
+
+def counter_function_sql(table, deltas, columns, guard=''):
+    inserted = f'SELECT 1 AS sign, {columns} FROM new_rows'
+    deleted = f'SELECT -1 AS sign, {columns} FROM old_rows'
+    upsert = {
+        'INSERT': UPSERT_COUNTERS.format(deltas=deltas.format(changes=inserted)),
+        'DELETE': UPSERT_COUNTERS.format(deltas=deltas.format(changes=deleted)),
+        'UPDATE': UPSERT_COUNTERS.format(deltas=deltas.format(changes=f'{inserted} UNION ALL {deleted}')),
+    }
+    return f"""
+CREATE OR REPLACE FUNCTION {table}_analytics_counters() RETURNS trigger AS $$
+BEGIN{guard}
+    IF TG_OP = 'INSERT' THEN{upsert['INSERT']}
+    ELSIF TG_OP = 'DELETE' THEN{upsert['DELETE']}
+    ELSE{upsert['UPDATE']}
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def counter_trigger_sql(table, deltas, columns):
+    return counter_function_sql(table, deltas, columns) + f"""
+CREATE TRIGGER {table}_analytics_counters_insert
+AFTER INSERT ON {table} REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION {table}_analytics_counters();
+
+CREATE TRIGGER {table}_analytics_counters_update
+AFTER UPDATE ON {table} REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION {table}_analytics_counters();
+
+CREATE TRIGGER {table}_analytics_counters_delete
+AFTER DELETE ON {table} REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION {table}_analytics_counters();
+"""
+
+
+def drop_counter_trigger_sql(table):
+    return f"""
+DROP TRIGGER IF EXISTS {table}_analytics_counters_delete ON {table};
+DROP TRIGGER IF EXISTS {table}_analytics_counters_update ON {table};
+DROP TRIGGER IF EXISTS {table}_analytics_counters_insert ON {table};
+DROP FUNCTION IF EXISTS {table}_analytics_counters();
+"""
+
+
+BACKFILL_COUNTERS = """
+INSERT INTO stores_analyticscounter (scope, key, value)
+SELECT 'total', 'stores', count(*) FROM stores_store
+UNION ALL SELECT 'total', 'active_stores', count(*) FILTER (WHERE is_active) FROM stores_store
+UNION ALL SELECT 'total', 'districts', count(*) FROM stores_district
+UNION ALL SELECT 'total', 'items', count(*) FROM stores_item
+UNION ALL SELECT 'total', 'inventory', count(*) FROM stores_inventory
+UNION ALL SELECT 'total', 'available_inventory', count(*) FILTER (WHERE is_available) FROM stores_inventory
+UNION ALL SELECT 'district', COALESCE(NULLIF(district, ''), 'Unknown'), count(*) FROM stores_store GROUP BY 2
+UNION ALL SELECT 'store_type', COALESCE(NULLIF(store_type, ''), 'unknown'), count(*) FROM stores_store GROUP BY 2
+UNION ALL SELECT 'category', COALESCE(NULLIF(it.category, ''), 'other'), count(*)
+    FROM stores_inventory i LEFT JOIN stores_item it ON it.id = i.item_id GROUP BY 2;
+"""
+
+CREATE_COUNTER_TRIGGERS = BACKFILL_COUNTERS + ''.join(
+    counter_trigger_sql(table, deltas, columns) for table, deltas, columns in TABLES
+)
+
+DROP_COUNTER_TRIGGERS = ''.join(drop_counter_trigger_sql(table) for table, _, _ in TABLES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0015_store_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('total', 'Total'), ('district', 'Stores by district'), ('store_type', 'Stores by type'), ('category', 'Inventory by item category')], help_text='What the counter breaks down', max_length=20)),
+                ('key', models.CharField(help_text='Metric name for totals, otherwise the district, store type or category', max_length=100)),
+                ('value', models.BigIntegerField(default=0, help_text='Current count')),
+            ],
+            options={
+                'verbose_name': 'Analytics Counter',
+                'verbose_name_plural': 'Analytics Counters',
+                'db_table': 'stores_analyticscounter',
+                'ordering': ['scope', 'key'],
+                'unique_together': {('scope', 'key')},
+            },
+        ),
+        migrations.RunSQL(CREATE_COUNTER_TRIGGERS, DROP_COUNTER_TRIGGERS),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0016_analytics_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Day the snapshot was taken')),
+                ('scope', models.CharField(choices=[('total', 'Total'), ('district', 'District'), ('store_type', 'Store type'), ('category', 'Item category')], help_text='What the row breaks down', max_length=20)),
+                ('key', models.CharField(blank=True, default='', help_text='District, store type or category; empty for totals', max_length=100)),
+                ('store_count', models.PositiveIntegerField(default=0, help_text='Stores (stocking the category, for category rows)')),
+                ('active_store_count', models.PositiveIntegerField(default=0, help_text='Active stores')),
+                ('inventory_count', models.PositiveIntegerField(default=0, help_text='Inventory entries')),
+                ('available_inventory_count', models.PositiveIntegerField(default=0, help_text='Available inventory entries')),
+                ('district_count', models.PositiveIntegerField(blank=True, help_text='Districts (totals only)', null=True)),
+                ('item_count', models.PositiveIntegerField(blank=True, help_text='Catalog items (totals only)', null=True)),
+            ],
+            options={
+                'verbose_name': 'Analytics Snapshot',
+                'verbose_name_plural': 'Analytics Snapshots',
+                'db_table': 'stores_analyticssnapshot',
+                'ordering': ['scope', 'key', 'date'],
+                'unique_together': {('scope', 'key', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:00
+
+from django.db import migrations, models
+
+
+# Feed of (item, store) availability changes for the in-process availability
+# bitmaps (see utils/availability_index.py). Every inventory write, including
+# bulk_create, queryset.update() and upserts, appends the pairs whose
+# availability it changed; the "unavailable" entries of an UPDATE are written
+# before the "available" ones so replaying the feed in id order is exact.
+CREATE_CHANGE_TRIGGERS = """
+CREATE OR REPLACE FUNCTION stores_inventory_availability_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stores_inventoryavailabilitychange (item_id, store_id, is_available, created_at)
+        SELECT n.item_id, n.store_id, true, clock_timestamp() FROM new_rows n
+        WHERE n.is_available;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO stores_inventoryavailabilitychange (item_id, store_id, is_available, created_at)
+        SELECT o.item_id, o.store_id, false, clock_timestamp() FROM old_rows o
+        WHERE o.is_available;
+    ELSE
+        INSERT INTO stores_inventoryavailabilitychange (item_id, store_id, is_available, created_at)
+        SELECT o.item_id, o.store_id, false, clock_timestamp() FROM old_rows o
+        WHERE o.is_available AND NOT EXISTS (
+            SELECT 1 FROM new_rows n
+            WHERE n.id = o.id AND n.is_available AND n.item_id = o.item_id AND n.store_id = o.store_id
+        );
+        INSERT INTO stores_inventoryavailabilitychange (item_id, store_id, is_available, created_at)
+        SELECT n.item_id, n.store_id, true, clock_timestamp() FROM new_rows n
+        WHERE n.is_available AND NOT EXISTS (
+            SELECT 1 FROM old_rows o
+            WHERE o.id = n.id AND o.is_available AND o.item_id = n.item_id AND o.store_id = n.store_id
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_inventory_availability_changes_insert
+AFTER INSERT ON stores_inventory REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION stores_inventory_availability_changes();
+
+CREATE TRIGGER stores_inventory_availability_changes_update
+AFTER UPDATE ON stores_inventory REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION stores_inventory_availability_changes();
+
+CREATE TRIGGER stores_inventory_availability_changes_delete
+AFTER DELETE ON stores_inventory REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION stores_inventory_availability_changes();
+"""
+
+DROP_CHANGE_TRIGGERS = """
+DROP TRIGGER IF EXISTS stores_inventory_availability_changes_delete ON stores_inventory;
+DROP TRIGGER IF EXISTS stores_inventory_availability_changes_update ON stores_inventory;
+DROP TRIGGER IF EXISTS stores_inventory_availability_changes_insert ON stores_inventory;
+DROP FUNCTION IF EXISTS stores_inventory_availability_changes();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0017_analyticssnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryAvailabilityChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_id', models.BigIntegerField(help_text='Item whose availability changed')),
+                ('store_id', models.BigIntegerField(help_text='Store whose availability changed')),
+                ('is_available', models.BooleanField(help_text='Availability after the change')),
+                ('created_at', models.DateTimeField(help_text='When the change was written')),
+            ],
+            options={
+                'verbose_name': 'Inventory Availability Change',
+                'verbose_name_plural': 'Inventory Availability Changes',
+                'db_table': 'stores_inventoryavailabilitychange',
+                'indexes': [models.Index(fields=['created_at'], name='stores_inve_created_ccdeef_idx')],
+            },
+        ),
+        migrations.RunSQL(CREATE_CHANGE_TRIGGERS, DROP_CHANGE_TRIGGERS),
+    ]
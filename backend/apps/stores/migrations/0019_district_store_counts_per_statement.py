@@ -0,0 +1,133 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:00
+
+from django.db import migrations
+
+
+# Replace the per-row district count triggers from 0014 with statement-level
+# triggers over transition tables. The changed stores are matched to their
+# districts once per statement and the deltas summed per district, so a bulk
+# insert of 100k stores costs one UPDATE per touched district instead of one
+# UPDATE (and one dead district row version) per store. Districts are updated
+# in id order so concurrent writers lock them in the same order.
+#
+# Nested updates of stores_store (the inventory and review counters from 0015)
+# never change location, is_active or district, so they are skipped.
+DISTRICT_DELTAS = """
+        FOR delta IN
+            WITH {changes},
+            matched AS (
+                SELECT d.id, c.sign, c.is_active FROM changes c
+                JOIN stores_district d ON d.boundary IS NOT NULL AND ST_Contains(d.boundary, c.location)
+                UNION ALL
+                SELECT d.id, c.sign, c.is_active FROM changes c
+                JOIN stores_district d ON d.boundary IS NULL AND d.name = c.district
+            )
+            SELECT id, sum(sign) AS total, sum(sign * is_active::integer) AS active
+            FROM matched
+            GROUP BY id
+            HAVING sum(sign) <> 0 OR sum(sign * is_active::integer) <> 0
+            ORDER BY id
+        LOOP
+            UPDATE stores_district
+            SET total_store_count = total_store_count + delta.total,
+                active_store_count = active_store_count + delta.active
+            WHERE id = delta.id;
+        END LOOP;"""
+
+INSERTED = 'changes AS (SELECT 1 AS sign, location, district, is_active FROM new_rows)'
+DELETED = 'changes AS (SELECT -1 AS sign, location, district, is_active FROM old_rows)'
+# Only rows whose district membership or active flag may have changed
+CHANGED = """changed AS (
+                SELECT o.id, o.location AS old_location, o.district AS old_district, o.is_active AS old_is_active,
+                       n.location, n.district, n.is_active
+                FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE o.location IS DISTINCT FROM n.location
+                   OR o.is_active IS DISTINCT FROM n.is_active
+                   OR o.district IS DISTINCT FROM n.district
+            ), changes AS (
+                SELECT -1 AS sign, old_location AS location, old_district AS district, old_is_active AS is_active FROM changed
+                UNION ALL
+                SELECT 1, location, district, is_active FROM changed
+            )"""
+
+CREATE_STATEMENT_TRIGGERS = f"""
+DROP TRIGGER IF EXISTS stores_store_district_counts_update ON stores_store;
+DROP TRIGGER IF EXISTS stores_store_district_counts_insert_delete ON stores_store;
+
+CREATE OR REPLACE FUNCTION stores_store_district_counts() RETURNS trigger AS $$
+DECLARE
+    delta record;
+BEGIN
+    IF pg_trigger_depth() > 1 THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'INSERT' THEN{DISTRICT_DELTAS.format(changes=INSERTED)}
+    ELSIF TG_OP = 'DELETE' THEN{DISTRICT_DELTAS.format(changes=DELETED)}
+    ELSE{DISTRICT_DELTAS.format(changes=CHANGED)}
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_store_district_counts_insert
+AFTER INSERT ON stores_store REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION stores_store_district_counts();
+
+CREATE TRIGGER stores_store_district_counts_update
+AFTER UPDATE ON stores_store REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION stores_store_district_counts();
+
+CREATE TRIGGER stores_store_district_counts_delete
+AFTER DELETE ON stores_store REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION stores_store_district_counts();
+"""
+
+# The per-row triggers from 0014
+CREATE_ROW_TRIGGERS = """
+DROP TRIGGER IF EXISTS stores_store_district_counts_delete ON stores_store;
+DROP TRIGGER IF EXISTS stores_store_district_counts_update ON stores_store;
+DROP TRIGGER IF EXISTS stores_store_district_counts_insert ON stores_store;
+
+CREATE OR REPLACE FUNCTION stores_store_district_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE stores_district d
+        SET total_store_count = d.total_store_count - 1,
+            active_store_count = d.active_store_count - OLD.is_active::integer
+        WHERE (d.boundary IS NOT NULL AND ST_Contains(d.boundary, OLD.location))
+           OR (d.boundary IS NULL AND d.name = OLD.district);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE stores_district d
+        SET total_store_count = d.total_store_count + 1,
+            active_store_count = d.active_store_count + NEW.is_active::integer
+        WHERE (d.boundary IS NOT NULL AND ST_Contains(d.boundary, NEW.location))
+           OR (d.boundary IS NULL AND d.name = NEW.district);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_store_district_counts_insert_delete
+AFTER INSERT OR DELETE ON stores_store
+FOR EACH ROW EXECUTE FUNCTION stores_store_district_counts();
+
+CREATE TRIGGER stores_store_district_counts_update
+AFTER UPDATE OF location, is_active, district ON stores_store
+FOR EACH ROW
+WHEN (OLD.location IS DISTINCT FROM NEW.location
+      OR OLD.is_active IS DISTINCT FROM NEW.is_active
+      OR OLD.district IS DISTINCT FROM NEW.district)
+EXECUTE FUNCTION stores_store_district_counts();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0018_inventoryavailabilitychange'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_STATEMENT_TRIGGERS, CREATE_ROW_TRIGGERS),
+    ]
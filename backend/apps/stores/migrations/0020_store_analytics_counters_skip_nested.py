@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:00
+
+from importlib import import_module
+
+from django.db import migrations
+
+analytics_counters = import_module(f'{__package__}.0016_analytics_counters')
+
+
+# Every inventory and review write updates its store's counters from a nested
+# trigger (0015), and each of those updates ran the stores_store counter
+# aggregate for a net-zero delta: the counter columns are not counted, and the
+# nested updates never change is_active, district or store_type. Skip them.
+SKIP_NESTED = """
+    IF pg_trigger_depth() > 1 THEN
+        RETURN NULL;
+    END IF;"""
+
+STORE_COUNTERS = ('stores_store', analytics_counters.STORE_DELTAS, 'is_active, district, store_type')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0019_district_store_counts_per_statement'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            analytics_counters.counter_function_sql(*STORE_COUNTERS, guard=SKIP_NESTED),
+            analytics_counters.counter_function_sql(*STORE_COUNTERS),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.gis.geos import Point, Polygon, MultiPolygon
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db.models import Avg
@@ -19,6 +21,41 @@ class District(models.Model):
         blank=True
     )
     
+    # Simplified copies of the boundary for map overviews, maintained by a database trigger
+    boundary_high = gis_models.MultiPolygonField(
+        help_text="Boundary simplified to ~10 m for close zoom levels",
+        spatial_index=False,
+        null=True,
+        blank=True,
+        editable=False
+    )
+    boundary_medium = gis_models.MultiPolygonField(
+        help_text="Boundary simplified to ~50 m for mid zoom levels",
+        spatial_index=False,
+        null=True,
+        blank=True,
+        editable=False
+    )
+    boundary_low = gis_models.MultiPolygonField(
+        help_text="Boundary simplified to ~200 m for overview zoom levels",
+        spatial_index=False,
+        null=True,
+        blank=True,
+        editable=False
+    )
+    
+    # Store counts, maintained by database triggers on stores_store (migrations 0014 and 0019)
+    total_store_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of stores in the district"
+    )
+    active_store_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of active stores in the district"
+    )
+    
     # Administrative information
     city = models.CharField(max_length=100, default="Ho Chi Minh City", help_text="City name")
     population = models.IntegerField(
@@ -98,7 +135,7 @@ class District(models.Model):
         return Store.objects.filter(district=self.name)  
     
     def get_store_count(self):
-        """Get the number of stores in this district"""
+        """Get the number of stores in this district (live query; see total_store_count)"""
         return self.get_stores().count()
     
     def get_area_centroid(self):
@@ -123,6 +160,14 @@ class Store(models.Model):
         null=True,
         blank=True
     )
+    location_geog = gis_models.PointField(
+        geography=True,
+        help_text="Geography copy of location for metric distance queries, maintained by a database trigger",
+        spatial_index=True,
+        null=True,
+        blank=True,
+        editable=False
+    )
     
     # Store details
     store_type = models.CharField(
@@ -173,6 +218,31 @@ class Store(models.Model):
         help_text="Store rating (0-5)"
     )
     
+    # Counters owned by database triggers on stores_inventory/stores_review (see migration 0015)
+    inventory_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of inventory entries for the store"
+    )
+    available_inventory_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of available inventory entries for the store"
+    )
+    approved_review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of approved reviews for the store"
+    )
+    
+    # Full-text search document, maintained by a database trigger (see migration 0010)
+    search_vector = SearchVectorField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Accent-folded search document over name, district, address and city"
+    )
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -191,6 +261,7 @@ class Store(models.Model):
             models.Index(fields=['store_type', 'is_active']),
             models.Index(fields=['district_obj', 'store_type']),
             models.Index(fields=['is_active', 'store_type', 'city']),
+            GinIndex(fields=['search_vector'], name='stores_store_search_gin'),
         ]
     
     def __str__(self):
@@ -222,9 +293,15 @@ class Store(models.Model):
         self.location = Point(longitude, latitude, srid=4326)
     
     def distance_to(self, other_point):
-        """Calculate distance to another point in meters"""
+        """
+        Calculate geodesic distance to another point in meters.
+
+        Computed in Python, so it costs no query; to rank or filter many stores
+        by distance, annotate ``Distance('location_geog', point)`` instead.
+        """
         if self.location and other_point:
-            return self.location.distance(other_point) * 111320   # Convert degrees to meters
+            from .utils.spatial_helpers import geodesic_distance
+            return geodesic_distance(self.location, other_point)
         return None
 
 class Item(models.Model):
@@ -299,6 +376,7 @@ class Inventory(models.Model):
             models.Index(fields=['item', 'is_available']),
             models.Index(fields=['store', 'is_available']),
             models.Index(fields=['store', 'item', 'is_available']),
+            models.Index(fields=['created_at', 'id']),
         ]
     
     def __str__(self):
@@ -358,4 +436,93 @@ class Review(models.Model):
             self.store.rating = round(avg_rating, 1)
         else:
             self.store.rating = None
-        self.store.save(update_fields=['rating']) 
\ No newline at end of file
+        self.store.save(update_fields=['rating']) 
+
+class AnalyticsCounter(models.Model):
+    """Running count behind the analytics dashboard, maintained by database triggers (see migration 0016)"""
+
+    SCOPE_TOTAL = 'total'
+    SCOPE_DISTRICT = 'district'
+    SCOPE_STORE_TYPE = 'store_type'
+    SCOPE_CATEGORY = 'category'
+
+    scope = models.CharField(
+        max_length=20,
+        choices=[
+            (SCOPE_TOTAL, 'Total'),
+            (SCOPE_DISTRICT, 'Stores by district'),
+            (SCOPE_STORE_TYPE, 'Stores by type'),
+            (SCOPE_CATEGORY, 'Inventory by item category'),
+        ],
+        help_text="What the counter breaks down"
+    )
+    key = models.CharField(max_length=100, help_text="Metric name for totals, otherwise the district, store type or category")
+    value = models.BigIntegerField(default=0, help_text="Current count")
+
+    class Meta:
+        db_table = 'stores_analyticscounter'
+        verbose_name = 'Analytics Counter'
+        verbose_name_plural = 'Analytics Counters'
+        unique_together = [['scope', 'key']]
+        ordering = ['scope', 'key']
+
+    def __str__(self):
+        return f"{self.scope}:{self.key} = {self.value}"
+
+
+class AnalyticsSnapshot(models.Model):
+    """Daily rollup of the analytics metrics, overall and per district, store type and item category"""
+
+    SCOPE_TOTAL = 'total'
+    SCOPE_DISTRICT = 'district'
+    SCOPE_STORE_TYPE = 'store_type'
+    SCOPE_CATEGORY = 'category'
+
+    date = models.DateField(help_text="Day the snapshot was taken")
+    scope = models.CharField(
+        max_length=20,
+        choices=[
+            (SCOPE_TOTAL, 'Total'),
+            (SCOPE_DISTRICT, 'District'),
+            (SCOPE_STORE_TYPE, 'Store type'),
+            (SCOPE_CATEGORY, 'Item category'),
+        ],
+        help_text="What the row breaks down"
+    )
+    key = models.CharField(max_length=100, blank=True, default='', help_text="District, store type or category; empty for totals")
+    store_count = models.PositiveIntegerField(default=0, help_text="Stores (stocking the category, for category rows)")
+    active_store_count = models.PositiveIntegerField(default=0, help_text="Active stores")
+    inventory_count = models.PositiveIntegerField(default=0, help_text="Inventory entries")
+    available_inventory_count = models.PositiveIntegerField(default=0, help_text="Available inventory entries")
+    district_count = models.PositiveIntegerField(null=True, blank=True, help_text="Districts (totals only)")
+    item_count = models.PositiveIntegerField(null=True, blank=True, help_text="Catalog items (totals only)")
+
+    class Meta:
+        db_table = 'stores_analyticssnapshot'
+        verbose_name = 'Analytics Snapshot'
+        verbose_name_plural = 'Analytics Snapshots'
+        unique_together = [['scope', 'key', 'date']]
+        ordering = ['scope', 'key', 'date']
+
+    def __str__(self):
+        return f"{self.date} {self.scope}:{self.key}"
+
+
+class InventoryAvailabilityChange(models.Model):
+    """Change feed of (item, store) availability, written by database triggers on stores_inventory (see migration 0018)"""
+
+    item_id = models.BigIntegerField(help_text="Item whose availability changed")
+    store_id = models.BigIntegerField(help_text="Store whose availability changed")
+    is_available = models.BooleanField(help_text="Availability after the change")  # type: ignore[assignment]
+    created_at = models.DateTimeField(help_text="When the change was written")
+
+    class Meta:
+        db_table = 'stores_inventoryavailabilitychange'
+        verbose_name = 'Inventory Availability Change'
+        verbose_name_plural = 'Inventory Availability Changes'
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"item {self.item_id} at store {self.store_id}: {'available' if self.is_available else 'unavailable'}"
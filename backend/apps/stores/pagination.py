@@ -0,0 +1,198 @@
+"""
+Pagination classes for the stores API.
+
+Page-number pagination stays the default. Clients can opt into keyset (cursor)
+pagination per request with ``?pagination=cursor`` (or by sending a ``cursor``),
+which seeks past the last row of the previous page instead of using OFFSET and
+skips the ``COUNT(*)``, so deep pages cost the same as the first one.
+An ``?ordering=`` accepted by the view's ``OrderingFilter`` becomes the keyset
+(with ``id`` appended as the tie-breaker).
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset mode.
+
+    The keyset is taken from the view's ``keyset_ordering`` attribute, a tuple of
+    field or annotation names ending in a unique column, e.g. ``('name', 'id')``,
+    ``('knn_distance', 'id')`` or ``('created_at', 'id')``. Prefix a name with
+    ``-`` for descending order. A keyset set by the view for the current request
+    (e.g. relevance or distance order) takes precedence over ``?ordering=``.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    default_keyset_ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = self.is_keyset_request(request)
+        if not self.keyset_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.ordering = self.get_keyset_ordering(queryset, request, view)
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self.build_seek_condition(queryset, self.decode_cursor(encoded)))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'page_size': self.page_size,
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.keyset_mode:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        values = [self._position_value(self.page[-1], field) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.mode_query_param, 'cursor')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    def get_previous_link(self):
+        if not self.keyset_mode:
+            return super().get_previous_link()
+        return None
+
+    def get_keyset_ordering(self, queryset, request, view):
+        """
+        The keyset for this request.
+
+        ``?ordering=`` is mapped onto the keyset when the view's ordering filter
+        accepts it; fields it cannot page by (e.g. related lookups) are a 400.
+        """
+        keyset = tuple(getattr(view, 'keyset_ordering', None) or self.default_keyset_ordering)
+        param = request.query_params.get(OrderingFilter.ordering_param)
+        if not param or view is None or 'keyset_ordering' in vars(view):
+            return keyset
+
+        valid = {name for name, _ in OrderingFilter().get_valid_fields(queryset, view, {'request': request})}
+        terms = [term.strip() for term in param.split(',') if term.strip()]
+        for term in terms:
+            name = term.lstrip('-')
+            if name not in valid or '__' in name:
+                raise ValidationError({OrderingFilter.ordering_param: [
+                    f'Cannot page by "{term}" with cursor pagination.'
+                ]})
+        if not terms:
+            return keyset
+        if not any(term.lstrip('-') in ('id', 'pk') for term in terms):
+            terms.append('-id' if terms[0].startswith('-') else 'id')
+        return tuple(terms)
+
+    def is_keyset_request(self, request):
+        """Return True if the client asked for keyset pagination."""
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def build_seek_condition(self, queryset, values):
+        """
+        Build the "rows after this position" filter for the keyset.
+
+        Expands the row comparison ``(f1, f2, ...) > (v1, v2, ...)`` into ORs and
+        adds a redundant bound on the leading column so it can be used as an
+        index condition. NULLs sort last ascending and first descending, as in
+        PostgreSQL.
+        """
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+        values = [self._coerce(queryset, name, value) for (name, _), value in zip(fields, values)]
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending), value in zip(fields, values):
+            nullable = self._is_nullable(queryset, name)
+            condition |= equal & self._after(name, descending, value, nullable)
+            equal &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+
+        leading_name, leading_descending = fields[0]
+        leading_value = values[0]
+        if leading_value is not None:
+            bound = Q(**{f"{leading_name}__{'lte' if leading_descending else 'gte'}": leading_value})
+            if not leading_descending and self._is_nullable(queryset, leading_name):
+                bound |= Q(**{f'{leading_name}__isnull': True})
+            condition = bound & condition
+        return condition
+
+    def encode_cursor(self, values):
+        payload = json.dumps([
+            value.isoformat() if isinstance(value, (datetime, date)) else value
+            for value in values
+        ])
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, encoded):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _after(self, name, descending, value, nullable):
+        """Condition for rows strictly after ``value`` on a single column."""
+        if value is None:
+            if descending:
+                return Q(**{f'{name}__isnull': False})
+            return Q(pk__in=[])
+        condition = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+        if nullable and not descending:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+
+    def _coerce(self, queryset, name, value):
+        """Convert a decoded cursor value to the column's type; a tampered cursor is a 404."""
+        if value is None:
+            return None
+        try:
+            try:
+                field = queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                field = queryset.query.annotations[name].output_field
+            return field.to_python(value)
+        except (DjangoValidationError, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _is_nullable(self, queryset, name):
+        try:
+            return queryset.model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            return True  # Annotations such as distances may be NULL
+
+    def _position_value(self, obj, name):
+        return getattr(obj, name.lstrip('-'))
@@ -0,0 +1,27 @@
+"""
+Custom parsers for the stores API.
+"""
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """Parses newline-delimited JSON into a list, one item per non-blank line."""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        items = []
+        for line_number, line in enumerate(stream, start=1):
+            line = line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as exc:
+                raise ParseError(f'NDJSON parse error on line {line_number} - {exc}')
+        return items
@@ -0,0 +1,150 @@
+"""
+Custom renderers for the stores API.
+"""
+from abc import ABC, abstractmethod
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer, JSONRenderer
+
+from .utils.geometry_encoding import (
+    DEFAULT_POLYLINE_PRECISION, DEFAULT_TOPOJSON_PRECISION,
+    build_topology, encode_geometry_polyline, get_coordinate_precision,
+)
+
+
+class MVTRenderer(BaseRenderer):
+    """Renders Mapbox Vector Tile bytes; error payloads fall back to JSON."""
+    media_type = 'application/vnd.mapbox-vector-tile'
+    format = 'mvt'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return bytes(data)
+        return JSONRenderer().render(data, renderer_context=renderer_context)
+
+
+class GeometryRenderer(ABC, JSONRenderer):
+    """
+    Base for renderers that re-encode the geometry of serialized features.
+
+    A feature is a serialized dict carrying ``boundary_geojson``,
+    ``location_geojson`` or ``latitude``/``longitude``. Paginated responses,
+    lists and single objects are supported; anything else (errors, statistics)
+    is rendered as plain JSON. Geometries of nested objects are left out of
+    the feature properties.
+    """
+    geometry_keys = ('boundary_geojson', 'location_geojson')
+    wkt_keys = ('boundary', 'location')
+    default_precision = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        response = renderer_context.get('response')
+        if response is not None and response.status_code >= 400:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        request = renderer_context.get('request')
+        precision = self.default_precision
+        if request is not None:
+            try:
+                precision = get_coordinate_precision(request.query_params, self.default_precision)
+            except ValidationError:
+                pass  # Already reported by the view
+
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            items, envelope = data['results'], {k: v for k, v in data.items() if k != 'results'}
+        elif isinstance(data, list):
+            items, envelope = data, None
+        elif isinstance(data, dict):
+            items, envelope = [data], None
+        else:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if not all(isinstance(item, dict) and self.get_geometry_key(item) for item in items):
+            return super().render(data, accepted_media_type, renderer_context)
+        single = isinstance(data, dict) and envelope is None
+        encoded = self.encode(items, envelope, precision, renderer_context, single)
+        return super().render(encoded, accepted_media_type, renderer_context)
+
+    def get_geometry_key(self, item):
+        for key in self.geometry_keys:
+            if key in item:
+                return key
+        if 'latitude' in item and 'longitude' in item:
+            return 'latitude'
+        return None
+
+    def split_feature(self, item):
+        """Return (geometry, properties) for a serialized feature."""
+        key = self.get_geometry_key(item)
+        if key == 'latitude':
+            geometry = None
+            if item['latitude'] is not None and item['longitude'] is not None:
+                geometry = {'type': 'Point', 'coordinates': [item['longitude'], item['latitude']]}
+            skip = ('latitude', 'longitude')
+        else:
+            geometry = item[key]
+            skip = (key,)
+        properties = {
+            name: self.strip_geometries(value) for name, value in item.items()
+            if name not in skip and name not in self.geometry_keys and name not in self.wkt_keys
+        }
+        return geometry, properties
+
+    def strip_geometries(self, value):
+        """Drop geometries nested in a property, such as a store's district boundary."""
+        if isinstance(value, dict):
+            return {
+                name: self.strip_geometries(nested) for name, nested in value.items()
+                if name not in self.geometry_keys and name not in self.wkt_keys
+            }
+        if isinstance(value, list):
+            return [self.strip_geometries(nested) for nested in value]
+        return value
+
+    @abstractmethod
+    def encode(self, items, envelope, precision, renderer_context, single):
+        """Return the data to render for ``items`` (wrapped in ``envelope`` when paginated)."""
+
+
+class TopoJSONRenderer(GeometryRenderer):
+    """Renders features as a quantized TopoJSON topology with shared arcs."""
+    media_type = 'application/topo+json'
+    format = 'topojson'
+    default_precision = DEFAULT_TOPOJSON_PRECISION
+
+    def encode(self, items, envelope, precision, renderer_context, single):
+        view = renderer_context.get('view')
+        object_name = getattr(view, 'topology_object_name', 'features')
+        features = []
+        for item in items:
+            geometry, properties = self.split_feature(item)
+            features.append((properties.pop('id', None), geometry, properties))
+        topology = build_topology(object_name, features, precision)
+        if envelope:
+            topology.update(envelope)
+        return topology
+
+
+class PolylineRenderer(GeometryRenderer):
+    """Renders features as JSON with their geometry as encoded polylines."""
+    media_type = 'application/vnd.polyline+json'
+    format = 'polyline'
+    default_precision = DEFAULT_POLYLINE_PRECISION
+
+    def encode(self, items, envelope, precision, renderer_context, single):
+        results = []
+        for item in items:
+            geometry, properties = self.split_feature(item)
+            properties['geometry'] = encode_geometry_polyline(geometry, precision) if geometry else None
+            results.append(properties)
+        if single:
+            return results[0]
+        if envelope is not None:
+            return {**envelope, 'results': results}
+        return results
+
+
+GEOMETRY_RENDERER_CLASSES = [JSONRenderer, BrowsableAPIRenderer, TopoJSONRenderer, PolylineRenderer]
@@ -4,15 +4,55 @@ Django REST framework serializers for the stores app with spatial data support.
 
 from rest_framework import serializers
 from django.contrib.gis.geos import Point, Polygon
-from django.contrib.gis.geos import GEOSGeometry
+from django.contrib.gis.geos import GEOSGeometry, WKTWriter
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 import json
 
+from backend.apps.stores.fieldsets import SparseFieldsetSerializerMixin
 from backend.apps.stores.models import District, Store, Item, Inventory, Review
+from backend.apps.stores.utils.geometry_encoding import round_coordinates
+from backend.apps.stores.utils.boundary_helpers import (
+    DEFAULT_BOUNDARY_DETAIL, DEFAULT_GEOMETRY_FORMAT, boundary_field_for_detail
+)
 
 
-class DistrictSerializer(serializers.ModelSerializer):
+# Model columns read by the computed store location fields (see fieldsets.py)
+STORE_LOCATION_SOURCES = {
+    'location': ('location',),
+    'location_geojson': ('location',),
+    'latitude': ('location',),
+    'longitude': ('location',),
+}
+
+
+class GeometryOutputMixin:
+    """Formats geometries, honoring the ``coordinate_precision`` serializer context."""
+    
+    def format_wkt(self, geometry):
+        """Return geometry as WKT, rounded to the requested precision."""
+        precision = self.context.get('coordinate_precision')
+        if precision is None:
+            return geometry.wkt
+        return WKTWriter(dim=2, trim=True, precision=precision).write(geometry).decode()
+    
+    def format_geojson(self, geometry):
+        """Return geometry as a GeoJSON dictionary, rounded to the requested precision."""
+        data = json.loads(geometry.json)
+        precision = self.context.get('coordinate_precision')
+        if precision is not None:
+            data['coordinates'] = round_coordinates(data['coordinates'], precision)
+        return data
+    
+    def format_coordinate(self, value):
+        """Return a single coordinate value rounded to the requested precision."""
+        precision = self.context.get('coordinate_precision')
+        if precision is None or value is None:
+            return value
+        return round(value, precision)
+
+
+class DistrictSerializer(SparseFieldsetSerializerMixin, GeometryOutputMixin, serializers.ModelSerializer):
     """Serializer for District model with spatial boundary support."""
     
     # Spatial field serialization
@@ -20,7 +60,7 @@ class DistrictSerializer(serializers.ModelSerializer):
     boundary_geojson = serializers.SerializerMethodField()
     
     # Computed fields
-    store_count = serializers.SerializerMethodField()
+    store_count = serializers.IntegerField(source='total_store_count', read_only=True)
     centroid = serializers.SerializerMethodField()
     
     class Meta:
@@ -28,35 +68,57 @@ class DistrictSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'code', 'city', 'population', 'area_km2',
             'district_type', 'avg_income', 'is_active', 'boundary',
-            'boundary_geojson', 'store_count', 'centroid',
+            'boundary_geojson', 'store_count', 'active_store_count', 'centroid',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'store_count', 'centroid']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'store_count', 'active_store_count', 'centroid']
+        field_sources = {
+            'boundary': ('boundary',),
+            'boundary_geojson': ('boundary',),
+            'store_count': ('total_store_count',),
+            'centroid': ('boundary',),
+        }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only emit the geometry encoding(s) the client asked for
+        geometry_format = self.context.get('geometry_format', DEFAULT_GEOMETRY_FORMAT)
+        if geometry_format in ('geojson', 'none'):
+            self.fields.pop('boundary', None)
+        if geometry_format in ('wkt', 'none'):
+            self.fields.pop('boundary_geojson', None)
+    
+    def get_display_boundary(self, obj):
+        """Return the boundary at the detail level requested in the serializer context."""
+        detail = self.context.get('boundary_detail', DEFAULT_BOUNDARY_DETAIL)
+        return getattr(obj, boundary_field_for_detail(detail))
     
     def get_boundary(self, obj):
         """Return boundary as WKT (Well-Known Text) format."""
-        if obj.boundary:
-            return obj.boundary.wkt
+        boundary = self.get_display_boundary(obj)
+        if boundary:
+            return self.format_wkt(boundary)
         return None
     
     def get_boundary_geojson(self, obj):
         """Return boundary as GeoJSON format."""
-        if obj.boundary:
-            return json.loads(obj.boundary.json)
+        boundary = self.get_display_boundary(obj)
+        if boundary:
+            return self.format_geojson(boundary)
         return None
     
-    def get_store_count(self, obj):
-        """Return the number of stores in this district."""
-        return obj.get_store_count()
-    
     def get_centroid(self, obj):
         """Return the centroid of the district boundary."""
-        centroid = obj.get_area_centroid()
+        # Annotated by the district views; NULL when the district has no boundary
+        if hasattr(obj, 'boundary_centroid'):
+            centroid = obj.boundary_centroid
+        else:
+            centroid = obj.get_area_centroid()
         if centroid:
             return {
-                'latitude': centroid.y,
-                'longitude': centroid.x,
-                'geojson': json.loads(centroid.json)
+                'latitude': self.format_coordinate(centroid.y),
+                'longitude': self.format_coordinate(centroid.x),
+                'geojson': self.format_geojson(centroid)
             }
         return None
     
@@ -102,7 +164,7 @@ class DistrictSerializer(serializers.ModelSerializer):
         return value
 
 
-class StoreSerializer(serializers.ModelSerializer):
+class StoreSerializer(SparseFieldsetSerializerMixin, GeometryOutputMixin, serializers.ModelSerializer):
     """Serializer for Store model with spatial location support."""
     
     # Spatial field serialization
@@ -114,7 +176,8 @@ class StoreSerializer(serializers.ModelSerializer):
     district_obj_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
     
     # Computed fields
-    inventory_count = serializers.SerializerMethodField()
+    inventory_count = serializers.IntegerField(read_only=True)
+    available_inventory_count = serializers.IntegerField(read_only=True)
     latitude = serializers.SerializerMethodField()
     longitude = serializers.SerializerMethodField()
     
@@ -124,34 +187,33 @@ class StoreSerializer(serializers.ModelSerializer):
             'id', 'name', 'address', 'phone', 'email', 'store_type',
             'district', 'district_obj', 'district_obj_id', 'city',
             'opening_hours', 'is_active', 'rating', 'location',
-            'location_geojson', 'latitude', 'longitude', 'inventory_count',
+            'location_geojson', 'latitude', 'longitude', 'inventory_count', 'available_inventory_count',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'inventory_count']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'inventory_count', 'available_inventory_count']
+        expandable_fields = ('district_obj',)
+        sideload_fields = {'district_obj': ('districts', DistrictSerializer)}
+        field_sources = STORE_LOCATION_SOURCES
     
     def get_location(self, obj):
         """Return location as WKT format."""
         if obj.location:
-            return obj.location.wkt
+            return self.format_wkt(obj.location)
         return None
     
     def get_location_geojson(self, obj):
         """Return location as GeoJSON format."""
         if obj.location:
-            return json.loads(obj.location.json)
+            return self.format_geojson(obj.location)
         return None
     
     def get_latitude(self, obj):
         """Return latitude coordinate."""
-        return obj.latitude
+        return self.format_coordinate(obj.latitude)
     
     def get_longitude(self, obj):
         """Return longitude coordinate."""
-        return obj.longitude
-    
-    def get_inventory_count(self, obj):
-        """Return the number of inventory items."""
-        return obj.inventories.count()
+        return self.format_coordinate(obj.longitude)
     
     def validate_location(self, value):
         """Validate location data if provided."""
@@ -191,7 +253,7 @@ class StoreSerializer(serializers.ModelSerializer):
         return value
 
 
-class StoreListSerializer(serializers.ModelSerializer):
+class StoreListSerializer(SparseFieldsetSerializerMixin, GeometryOutputMixin, serializers.ModelSerializer):
     """Simplified serializer for store listing with consistent fields."""
     
     # Spatial field serialization
@@ -203,7 +265,8 @@ class StoreListSerializer(serializers.ModelSerializer):
     district_name = serializers.CharField(source='district_obj.name', read_only=True)
     
     # Computed fields
-    inventory_count = serializers.SerializerMethodField()
+    inventory_count = serializers.IntegerField(read_only=True)
+    available_inventory_count = serializers.IntegerField(read_only=True)
     latitude = serializers.SerializerMethodField()
     longitude = serializers.SerializerMethodField()
     
@@ -213,36 +276,35 @@ class StoreListSerializer(serializers.ModelSerializer):
             'id', 'name', 'address', 'phone', 'email', 'store_type',
             'district', 'district_obj', 'district_name', 'city',
             'opening_hours', 'is_active', 'rating', 'location',
-            'location_geojson', 'latitude', 'longitude', 'inventory_count',
+            'location_geojson', 'latitude', 'longitude', 'inventory_count', 'available_inventory_count',
             'created_at', 'updated_at'
         ]
+        expandable_fields = ('district_obj',)
+        sideload_fields = {'district_obj': ('districts', DistrictSerializer)}
+        field_sources = {**STORE_LOCATION_SOURCES, 'district_name': ('district_obj__name',)}
     
     def get_location(self, obj):
         """Return location as WKT format."""
         if obj.location:
-            return obj.location.wkt
+            return self.format_wkt(obj.location)
         return None
     
     def get_location_geojson(self, obj):
         """Return location as GeoJSON format."""
         if obj.location:
-            return json.loads(obj.location.json)
+            return self.format_geojson(obj.location)
         return None
     
     def get_latitude(self, obj):
         """Return latitude coordinate."""
-        return obj.latitude
+        return self.format_coordinate(obj.latitude)
     
     def get_longitude(self, obj):
         """Return longitude coordinate."""
-        return obj.longitude
-    
-    def get_inventory_count(self, obj):
-        """Return the number of inventory items."""
-        return obj.inventories.count()
+        return self.format_coordinate(obj.longitude)
 
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Serializer for Item model."""
     
     # Computed fields
@@ -257,6 +319,7 @@ class ItemSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'store_count', 'available_stores']
+        field_sources = {'store_count': ('stores',), 'available_stores': ()}
     
     def get_store_count(self, obj):
         """Return the number of stores that stock this item."""
@@ -278,7 +341,7 @@ class ItemSerializer(serializers.ModelSerializer):
         return value.strip() if value else value
 
 
-class InventorySerializer(serializers.ModelSerializer):
+class InventorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Serializer for Inventory model with Item and Store relationships."""
     
     # Related fields
@@ -302,6 +365,16 @@ class InventorySerializer(serializers.ModelSerializer):
             'is_available', 'stock_status', 'store_location', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'stock_status']
+        expandable_fields = ('store', 'item')
+        sideload_fields = {'store': ('stores', StoreSerializer), 'item': ('items', ItemSerializer)}
+        field_sources = {
+            'store': ('store', 'store__district_obj'),
+            'store_name': ('store__name',),
+            'item_name': ('item__name',),
+            'item_category': ('item__category',),
+            'stock_status': ('is_available',),
+            'store_location': ('store__location',),
+        }
     
     def get_stock_status(self, obj):
         """Return stock status."""
@@ -345,7 +418,7 @@ class InventorySerializer(serializers.ModelSerializer):
         return data
 
 
-class InventoryListSerializer(serializers.ModelSerializer):
+class InventoryListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Simplified serializer for inventory listing."""
     
     store_name = serializers.CharField(source='store.name', read_only=True)
@@ -360,6 +433,15 @@ class InventoryListSerializer(serializers.ModelSerializer):
             'id', 'item_name', 'item_category',
             'is_available', 'stock_status', 'store_name', 'store_address'
         ]
+        sideload_fields = {'store': ('stores', StoreSerializer), 'item': ('items', ItemSerializer)}
+        field_sources = {
+            'store': ('store', 'store__district_obj'),
+            'store_name': ('store__name',),
+            'store_address': ('store__address',),
+            'item_name': ('item__name',),
+            'item_category': ('item__category',),
+            'stock_status': ('is_available',),
+        }
     
     def get_stock_status(self, obj):
         """Return stock status."""
@@ -386,6 +468,80 @@ class SpatialSearchSerializer(serializers.Serializer):
         return value
 
 
+class NearestStoreSearchSerializer(serializers.Serializer):
+    """Serializer for nearest-store (KNN) search parameters."""
+    
+    latitude = serializers.FloatField(required=True, min_value=-90, max_value=90)
+    longitude = serializers.FloatField(required=True, min_value=-180, max_value=180)
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+    store_type = serializers.CharField(required=False, max_length=50)
+    is_active = serializers.BooleanField(required=False, allow_null=True, default=None)
+
+
+class NearestItemStoresSearchSerializer(serializers.Serializer):
+    """Serializer for nearest-stores-per-item search parameters."""
+    
+    latitude = serializers.FloatField(required=True, min_value=-90, max_value=90)
+    longitude = serializers.FloatField(required=True, min_value=-180, max_value=180)
+    items = serializers.CharField(required=True)
+    limit = serializers.IntegerField(required=False, default=3, min_value=1, max_value=20)
+    is_active = serializers.BooleanField(required=False, allow_null=True, default=True)
+    
+    def validate_items(self, value):
+        """Parse a comma-separated list of up to 50 item IDs."""
+        try:
+            item_ids = list(dict.fromkeys(int(part) for part in value.split(',') if part.strip()))
+        except ValueError:
+            raise ValidationError("items must be comma-separated item IDs.")
+        if not 1 <= len(item_ids) <= 50:
+            raise ValidationError("Provide between 1 and 50 item IDs.")
+        return item_ids
+
+
+class BasketSearchSerializer(serializers.Serializer):
+    """Serializer for basket (shopping list) search parameters."""
+    
+    items = serializers.ListField(child=serializers.JSONField(), min_length=1, max_length=50)
+    latitude = serializers.FloatField(required=True, min_value=-90, max_value=90)
+    longitude = serializers.FloatField(required=True, min_value=-180, max_value=180)
+    max_missing = serializers.IntegerField(required=False, default=0, min_value=0)
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+    radius_km = serializers.FloatField(required=False, min_value=0.1, max_value=100.0)
+    is_active = serializers.BooleanField(required=False, allow_null=True, default=True)
+    
+    def validate_items(self, value):
+        """Items are item IDs (integers) or names (strings)."""
+        for item in value:
+            if isinstance(item, bool) or not isinstance(item, (int, str)) or item == '':
+                raise ValidationError("Each item must be an item ID or a non-empty item name.")
+        return value
+    
+    def validate(self, data):
+        """Validate that at least one item must be carried."""
+        if data['max_missing'] >= len(data['items']):
+            raise ValidationError({'max_missing': 'Must be smaller than the number of items.'})
+        return data
+
+
+class StoreClusterSearchSerializer(serializers.Serializer):
+    """Serializer for map clustering parameters."""
+    
+    bbox = serializers.CharField(required=True)
+    zoom = serializers.IntegerField(required=True, min_value=0, max_value=22)
+    store_type = serializers.CharField(required=False, max_length=50)
+    is_active = serializers.BooleanField(required=False, allow_null=True, default=None)
+    
+    def validate_bbox(self, value):
+        """Parse bbox as min_lng,min_lat,max_lng,max_lat."""
+        try:
+            xmin, ymin, xmax, ymax = [float(part) for part in value.split(',')]
+        except ValueError:
+            raise ValidationError("bbox must be min_lng,min_lat,max_lng,max_lat.")
+        if not (-180 <= xmin < xmax <= 180) or not (-90 <= ymin < ymax <= 90):
+            raise ValidationError("bbox coordinates are out of range or inverted.")
+        return (xmin, ymin, xmax, ymax)
+
+
 class DistrictSearchSerializer(serializers.Serializer):
     """Serializer for district search parameters."""
     
@@ -425,7 +581,7 @@ class DistrictStatisticsSerializer(serializers.Serializer):
     average_income = serializers.FloatField()
 
 
-class StoreLocationSerializer(serializers.ModelSerializer):
+class StoreLocationSerializer(GeometryOutputMixin, serializers.ModelSerializer):
     """Simplified serializer for store location data only (for map display)."""
     
     latitude = serializers.SerializerMethodField()
@@ -441,11 +597,37 @@ class StoreLocationSerializer(serializers.ModelSerializer):
     
     def get_latitude(self, obj):
         """Return latitude coordinate."""
-        return obj.latitude
+        return self.format_coordinate(obj.latitude)
     
     def get_longitude(self, obj):
         """Return longitude coordinate."""
-        return obj.longitude 
+        return self.format_coordinate(obj.longitude)
+
+
+class NearestStoreSerializer(StoreLocationSerializer):
+    """Store location data with the distance to the search point in meters."""
+    
+    distance_m = serializers.SerializerMethodField()
+    
+    class Meta(StoreLocationSerializer.Meta):
+        fields = StoreLocationSerializer.Meta.fields + ['distance_m']
+    
+    def get_distance_m(self, obj):
+        """Return distance to the search point in meters."""
+        distance = getattr(obj, 'distance', None)
+        if distance is not None:
+            return round(distance.m, 1)
+        return None
+
+
+class BasketStoreSerializer(NearestStoreSerializer):
+    """Nearest store for a basket search, with the basket items it carries."""
+    
+    matched_item_count = serializers.IntegerField(read_only=True)
+    missing_item_ids = serializers.ListField(child=serializers.IntegerField(), read_only=True)
+    
+    class Meta(NearestStoreSerializer.Meta):
+        fields = NearestStoreSerializer.Meta.fields + ['matched_item_count', 'missing_item_ids']
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -518,16 +700,12 @@ class StoreWithReviewsSerializer(StoreListSerializer):
     """Serializer for store with reviews."""
     
     reviews = ReviewListSerializer(many=True, read_only=True)
-    review_count = serializers.SerializerMethodField()
+    review_count = serializers.IntegerField(source='approved_review_count', read_only=True)
     user_review = serializers.SerializerMethodField()
     
     class Meta(StoreListSerializer.Meta):
         fields = StoreListSerializer.Meta.fields + ['reviews', 'review_count', 'user_review']
     
-    def get_review_count(self, obj):
-        """Get count of approved reviews."""
-        return obj.reviews.filter(is_approved=True).count()
-    
     def get_user_review(self, obj):
         """Get current user's review for this store."""
         request = self.context.get('request')
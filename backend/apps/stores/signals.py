@@ -0,0 +1,48 @@
+"""
+Signal handlers for the stores app.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import District, Inventory, Item, Review, Store
+from .utils.availability_index import availability_index
+from .utils.district_index import district_index
+from .utils.response_cache import bump_cache_versions
+from .utils.statistics_cube import CUBE_MODELS, statistics_cube
+
+# Models whose cached responses a write invalidates. Inventory and review
+# writes also change the counters kept on Store by database triggers.
+CACHE_DEPENDENCIES = {
+    Store: (Store,),
+    Item: (Item,),
+    Inventory: (Inventory, Store),
+    District: (District,),
+    Review: (Review, Store),
+}
+
+
+@receiver(post_save, sender=District)
+@receiver(post_delete, sender=District)
+def invalidate_district_index(sender, **kwargs):
+    """Rebuild the in-process district index after a boundary change."""
+    district_index.invalidate()
+
+
+@receiver(post_save, sender=Inventory)
+@receiver(post_delete, sender=Inventory)
+def sync_availability_index(sender, **kwargs):
+    """Let this worker's availability bitmaps pick up the write once it is committed."""
+    transaction.on_commit(availability_index.mark_stale)
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    """Expire cached responses and the statistics cube that read the changed model."""
+    bump_cache_versions(*CACHE_DEPENDENCIES[sender])
+    if sender in CUBE_MODELS:
+        statistics_cube.invalidate()
+
+
+for model in CACHE_DEPENDENCIES:
+    post_save.connect(invalidate_cached_responses, sender=model, dispatch_uid=f'response-cache-save-{model.__name__}')
+    post_delete.connect(invalidate_cached_responses, sender=model, dispatch_uid=f'response-cache-delete-{model.__name__}')
@@ -6,7 +6,10 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
-from backend.apps.stores.views import DistrictViewSet, StoreViewSet, ItemViewSet, InventoryViewSet, ReviewViewSet, AnalyticsView
+from backend.apps.stores.views import (
+    DistrictViewSet, StoreViewSet, ItemViewSet, InventoryViewSet, ReviewViewSet, AnalyticsView, AnalyticsTrendView,
+    StatisticsView, StoreTileView
+)
 
 # Create a router and register our viewsets with it
 router = DefaultRouter()
@@ -19,11 +22,16 @@ router.register(r'reviews', ReviewViewSet)
 app_name = 'stores'
 
 urlpatterns = [
+    # Vector tiles (registered before the router so the .mvt suffix is kept)
+    path('stores/tiles/<int:z>/<int:x>/<int:y>.mvt', StoreTileView.as_view(), name='store-tiles'),
+    
     # API endpoints
     path('', include(router.urls)),
     
     # Analytics endpoint
     path('analytics/', AnalyticsView.as_view(), name='analytics'),
+    path('analytics/trends/', AnalyticsTrendView.as_view(), name='analytics-trends'),
+    path('statistics/', StatisticsView.as_view(), name='statistics'),
     
     # API documentation
     path('schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -7,15 +7,29 @@ from .spatial_helpers import (
     get_stores_by_district,
     get_store_density_by_district,
     get_nearest_stores,
+    get_nearest_stores_per_item,
+    geodesic_distance,
     get_spatial_statistics,
     optimize_spatial_queries,
 )
+from .district_index import district_index
+from .search_helpers import (
+    SearchFold,
+    build_prefix_query,
+    search_stores,
+)
 
 __all__ = [
     'get_stores_within_radius',
     'get_stores_by_district',
     'get_store_density_by_district',
     'get_nearest_stores',
+    'get_nearest_stores_per_item',
+    'geodesic_distance',
     'get_spatial_statistics',
     'optimize_spatial_queries',
+    'district_index',
+    'SearchFold',
+    'build_prefix_query',
+    'search_stores',
 ] 
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+Analytics dashboard counters.
+
+Store, district, item and inventory counts (totals and per district, store
+type and item category) are kept in ``AnalyticsCounter`` rows by database
+triggers (see migration 0016), in the same transaction as the write that
+changes them. The dashboard reads those few rows instead of aggregating the
+live tables.
+"""
+from django.db import connection, transaction
+
+from ..models import AnalyticsCounter
+
+# Same grouping as the triggers; blank values fall into these keys
+EXPECTED_COUNTERS_SQL = """
+SELECT 'total', 'stores', count(*) FROM stores_store
+UNION ALL SELECT 'total', 'active_stores', count(*) FILTER (WHERE is_active) FROM stores_store
+UNION ALL SELECT 'total', 'districts', count(*) FROM stores_district
+UNION ALL SELECT 'total', 'items', count(*) FROM stores_item
+UNION ALL SELECT 'total', 'inventory', count(*) FROM stores_inventory
+UNION ALL SELECT 'total', 'available_inventory', count(*) FILTER (WHERE is_available) FROM stores_inventory
+UNION ALL SELECT 'district', COALESCE(NULLIF(district, ''), 'Unknown'), count(*) FROM stores_store GROUP BY 2
+UNION ALL SELECT 'store_type', COALESCE(NULLIF(store_type, ''), 'unknown'), count(*) FROM stores_store GROUP BY 2
+UNION ALL SELECT 'category', COALESCE(NULLIF(it.category, ''), 'other'), count(*)
+    FROM stores_inventory i LEFT JOIN stores_item it ON it.id = i.item_id GROUP BY 2
+"""
+
+COUNTED_TABLES = ('stores_store', 'stores_district', 'stores_item', 'stores_inventory')
+
+
+def get_analytics_counters():
+    """
+    Read the maintained counters.
+
+    Returns:
+        Dictionary of scope -> {key: value}, leaving out zero counts
+    """
+    counters = {}
+    rows = AnalyticsCounter.objects.exclude(value=0).values_list('scope', 'key', 'value')  # type: ignore[attribute-defined]
+    for scope, key, value in rows:
+        counters.setdefault(scope, {})[key] = value
+    return counters
+
+
+def compute_expected_counters():
+    """Recount every counter from the live tables, as {(scope, key): value}."""
+    with connection.cursor() as cursor:
+        cursor.execute(EXPECTED_COUNTERS_SQL)
+        return {(scope, key): value for scope, key, value in cursor.fetchall() if value}
+
+
+def verify_analytics_counters():
+    """
+    Compare the maintained counters with the live tables.
+
+    Returns:
+        List of (scope, key, stored, expected) for every counter that differs
+    """
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if outermost:
+            # One snapshot for the counters and the tables they count
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        expected = compute_expected_counters()
+        stored = {
+            (scope, key): value
+            for scope, key, value in AnalyticsCounter.objects.exclude(value=0).values_list('scope', 'key', 'value')  # type: ignore[attribute-defined]
+        }
+    return [
+        (scope, key, stored.get((scope, key), 0), expected.get((scope, key), 0))
+        for scope, key in sorted(set(stored) | set(expected))
+        if stored.get((scope, key), 0) != expected.get((scope, key), 0)
+    ]
+
+
+def rebuild_analytics_counters():
+    """
+    Recount every counter from the live tables.
+
+    Writes to the counted tables wait until the rebuild commits, so no change
+    is lost between the recount and the replacement of the counters.
+
+    Returns:
+        Number of counters written
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {', '.join(COUNTED_TABLES)} IN SHARE MODE")
+        expected = compute_expected_counters()
+        AnalyticsCounter.objects.all().delete()  # type: ignore[attribute-defined]
+        AnalyticsCounter.objects.bulk_create([  # type: ignore[attribute-defined]
+            AnalyticsCounter(scope=scope, key=key, value=value)
+            for (scope, key), value in sorted(expected.items())
+        ])
+    return len(expected)
+
+
+def build_analytics_payload(counters):
+    """Shape the counters as the analytics endpoint response."""
+    totals = counters.get(AnalyticsCounter.SCOPE_TOTAL, {})
+    total_stores = totals.get('stores', 0)
+    active_stores = totals.get('active_stores', 0)
+    total_districts = totals.get('districts', 0)
+    total_inventory_items = totals.get('inventory', 0)
+    available_inventory_items = totals.get('available_inventory', 0)
+
+    stores_by_district = dict(sorted(
+        counters.get(AnalyticsCounter.SCOPE_DISTRICT, {}).items(), key=lambda x: x[1], reverse=True
+    ))
+    stores_by_type = dict(sorted(
+        counters.get(AnalyticsCounter.SCOPE_STORE_TYPE, {}).items(), key=lambda x: x[1], reverse=True
+    ))
+    inventory_by_category = dict(sorted(
+        counters.get(AnalyticsCounter.SCOPE_CATEGORY, {}).items(), key=lambda x: x[1], reverse=True
+    ))
+
+    top_districts = [
+        {'name': district, 'count': count}
+        for district, count in list(stores_by_district.items())[:5]
+    ]
+    top_store_types = [
+        {
+            'type': store_type,
+            'count': count,
+            'percentage': round((count / total_stores * 100) if total_stores > 0 else 0, 1),
+        }
+        for store_type, count in stores_by_type.items()
+    ]
+
+    average_stores_per_district = total_stores / total_districts if total_districts > 0 else 0
+    inventory_availability_rate = (available_inventory_items / total_inventory_items * 100) if total_inventory_items > 0 else 0
+    average_inventory_per_store = total_inventory_items / total_stores if total_stores > 0 else 0
+
+    return {
+        'totalStores': total_stores,
+        'activeStores': active_stores,
+        'inactiveStores': total_stores - active_stores,
+        'totalDistricts': total_districts,
+        'totalInventoryItems': total_inventory_items,
+        'availableInventoryItems': available_inventory_items,
+        'unavailableInventoryItems': total_inventory_items - available_inventory_items,
+        'storesByDistrict': stores_by_district,
+        'storesByType': stores_by_type,
+        'averageStoresPerDistrict': round(average_stores_per_district, 2),
+        'topDistricts': top_districts,
+        'inventoryAvailabilityRate': round(inventory_availability_rate, 1),
+        'topStoreTypes': top_store_types,
+        'inventoryByCategory': inventory_by_category,
+        'totalItems': totals.get('items', 0),
+        'averageInventoryPerStore': round(average_inventory_per_store, 1),
+    }
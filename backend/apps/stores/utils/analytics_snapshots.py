@@ -0,0 +1,120 @@
+"""
+Daily analytics snapshots and trends.
+
+``take_snapshot`` writes one row per day for the totals and for each district,
+store type and item category (a few dozen rows a day). Trends read one series
+per key from the (scope, key, date) unique index, and long ranges are
+downsampled in the database to the last snapshot of each week or month, so a
+chart costs the same few hundred points whatever the history length.
+"""
+
+from django.db import connection, transaction
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from ..models import AnalyticsSnapshot
+
+# Snapshot metric -> column, named like the AnalyticsView fields
+TREND_METRICS = {
+    'totalStores': 'store_count',
+    'activeStores': 'active_store_count',
+    'totalInventoryItems': 'inventory_count',
+    'availableInventoryItems': 'available_inventory_count',
+    'totalDistricts': 'district_count',
+    'totalItems': 'item_count',
+}
+
+TREND_INTERVALS = ('day', 'week', 'month')
+# Widest range (in days) served at each interval when interval=auto
+AUTO_INTERVAL_MAX_DAYS = (('day', 180), ('week', 3 * 365))
+
+SNAPSHOT_SQL = """
+INSERT INTO stores_analyticssnapshot
+    (date, scope, key, store_count, active_store_count, inventory_count, available_inventory_count,
+     district_count, item_count)
+SELECT %(date)s, 'total', '', count(*), count(*) FILTER (WHERE is_active),
+       COALESCE(sum(inventory_count), 0), COALESCE(sum(available_inventory_count), 0),
+       (SELECT count(*) FROM stores_district), (SELECT count(*) FROM stores_item)
+FROM stores_store
+UNION ALL
+SELECT %(date)s, 'district', COALESCE(NULLIF(district, ''), 'Unknown'), count(*), count(*) FILTER (WHERE is_active),
+       sum(inventory_count), sum(available_inventory_count), NULL, NULL
+FROM stores_store GROUP BY 3
+UNION ALL
+SELECT %(date)s, 'store_type', COALESCE(NULLIF(store_type, ''), 'unknown'), count(*), count(*) FILTER (WHERE is_active),
+       sum(inventory_count), sum(available_inventory_count), NULL, NULL
+FROM stores_store GROUP BY 3
+UNION ALL
+SELECT %(date)s, 'category', COALESCE(NULLIF(it.category, ''), 'other'),
+       count(DISTINCT i.store_id), count(DISTINCT i.store_id) FILTER (WHERE s.is_active),
+       count(*), count(*) FILTER (WHERE i.is_available), NULL, NULL
+FROM stores_inventory i
+JOIN stores_store s ON s.id = i.store_id
+LEFT JOIN stores_item it ON it.id = i.item_id
+GROUP BY 3
+"""
+
+
+def take_snapshot(date=None):
+    """
+    Record the analytics metrics for ``date`` (default today), replacing any
+    snapshot already taken that day.
+
+    Store-level totals come from the per-store inventory counters, so only the
+    category breakdown scans stores_inventory.
+
+    Returns:
+        Number of snapshot rows written
+    """
+    date = date or timezone.localdate()
+    with transaction.atomic():
+        AnalyticsSnapshot.objects.filter(date=date).delete()  # type: ignore[attribute-defined]
+        with connection.cursor() as cursor:
+            cursor.execute(SNAPSHOT_SQL, {'date': date})
+            return cursor.rowcount
+
+
+def choose_interval(start, end):
+    """The finest interval that keeps a range to a few hundred points."""
+    days = (end - start).days
+    for interval, max_days in AUTO_INTERVAL_MAX_DAYS:
+        if days <= max_days:
+            return interval
+    return 'month'
+
+
+def get_trends(scope, keys, start, end, metrics, interval):
+    """
+    Time series of snapshot metrics.
+
+    Args:
+        scope: Snapshot scope, e.g. ``'district'``
+        keys: Keys to return a series for; None for every key in the scope
+        start, end: Inclusive date range
+        metrics: Names from TREND_METRICS
+        interval: ``'day'``, ``'week'`` or ``'month'``; each point is the last
+            snapshot taken in its interval
+
+    Returns:
+        List of {'key': ..., 'points': [{'date': ..., metric: value, ...}]}
+    """
+    queryset = AnalyticsSnapshot.objects.filter(scope=scope, date__range=(start, end))  # type: ignore[attribute-defined]
+    if keys is not None:
+        queryset = queryset.filter(key__in=keys)
+    columns = [TREND_METRICS[metric] for metric in metrics]
+    if interval != 'day':
+        # Last snapshot per key and bucket (DISTINCT ON)
+        queryset = queryset.annotate(bucket=Trunc('date', interval)).order_by(
+            'key', 'bucket', '-date'
+        ).distinct('key', 'bucket')
+    rows = queryset.values_list('key', 'date', *columns)
+
+    series = {}
+    for key, date, *values in rows:
+        point = {'date': date}
+        point.update(zip(metrics, values))
+        series.setdefault(key, []).append(point)
+    return [
+        {'key': key, 'points': sorted(points, key=lambda point: point['date'])}
+        for key, points in sorted(series.items())
+    ]
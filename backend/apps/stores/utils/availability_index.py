@@ -0,0 +1,196 @@
+"""
+In-process bitmaps of where each item is available.
+
+For every item, each worker keeps a compressed (Roaring) bitmap of the ids of
+the stores where it is available, so "stores having all of A, B and C",
+"stores having any of them" and "how many of these stores carry X" are
+bitmap intersections and counts rather than join + DISTINCT queries.
+
+The bitmaps are loaded with one query and then kept in sync from the
+``stores_inventoryavailabilitychange`` feed that triggers on stores_inventory
+append to (see migration 0018): every ``SYNC_INTERVAL`` seconds, and right
+after an inventory write in this worker, the entries past the last one seen are
+replayed in id order.
+
+Ids are handed out before commit, so an entry can become visible after a
+higher id was already read. Missing ids are re-checked until they show up or
+``GAP_TIMEOUT`` passes (rolled-back writes leave permanent gaps), and the
+bitmaps are rebuilt from scratch every ``REBUILD_INTERVAL`` seconds as a
+backstop. Feed entries older than ``FEED_RETENTION`` seconds are pruned by
+``manage.py prune_availability_changes`` (see ``prune_availability_changes``).
+
+The bitmaps handed out are read-only snapshots; copy them before changing them.
+"""
+import operator
+import threading
+import time
+from functools import reduce
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from pyroaring import BitMap, FrozenBitMap
+
+SYNC_INTERVAL = 1
+GAP_TIMEOUT = 120
+MAX_TRACKED_GAPS = 10000
+REBUILD_INTERVAL = 15 * 60
+FEED_RETENTION = 60 * 60
+
+LOAD_SQL = """
+SELECT item_id, array_agg(store_id) FROM stores_inventory
+WHERE is_available
+GROUP BY item_id
+"""
+
+RESUME_POSITION_SQL = """
+SELECT COALESCE(
+    max(id) FILTER (WHERE created_at < clock_timestamp() - make_interval(secs => %s)),
+    min(id) - 1,
+    0
+) FROM stores_inventoryavailabilitychange
+"""
+
+FEED_SQL = """
+SELECT id, item_id, store_id, is_available FROM stores_inventoryavailabilitychange
+WHERE id > %s OR id = ANY(%s)
+ORDER BY id
+"""
+
+PRUNE_SQL = """
+DELETE FROM stores_inventoryavailabilitychange
+WHERE created_at < now() - make_interval(secs => %s)
+"""
+
+EMPTY = FrozenBitMap()
+
+
+def store_ids_filter(store_ids):
+    """
+    Q object restricting stores to ``store_ids``.
+
+    The ids are sent as a single array parameter rather than one bind
+    parameter per id, so filtering on a popular item's thousands of stores
+    stays one small statement.
+    """
+    return Q(id__in=RawSQL('SELECT unnest(%s::bigint[])', [list(store_ids)]))
+
+
+def prune_availability_changes(retention=FEED_RETENTION):
+    """
+    Delete change feed entries older than ``retention`` seconds.
+
+    Workers rebuild from stores_inventory at least every ``REBUILD_INTERVAL``
+    seconds, so entries older than that are no longer replayed.
+
+    Returns:
+        Number of entries deleted
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(PRUNE_SQL, [retention])
+        return cursor.rowcount
+
+
+class AvailabilityIndex:
+    """Per-worker item -> available store ids bitmaps."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bitmaps = None
+        self._last_id = 0
+        self._gaps = {}
+        self._built_at = 0.0
+        self._synced_at = 0.0
+
+    def mark_stale(self):
+        """Replay the change feed before the next read (after a local inventory write)."""
+        self._synced_at = 0.0
+
+    def invalidate(self):
+        """Drop the bitmaps; they are rebuilt from stores_inventory on next use."""
+        with self._lock:
+            self._bitmaps = None
+
+    def stores_with_item(self, item_id):
+        """Bitmap of stores where ``item_id`` is available."""
+        return FrozenBitMap(self._get().get(item_id, EMPTY))
+
+    def stores_with_all(self, item_ids):
+        """Bitmap of stores where every item in ``item_ids`` is available."""
+        bitmaps = self._get()
+        item_ids = list(item_ids)
+        if not item_ids:
+            return EMPTY
+        return FrozenBitMap(reduce(operator.and_, sorted((bitmaps.get(item_id, EMPTY) for item_id in item_ids), key=len)))
+
+    def stores_with_any(self, item_ids):
+        """Bitmap of stores where at least one item in ``item_ids`` is available."""
+        bitmaps = self._get()
+        return FrozenBitMap(reduce(operator.or_, (bitmaps.get(item_id, EMPTY) for item_id in item_ids), EMPTY))
+
+    def count_stores(self, item_id, store_ids=None):
+        """Number of stores (optionally among the ``store_ids`` bitmap) where ``item_id`` is available."""
+        stores = self._get().get(item_id, EMPTY)
+        if store_ids is None:
+            return len(stores)
+        return stores.intersection_cardinality(store_ids)
+
+    def items_in_stock(self, item_ids=None):
+        """Number of items (optionally among ``item_ids``) available in at least one store."""
+        bitmaps = self._get()
+        if item_ids is None:
+            return sum(1 for stores in bitmaps.values() if stores)
+        return sum(1 for item_id in item_ids if bitmaps.get(item_id))
+
+    def _get(self):
+        now = time.monotonic()
+        if self._bitmaps is not None and now - self._synced_at < SYNC_INTERVAL:
+            return self._bitmaps
+        with self._lock:
+            if self._bitmaps is None or now - self._built_at >= REBUILD_INTERVAL:
+                self._build()
+            elif now - self._synced_at >= SYNC_INTERVAL:
+                self._sync()
+            return self._bitmaps
+
+    def _build(self):
+        with connection.cursor() as cursor:
+            # Start replaying from before any entry that may still have been
+            # uncommitted; replaying entries the load already reflects is harmless
+            cursor.execute(RESUME_POSITION_SQL, [GAP_TIMEOUT])
+            last_id = cursor.fetchone()[0]
+            cursor.execute(LOAD_SQL)
+            bitmaps = {item_id: BitMap(store_ids) for item_id, store_ids in cursor.fetchall()}
+        self._bitmaps = bitmaps
+        self._last_id = last_id
+        self._gaps = {}
+        self._built_at = time.monotonic()
+        self._sync()
+
+    def _sync(self):
+        now = time.monotonic()
+        self._gaps = {gap: seen for gap, seen in self._gaps.items() if now - seen < GAP_TIMEOUT}
+        with connection.cursor() as cursor:
+            cursor.execute(FEED_SQL, [self._last_id, list(self._gaps)])
+            changes = cursor.fetchall()
+
+        bitmaps = self._bitmaps
+        expected = self._last_id + 1
+        for change_id, item_id, store_id, is_available in changes:
+            if is_available:
+                bitmaps.setdefault(item_id, BitMap()).add(store_id)
+            elif item_id in bitmaps:
+                bitmaps[item_id].discard(store_id)
+            if change_id in self._gaps:
+                del self._gaps[change_id]
+            elif change_id > self._last_id:
+                for missing in range(expected, change_id):
+                    self._gaps[missing] = now
+                expected = change_id + 1
+                self._last_id = change_id
+        if len(self._gaps) > MAX_TRACKED_GAPS:
+            self._built_at = 0.0  # Rebuild rather than track that many ids
+        self._synced_at = now
+
+
+availability_index = AvailabilityIndex()
@@ -0,0 +1,136 @@
+"""
+Basket search: the nearest stores where every item on a shopping list is available.
+
+Which stores carry the basket is answered from the availability bitmaps
+(an intersection, or per-store counts when some items may be missing), and
+only the nearest of those stores are read from the database:
+
+* a small candidate set is filtered by id and ordered with the KNN operator;
+* a large one is found by walking stores nearest-first through the
+  geography GiST index and keeping the candidates, reading further batches
+  (each continuing after the last store of the previous one) until enough
+  are found.
+"""
+import numpy as np
+from django.contrib.gis.db.models.functions import Distance, GeometryDistance
+from django.contrib.gis.measure import D
+from django.db.models import Q
+from pyroaring import BitMap
+
+from ..models import Item, Store
+from .availability_index import availability_index
+
+# Candidate sets up to this size are filtered by id in SQL
+MAX_ID_FILTER = 5000
+# The first nearest-first batch reads this many stores per requested result,
+# and each further batch this many times more than the previous one
+SCAN_FACTOR = 8
+
+
+def resolve_basket_items(values):
+    """
+    Resolve a shopping list of item ids and/or names.
+
+    Names match case-insensitively. Duplicates are dropped, keeping list order.
+
+    Returns:
+        Tuple of (list of Items, list of values that matched no item)
+    """
+    ids = {value for value in values if isinstance(value, int)}
+    names = {value.lower() for value in values if isinstance(value, str)}
+    query = Q(id__in=ids)
+    for name in names:
+        query |= Q(name__iexact=name)
+    items = list(Item.objects.filter(query)) if values else []  # type: ignore[attribute-defined]
+    by_id = {item.id: item for item in items}
+    by_name = {item.name.lower(): item for item in items}
+
+    resolved, unknown, seen = [], [], set()
+    for value in values:
+        item = by_id.get(value) if isinstance(value, int) else by_name.get(value.lower())
+        if item is None:
+            unknown.append(value)
+        elif item.id not in seen:
+            seen.add(item.id)
+            resolved.append(item)
+    return resolved, unknown
+
+
+def get_basket_coverage(item_ids, max_missing=0):
+    """
+    Stores carrying at least ``len(item_ids) - max_missing`` of the items.
+
+    Returns:
+        Tuple of (bitmap of store ids, dict of store id -> number of items
+        carried, or None when every candidate carries them all)
+    """
+    if max_missing == 0:
+        return availability_index.stores_with_all(item_ids), None
+    bitmaps = [availability_index.stores_with_item(item_id) for item_id in item_ids]
+    store_ids = np.concatenate([
+        np.fromiter(bitmap, dtype=np.int64, count=len(bitmap)) for bitmap in bitmaps
+    ]) if bitmaps else np.empty(0, dtype=np.int64)
+    stores, counts = np.unique(store_ids, return_counts=True)
+    keep = counts >= len(item_ids) - max_missing
+    coverage = dict(zip(stores[keep].tolist(), counts[keep].tolist()))
+    return BitMap(coverage), coverage
+
+
+def find_basket_stores(point, item_ids, max_missing=0, limit=10, radius_km=None, is_active=True):
+    """
+    Find the nearest stores carrying a basket of items.
+
+    Args:
+        point: Point (longitude, latitude) in SRID 4326
+        item_ids: Items on the shopping list
+        max_missing: Also accept stores missing up to this many items
+        limit: Maximum number of stores to return
+        radius_km: Optional search radius
+        is_active: Filter by active status (None for no filter)
+
+    Returns:
+        List of Stores annotated with ``distance``, ``matched_item_count`` and
+        ``missing_item_ids``, ranked by distance then by items carried
+    """
+    candidates, coverage = get_basket_coverage(item_ids, max_missing)
+    if not candidates:
+        return []
+
+    queryset = Store.objects.filter(location_geog__isnull=False)  # type: ignore[attribute-defined]
+    if is_active is not None:
+        queryset = queryset.filter(is_active=is_active)
+    if radius_km:
+        queryset = queryset.filter(location_geog__dwithin=(point, D(km=radius_km)))
+    nearest_first = GeometryDistance('location_geog', point)
+
+    if len(candidates) <= MAX_ID_FILTER:
+        stores = list(
+            queryset.filter(id__in=list(candidates))
+            .annotate(distance=Distance('location_geog', point))
+            .order_by(nearest_first)[:limit]
+        )
+    else:
+        nearest = queryset.annotate(knn=nearest_first).order_by('knn', 'id')
+        matched, after, batch = [], Q(), limit * SCAN_FACTOR
+        while True:
+            scanned = list(nearest.filter(after).values_list('id', 'knn')[:batch])
+            matched += [store_id for store_id, _ in scanned if store_id in candidates]
+            if len(matched) >= limit or len(scanned) < batch:
+                break
+            # Keyset: the next batch starts after the last (distance, id) read
+            last_id, last_knn = scanned[-1]
+            after = Q(knn__gt=last_knn) | Q(knn=last_knn, id__gt=last_id)
+            batch *= SCAN_FACTOR
+        matched = matched[:limit]
+        by_id = queryset.filter(id__in=matched).annotate(distance=Distance('location_geog', point)).in_bulk()
+        stores = [by_id[store_id] for store_id in matched]
+
+    carried = {item_id: availability_index.stores_with_item(item_id) for item_id in item_ids} if coverage else {}
+    for store in stores:
+        store.matched_item_count = coverage[store.id] if coverage is not None else len(item_ids)
+        store.missing_item_ids = [
+            item_id for item_id in item_ids
+            if store.id not in carried[item_id]
+        ] if store.matched_item_count < len(item_ids) else []
+    stores.sort(key=lambda store: (store.distance.m, -store.matched_item_count))
+    return stores
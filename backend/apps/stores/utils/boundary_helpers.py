@@ -0,0 +1,74 @@
+"""
+Levels of detail for district boundaries.
+
+Besides the full-resolution ``boundary``, each district stores copies simplified
+with ``ST_SimplifyPreserveTopology`` at the tolerances below (in degrees). They
+are maintained by a database trigger (migration 0013), so clients can ask for
+coarse outlines at overview zoom instead of downloading the full polygons.
+"""
+from rest_framework.exceptions import ValidationError
+
+# detail level -> (model field, simplification tolerance in degrees)
+BOUNDARY_DETAIL_LEVELS = {
+    'low': ('boundary_low', 0.002),        # ~200 m, city overview
+    'medium': ('boundary_medium', 0.0005),  # ~50 m
+    'high': ('boundary_high', 0.0001),      # ~10 m
+    'full': ('boundary', None),
+}
+DEFAULT_BOUNDARY_DETAIL = 'full'
+
+# Minimum web-map zoom level for each detail level, finest first
+ZOOM_DETAIL_THRESHOLDS = (
+    (15, 'full'),
+    (13, 'high'),
+    (11, 'medium'),
+    (0, 'low'),
+)
+
+GEOMETRY_FORMATS = ('wkt', 'geojson', 'both', 'none')
+DEFAULT_GEOMETRY_FORMAT = 'both'
+
+
+def detail_for_zoom(zoom):
+    """Return the boundary detail level suited to a web-map zoom level."""
+    for min_zoom, detail in ZOOM_DETAIL_THRESHOLDS:
+        if zoom >= min_zoom:
+            return detail
+    return 'low'
+
+
+def boundary_field_for_detail(detail):
+    """Return the District field holding the boundary at a detail level."""
+    return BOUNDARY_DETAIL_LEVELS[detail][0]
+
+
+def get_boundary_options(query_params):
+    """
+    Read boundary detail and geometry encoding from request query parameters.
+
+    ``detail`` (low/medium/high/full) wins over ``zoom``; ``geometry`` picks
+    the encoding (wkt, geojson, both or none).
+
+    Returns:
+        Tuple of (detail, geometry_format)
+
+    Raises:
+        ValidationError: If a parameter has an unsupported value
+    """
+    detail = query_params.get('detail')
+    zoom = query_params.get('zoom')
+    if detail:
+        if detail not in BOUNDARY_DETAIL_LEVELS:
+            raise ValidationError({'detail': f"Must be one of: {', '.join(BOUNDARY_DETAIL_LEVELS)}."})
+    elif zoom not in (None, ''):
+        try:
+            detail = detail_for_zoom(int(zoom))
+        except ValueError:
+            raise ValidationError({'zoom': 'Must be an integer.'})
+    else:
+        detail = DEFAULT_BOUNDARY_DETAIL
+
+    geometry_format = query_params.get('geometry') or DEFAULT_GEOMETRY_FORMAT
+    if geometry_format not in GEOMETRY_FORMATS:
+        raise ValidationError({'geometry': f"Must be one of: {', '.join(GEOMETRY_FORMATS)}."})
+    return detail, geometry_format
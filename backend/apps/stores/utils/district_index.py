@@ -0,0 +1,208 @@
+"""
+In-process spatial index of district boundaries for point-in-district lookups.
+
+District boundaries rarely change, so each worker keeps the boundaries as
+prepared GEOS geometries behind a bounding-box filter and answers lookups
+without a database round trip. The index is rebuilt lazily after a District
+is saved or deleted (see ``signals.py``); other workers notice through a
+version stamp in the shared cache, checked at most every
+``VERSION_CHECK_INTERVAL`` seconds.
+"""
+import logging
+import threading
+import time
+
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from ..models import District
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = 'stores:district-index:version'
+VERSION_CHECK_INTERVAL = 30
+
+BATCH_LOOKUP_SQL = """
+SELECT p.position, d.id
+FROM unnest(%s::double precision[], %s::double precision[]) WITH ORDINALITY AS p(lng, lat, position)
+LEFT JOIN LATERAL (
+    SELECT d.id FROM stores_district d
+    WHERE ST_Contains(d.boundary, ST_SetSRID(ST_MakePoint(p.lng, p.lat), 4326)) {active}
+    ORDER BY d.id
+    LIMIT 1
+) d ON true
+"""
+
+
+class _DistrictEntry:
+    """A district with its prepared boundary and bounding box."""
+
+    __slots__ = ('district', 'boundary', 'prepared', 'extent')
+
+    def __init__(self, district, boundary):
+        self.district = district
+        self.boundary = boundary
+        self.prepared = boundary.prepared
+        self.extent = boundary.extent
+
+    def may_contain(self, x, y):
+        xmin, ymin, xmax, ymax = self.extent
+        return xmin <= x <= xmax and ymin <= y <= ymax
+
+
+class DistrictIndex:
+    """Per-worker index of district boundaries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        """Drop the local index and, once committed, tell other workers to rebuild theirs."""
+        with self._lock:
+            self._entries = None
+        transaction.on_commit(self._publish_version)
+
+    def _publish_version(self):
+        version = time.time()
+        with self._lock:
+            self._entries = None
+            self._version = version
+        try:
+            cache.set(VERSION_CACHE_KEY, version, None)
+        except Exception as e:
+            logger.warning('Could not publish district index version: %s', e)
+
+    def lookup(self, point, active_only=True):
+        """
+        Find the district containing a point.
+
+        Args:
+            point: Point object (longitude, latitude) in SRID 4326
+            active_only: Only consider active districts
+
+        Returns:
+            District, or None if no district contains the point
+        """
+        entries = self._get_entries()
+        if entries is None:
+            return self._lookup_db(point, active_only)
+
+        x, y = point.x, point.y
+        for entry in entries:
+            if active_only and not entry.district.is_active:
+                continue
+            if entry.may_contain(x, y) and entry.prepared.contains(point):
+                return entry.district
+        return None
+
+    def lookup_many(self, coordinates, active_only=True):
+        """
+        Resolve the containing district for many points in one pass.
+
+        Args:
+            coordinates: Sequence of (longitude, latitude) pairs in SRID 4326
+            active_only: Only consider active districts
+
+        Returns:
+            List of District (or None) aligned with ``coordinates``
+        """
+        entries = self._get_entries()
+        if entries is None:
+            return self._lookup_many_db(coordinates, active_only)
+        if active_only:
+            entries = [entry for entry in entries if entry.district.is_active]
+
+        resolved = {}
+        districts = []
+        for x, y in coordinates:
+            key = (x, y)
+            if key not in resolved:
+                resolved[key] = None
+                candidates = [entry for entry in entries if entry.may_contain(x, y)]
+                if candidates:
+                    point = Point(x, y, srid=4326)
+                    for entry in candidates:
+                        if entry.prepared.contains(point):
+                            resolved[key] = entry.district
+                            break
+            districts.append(resolved[key])
+        return districts
+
+    def nearest(self, point):
+        """Return the district whose boundary is closest to a point (planar degrees)."""
+        entries = self._get_entries()
+        if entries is None:
+            return District.objects.filter(boundary__isnull=False).extra(  # type: ignore
+                select={'distance': 'ST_Distance(boundary, ST_GeomFromText(%s, 4326))'},
+                select_params=[point.wkt],
+                order_by=['distance']
+            ).first()
+        if not entries:
+            return None
+        return min(entries, key=lambda entry: entry.boundary.distance(point)).district
+
+    def _lookup_db(self, point, active_only):
+        """Fallback containment query against PostGIS."""
+        queryset = District.objects.filter(boundary__contains=point)  # type: ignore
+        if active_only:
+            queryset = queryset.filter(is_active=True)
+        return queryset.first()
+
+    def _lookup_many_db(self, coordinates, active_only):
+        """Fallback: one spatial join of all points against district boundaries."""
+        if not coordinates:
+            return []
+        longitudes = [x for x, _ in coordinates]
+        latitudes = [y for _, y in coordinates]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                BATCH_LOOKUP_SQL.format(active='AND d.is_active' if active_only else ''),
+                [longitudes, latitudes],
+            )
+            matches = dict(cursor.fetchall())
+        districts = District.objects.in_bulk(set(matches.values()) - {None})
+        return [districts.get(matches.get(position)) for position in range(1, len(coordinates) + 1)]
+
+    def _get_entries(self):
+        self._check_version()
+        entries = self._entries
+        if entries is not None:
+            return entries
+        with self._lock:
+            if self._entries is None:
+                try:
+                    self._entries = self._build()
+                except Exception as e:
+                    logger.warning('Could not build district index, using database lookups: %s', e)
+                    return None
+            return self._entries
+
+    def _build(self):
+        entries = []
+        for district in District.objects.filter(boundary__isnull=False).order_by('id'):  # type: ignore
+            boundary = district.boundary
+            if boundary.srid not in (None, 4326):
+                boundary = boundary.transform(4326, clone=True)
+            entries.append(_DistrictEntry(district, boundary))
+        return entries
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        try:
+            version = cache.get(VERSION_CACHE_KEY)
+        except Exception:
+            return
+        if version != self._version:
+            with self._lock:
+                self._entries = None
+                self._version = version
+
+
+district_index = DistrictIndex()
@@ -0,0 +1,291 @@
+"""
+Compact geometry encodings for map clients.
+
+Besides WKT/GeoJSON, district and store geometries can be returned as:
+
+* TopoJSON: borders shared by adjacent districts are stored once as arcs, and
+  coordinates are quantized to integers on a grid and delta-encoded.
+* Encoded polylines (Google polyline algorithm): each ring or point becomes a
+  short ASCII string.
+
+Both are produced from the GeoJSON the serializers already emit, and both honor
+the ``precision`` query parameter (decimal places kept per coordinate).
+"""
+from rest_framework.exceptions import ValidationError
+
+MAX_COORDINATE_PRECISION = 15
+DEFAULT_TOPOJSON_PRECISION = 6   # ~0.1 m
+DEFAULT_POLYLINE_PRECISION = 5   # ~1 m, the usual polyline precision
+
+
+def get_coordinate_precision(query_params, default=None):
+    """
+    Read the ``precision`` query parameter (decimal places per coordinate).
+
+    Raises:
+        ValidationError: If precision is not an integer between 0 and 15
+    """
+    value = query_params.get('precision')
+    if value in (None, ''):
+        return default
+    try:
+        precision = int(value)
+    except ValueError:
+        raise ValidationError({'precision': 'Must be an integer.'})
+    if not 0 <= precision <= MAX_COORDINATE_PRECISION:
+        raise ValidationError({'precision': f'Must be between 0 and {MAX_COORDINATE_PRECISION}.'})
+    return precision
+
+
+def round_coordinates(coordinates, precision):
+    """Round a (possibly nested) GeoJSON coordinate array to ``precision`` decimals."""
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return [round(value, precision) for value in coordinates]
+    return [round_coordinates(part, precision) for part in coordinates]
+
+
+def _encode_value(value):
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return ''.join(chunks)
+
+
+def encode_polyline(points, precision=DEFAULT_POLYLINE_PRECISION):
+    """
+    Encode (longitude, latitude) points with the Google polyline algorithm.
+
+    Points are written in the conventional latitude, longitude order.
+    """
+    factor = 10 ** precision
+    encoded = []
+    prev_lat = prev_lng = 0
+    for point in points:
+        lat = int(round(point[1] * factor))
+        lng = int(round(point[0] * factor))
+        encoded.append(_encode_value(lat - prev_lat))
+        encoded.append(_encode_value(lng - prev_lng))
+        prev_lat, prev_lng = lat, lng
+    return ''.join(encoded)
+
+
+def encode_geometry_polyline(geometry, precision=DEFAULT_POLYLINE_PRECISION):
+    """
+    Encode a GeoJSON geometry as polylines, keeping its nesting.
+
+    Returns:
+        Dict with ``type`` and ``polylines``: a string for a Point/LineString, a
+        list of ring strings for a Polygon, and a list of those for MultiPolygon
+    """
+    geom_type = geometry['type']
+    coordinates = geometry['coordinates']
+    if geom_type == 'Point':
+        polylines = encode_polyline([coordinates], precision)
+    elif geom_type == 'LineString':
+        polylines = encode_polyline(coordinates, precision)
+    elif geom_type == 'Polygon':
+        polylines = [encode_polyline(ring, precision) for ring in coordinates]
+    elif geom_type == 'MultiPolygon':
+        polylines = [[encode_polyline(ring, precision) for ring in polygon] for polygon in coordinates]
+    else:
+        raise ValueError(f'Unsupported geometry type for polyline encoding: {geom_type}')
+    return {'type': geom_type, 'precision': precision, 'polylines': polylines}
+
+
+class _TopologyBuilder:
+    """Builds a quantized TopoJSON topology with shared arcs from GeoJSON geometries."""
+
+    def __init__(self, precision):
+        self.scale = 10 ** -precision
+        self.origin = None
+        self.arcs = []
+        self.arc_index = {}
+
+    def build(self, object_name, features):
+        """
+        Args:
+            object_name: Name of the geometry collection in ``objects``
+            features: Iterable of (id, geojson_geometry_or_None, properties)
+        """
+        features = list(features)
+        points = [
+            point
+            for _, geometry, _ in features if geometry
+            for point in self._iter_points(geometry)
+        ]
+        self.origin = (
+            min((x for x, _ in points), default=0.0),
+            min((y for _, y in points), default=0.0),
+        )
+
+        quantized = [
+            (feature_id, self._quantize_geometry(geometry) if geometry else None, properties)
+            for feature_id, geometry, properties in features
+        ]
+        rings = [
+            ring
+            for _, geometry, _ in quantized if geometry and geometry['type'] in ('Polygon', 'MultiPolygon')
+            for ring in self._iter_rings(geometry)
+        ]
+        junctions = self._find_junctions(rings)
+
+        geometries = []
+        for feature_id, geometry, properties in quantized:
+            if geometry is None:
+                topo_geometry = {'type': None}
+            elif geometry['type'] == 'Point':
+                topo_geometry = {'type': 'Point', 'coordinates': list(geometry['coordinates'])}
+            elif geometry['type'] == 'Polygon':
+                topo_geometry = {
+                    'type': 'Polygon',
+                    'arcs': [self._ring_arcs(ring, junctions) for ring in geometry['coordinates']],
+                }
+            elif geometry['type'] == 'MultiPolygon':
+                topo_geometry = {
+                    'type': 'MultiPolygon',
+                    'arcs': [
+                        [self._ring_arcs(ring, junctions) for ring in polygon]
+                        for polygon in geometry['coordinates']
+                    ],
+                }
+            else:
+                raise ValueError(f"Unsupported geometry type for TopoJSON: {geometry['type']}")
+            topo_geometry['id'] = feature_id
+            topo_geometry['properties'] = properties
+            geometries.append(topo_geometry)
+
+        return {
+            'type': 'Topology',
+            'transform': {
+                'scale': [self.scale, self.scale],
+                'translate': list(self.origin),
+            },
+            'objects': {
+                object_name: {'type': 'GeometryCollection', 'geometries': geometries},
+            },
+            'arcs': [self._delta_encode(arc) for arc in self.arcs],
+        }
+
+    def _iter_points(self, geometry):
+        coordinates = geometry['coordinates']
+        if geometry['type'] == 'Point':
+            yield coordinates
+        elif geometry['type'] == 'Polygon':
+            for ring in coordinates:
+                yield from ring
+        elif geometry['type'] == 'MultiPolygon':
+            for polygon in coordinates:
+                for ring in polygon:
+                    yield from ring
+
+    def _iter_rings(self, geometry):
+        if geometry['type'] == 'Polygon':
+            yield from geometry['coordinates']
+        else:
+            for polygon in geometry['coordinates']:
+                yield from polygon
+
+    def _quantize_point(self, point):
+        return (
+            int(round((point[0] - self.origin[0]) / self.scale)),
+            int(round((point[1] - self.origin[1]) / self.scale)),
+        )
+
+    def _quantize_ring(self, ring):
+        quantized = []
+        for point in ring:
+            point = self._quantize_point(point)
+            if not quantized or quantized[-1] != point:
+                quantized.append(point)
+        # Store rings open; the closing point is implied
+        if len(quantized) > 1 and quantized[0] == quantized[-1]:
+            quantized.pop()
+        return quantized
+
+    def _quantize_geometry(self, geometry):
+        geom_type = geometry['type']
+        coordinates = geometry['coordinates']
+        if geom_type == 'Point':
+            coordinates = self._quantize_point(coordinates)
+        elif geom_type == 'Polygon':
+            coordinates = [self._quantize_ring(ring) for ring in coordinates]
+        elif geom_type == 'MultiPolygon':
+            coordinates = [[self._quantize_ring(ring) for ring in polygon] for polygon in coordinates]
+        return {'type': geom_type, 'coordinates': coordinates}
+
+    def _find_junctions(self, rings):
+        """Points where rings meet with different neighbours, i.e. where shared borders start or end."""
+        neighbours = {}
+        junctions = set()
+        for ring in rings:
+            count = len(ring)
+            for i, point in enumerate(ring):
+                pair = (ring[i - 1], ring[(i + 1) % count])
+                seen = neighbours.get(point)
+                if seen is None:
+                    neighbours[point] = pair
+                elif seen != pair and seen != pair[::-1]:
+                    junctions.add(point)
+        return junctions
+
+    def _ring_arcs(self, ring, junctions):
+        """Split a ring at junctions and return its arc references."""
+        if not ring:
+            return []
+        starts = [i for i, point in enumerate(ring) if point in junctions]
+        if not starts:
+            # A ring with no junctions is one closed arc; rotate it to a canonical
+            # start so identical rings (e.g. an enclave and its hole) share it
+            start = ring.index(min(ring))
+            rotated = ring[start:] + ring[:start]
+            return [self._arc_ref(rotated + [rotated[0]])]
+
+        first = starts[0]
+        rotated = ring[first:] + ring[:first]
+        cut_points = [i - first if i >= first else i - first + len(ring) for i in starts] + [len(ring)]
+        rotated.append(rotated[0])
+        return [
+            self._arc_ref(rotated[start:end + 1])
+            for start, end in zip(cut_points, cut_points[1:])
+        ]
+
+    def _arc_ref(self, arc):
+        key = tuple(arc)
+        index = self.arc_index.get(key)
+        if index is not None:
+            return index
+        index = self.arc_index.get(key[::-1])
+        if index is not None:
+            return ~index
+        index = len(self.arcs)
+        self.arcs.append(arc)
+        self.arc_index[key] = index
+        return index
+
+    def _delta_encode(self, arc):
+        encoded = [list(arc[0])]
+        for (x0, y0), (x1, y1) in zip(arc, arc[1:]):
+            encoded.append([x1 - x0, y1 - y0])
+        return encoded
+
+
+def build_topology(object_name, features, precision=DEFAULT_TOPOJSON_PRECISION):
+    """
+    Build a quantized TopoJSON topology from GeoJSON geometries.
+
+    Coordinates are snapped to a grid of ``10 ** -precision`` degrees, rings are
+    cut into arcs where borders stop being shared, and each distinct arc is
+    stored once (referenced as ``~index`` when traversed backwards).
+
+    Args:
+        object_name: Name of the geometry collection, e.g. ``'districts'``
+        features: Iterable of (id, GeoJSON geometry dict or None, properties dict)
+        precision: Decimal places of the quantization grid
+
+    Returns:
+        TopoJSON topology dictionary
+    """
+    return _TopologyBuilder(precision).build(object_name, features)
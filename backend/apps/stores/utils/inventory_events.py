@@ -0,0 +1,349 @@
+"""
+Buffered ingestion of inventory availability events.
+
+POS systems report availability flips continuously, and the same store and
+item often flip several times a minute. Events are appended to a buffer (a
+Redis stream, or an in-process queue for tests and single-process setups, see
+the ``INVENTORY_EVENTS`` setting) and applied by ``InventoryEventWorker``
+(``manage.py ingest_inventory_events``):
+
+* events are collected for ``WINDOW`` seconds;
+* they are coalesced last-write-wins per (store, item), by the time the event
+  happened and then by arrival order, so a pair flipping ten times in the
+  window costs one row;
+* the survivors are written with the bulk upsert (``inventory_upsert.py``),
+  and the events are acknowledged only once that transaction has committed,
+  so a crashed worker's events are replayed on restart.
+
+Events for the same pair that land in different windows are applied in
+arrival order. If a flush fails, its events are put back and read again by
+the next one. After each flush the worker publishes its lag and throughput
+to the cache for the metrics endpoint.
+
+Buffered events are never trimmed: once ``MAX_LENGTH`` events are waiting,
+new ones are refused with ``EventBufferFull`` until the worker catches up.
+"""
+import collections
+import logging
+import threading
+import time
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .inventory_upsert import CREATED, UNCHANGED, UPDATED, parse_inventory_row, upsert_inventory
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BUFFER': 'redis',
+    'REDIS_URL': 'redis://127.0.0.1:6379/2',
+    'STREAM': 'stores:inventory-events',
+    'GROUP': 'inventory-ingest',
+    'MAX_LENGTH': 1000000,
+    'WINDOW': 2.0,
+    'MAX_EVENTS_PER_FLUSH': 50000,
+    'BATCH_SIZE': 1000,
+}
+METRICS_CACHE_KEY = 'stores:inventory-events:metrics'
+
+
+class EventBufferFull(Exception):
+    """The buffer already holds ``MAX_LENGTH`` unapplied events."""
+
+
+def get_setting(name):
+    return getattr(settings, 'INVENTORY_EVENTS', {}).get(name, DEFAULTS[name])
+
+
+def parse_inventory_event(event):
+    """
+    Validate an availability event from the ingestion endpoint.
+
+    Returns:
+        Dictionary with ``store_id``, ``item_id``, ``is_available`` and
+        ``occurred_at`` (epoch milliseconds; the receipt time when the event
+        has none), or None if the event is malformed
+    """
+    values = parse_inventory_row(event)
+    if values is None:
+        return None
+    occurred_at = event.get('occurred_at')
+    if occurred_at is None:
+        occurred_at = timezone.now()
+    else:
+        try:
+            occurred_at = parse_datetime(occurred_at) if isinstance(occurred_at, str) else None
+        except ValueError:
+            occurred_at = None
+        if occurred_at is None:
+            return None
+        if timezone.is_naive(occurred_at):
+            occurred_at = timezone.make_aware(occurred_at)
+    store_id, item_id, is_available = values
+    return {
+        'store_id': store_id,
+        'item_id': item_id,
+        'is_available': is_available,
+        'occurred_at': int(occurred_at.timestamp() * 1000),
+    }
+
+
+def coalesce_events(events):
+    """
+    Keep the latest event per (store, item).
+
+    Args:
+        events: Parsed events in arrival order
+
+    Returns:
+        List of upsert rows, one per pair
+    """
+    latest = {}
+    for event in events:
+        key = (event['store_id'], event['item_id'])
+        current = latest.get(key)
+        if current is None or event['occurred_at'] >= current['occurred_at']:
+            latest[key] = event
+    return [
+        {'store_id': store_id, 'item_id': item_id, 'is_available': event['is_available']}
+        for (store_id, item_id), event in latest.items()
+    ]
+
+
+class LocalEventBuffer:
+    """In-process event queue; only a worker in the same process can drain it."""
+
+    def __init__(self, max_length):
+        self.max_length = max_length
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+
+    def append(self, events):
+        received_at = int(time.time() * 1000)
+        with self._condition:
+            if len(self._queue) + len(events) > self.max_length:
+                raise EventBufferFull(f'{len(self._queue)} inventory events are already waiting')
+            self._queue.extend((event, received_at) for event in events)
+            self._condition.notify_all()
+
+    def read(self, count, timeout):
+        """Up to ``count`` entries as (entry id, event, received_at), waiting up to ``timeout`` seconds."""
+        with self._condition:
+            if not self._queue and timeout > 0:
+                self._condition.wait(timeout)
+            entries = []
+            while self._queue and len(entries) < count:
+                event, received_at = self._queue.popleft()
+                entries.append((None, event, received_at))
+            return entries
+
+    def ack(self, entry_ids):
+        pass
+
+    def release(self, entries):
+        """Put entries whose flush failed back at the front of the queue."""
+        with self._condition:
+            self._queue.extendleft((event, received_at) for _, event, received_at in reversed(entries))
+            self._condition.notify_all()
+
+    def backlog(self):
+        return len(self._queue)
+
+
+class RedisEventBuffer:
+    """Redis stream read through a consumer group; entries are deleted once acknowledged."""
+
+    def __init__(self, url, stream, group, consumer, max_length):
+        self.client = redis.Redis.from_url(url)
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer
+        self.max_length = max_length
+        self._group_ready = False
+        # Entries this consumer read but never acknowledged (before a restart)
+        # are replayed first, starting from this id
+        self._pending_from = '0'
+
+    def append(self, events):
+        # Entries are deleted once applied, so the stream length is the backlog.
+        # The check is not atomic with the append; concurrent requests can
+        # overshoot the limit by a request's worth of events.
+        backlog = self.backlog()
+        if backlog + len(events) > self.max_length:
+            raise EventBufferFull(f'{backlog} inventory events are already waiting')
+        pipeline = self.client.pipeline(transaction=False)
+        for event in events:
+            pipeline.xadd(self.stream, {
+                's': event['store_id'],
+                'i': event['item_id'],
+                'a': int(event['is_available']),
+                't': event['occurred_at'],
+            })
+        pipeline.execute()
+
+    def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            self.client.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        self._group_ready = True
+
+    def read(self, count, timeout):
+        """Up to ``count`` entries as (entry id, event, received_at), waiting up to ``timeout`` seconds."""
+        self._ensure_group()
+        response = None
+        if self._pending_from is not None:
+            response = self.client.xreadgroup(self.group, self.consumer, {self.stream: self._pending_from}, count=count)
+            if response and response[0][1]:
+                self._pending_from = response[0][1][-1][0]
+            else:
+                self._pending_from = None
+        if self._pending_from is None:
+            response = self.client.xreadgroup(
+                self.group, self.consumer, {self.stream: '>'}, count=count,
+                block=max(int(timeout * 1000), 1),
+            )
+        entries = []
+        for _, messages in response or []:
+            for entry_id, fields in messages:
+                event = {
+                    'store_id': int(fields[b's']),
+                    'item_id': int(fields[b'i']),
+                    'is_available': fields[b'a'] == b'1',
+                    'occurred_at': int(fields[b't']),
+                }
+                # Stream ids start with the time the entry was added
+                entries.append((entry_id, event, int(entry_id.split(b'-')[0])))
+        return entries
+
+    def ack(self, entry_ids):
+        if entry_ids:
+            pipeline = self.client.pipeline()
+            pipeline.xack(self.stream, self.group, *entry_ids)
+            pipeline.xdel(self.stream, *entry_ids)
+            pipeline.execute()
+
+    def release(self, entries):
+        """Read this consumer's pending entries, including those of a failed flush, again."""
+        self._pending_from = '0'
+
+    def backlog(self):
+        return self.client.xlen(self.stream)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_event_buffer(consumer='api'):
+    """The configured event buffer (one per process)."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            if get_setting('BUFFER') == 'local':
+                _buffer = LocalEventBuffer(get_setting('MAX_LENGTH'))
+            else:
+                _buffer = RedisEventBuffer(
+                    get_setting('REDIS_URL'),
+                    get_setting('STREAM'),
+                    get_setting('GROUP'),
+                    consumer,
+                    get_setting('MAX_LENGTH'),
+                )
+        return _buffer
+
+
+def get_ingestion_metrics():
+    """The metrics last published by the worker, with the current buffer backlog."""
+    metrics = dict(cache.get(METRICS_CACHE_KEY) or {})
+    try:
+        metrics['backlog'] = get_event_buffer().backlog()
+    except Exception as e:
+        logger.warning('Could not read the inventory event backlog: %s', e)
+        metrics['backlog'] = None
+    return metrics
+
+
+class InventoryEventWorker:
+    """Drains the event buffer in coalesced, batched flushes."""
+
+    def __init__(self, buffer, window=None, max_events=None, batch_size=None):
+        self.buffer = buffer
+        self.window = get_setting('WINDOW') if window is None else window
+        self.max_events = max_events or get_setting('MAX_EVENTS_PER_FLUSH')
+        self.batch_size = batch_size or get_setting('BATCH_SIZE')
+        self.metrics = {
+            'started_at': timezone.now().isoformat(),
+            'flushes': 0,
+            'events_total': 0,
+            'rows_written_total': 0,
+            'rejected_total': 0,
+        }
+        self._last_flush = time.monotonic()
+
+    def collect(self):
+        """Read events until the window closes or ``max_events`` are buffered."""
+        deadline = time.monotonic() + self.window
+        entries = []
+        while len(entries) < self.max_events:
+            remaining = deadline - time.monotonic()
+            batch = self.buffer.read(min(self.batch_size, self.max_events - len(entries)), max(remaining, 0))
+            entries.extend(batch)
+            if remaining <= 0:
+                break
+        return entries
+
+    def run_once(self):
+        """
+        Collect one window of events, apply them and acknowledge them.
+
+        Returns:
+            The metrics of this flush, or None if no events arrived
+        """
+        entries = self.collect()
+        if not entries:
+            return None
+
+        rows = coalesce_events([event for _, event, _ in entries])
+        try:
+            statuses = upsert_inventory(rows, batch_size=self.batch_size)
+        except Exception:
+            self.buffer.release(entries)
+            raise
+        self.buffer.ack([entry_id for entry_id, _, _ in entries if entry_id is not None])
+
+        now = time.monotonic()
+        elapsed = max(now - self._last_flush, 1e-6)
+        self._last_flush = now
+        now_ms = time.time() * 1000
+        lags = [now_ms - received_at for _, _, received_at in entries]
+        written = sum(1 for status in statuses if status in (CREATED, UPDATED))
+        rejected = sum(1 for status in statuses if status not in (CREATED, UPDATED, UNCHANGED))
+        flush = {
+            'events': len(entries),
+            'coalesced_rows': len(rows),
+            'rows_written': written,
+            'rejected': rejected,
+            'max_lag_seconds': round(max(lags) / 1000, 3),
+            'mean_lag_seconds': round(sum(lags) / len(lags) / 1000, 3),
+            'events_per_second': round(len(entries) / elapsed, 1),
+            'rows_written_per_second': round(written / elapsed, 1),
+        }
+        self.metrics['flushes'] += 1
+        self.metrics['events_total'] += len(entries)
+        self.metrics['rows_written_total'] += written
+        self.metrics['rejected_total'] += rejected
+        self.metrics['last_flush_at'] = timezone.now().isoformat()
+        self.metrics['last_flush'] = flush
+        try:
+            cache.set(METRICS_CACHE_KEY, self.metrics, None)
+        except Exception as e:
+            logger.warning('Could not publish inventory ingestion metrics: %s', e)
+        return flush
@@ -0,0 +1,121 @@
+"""
+Bulk inventory upserts.
+
+A stock sync sends thousands of (store_id, item_id, is_available) rows.
+Rather than validating and saving them one at a time, every store and item id
+in the request is checked with one query per table, and the valid rows are
+written with ``INSERT ... ON CONFLICT (store_id, item_id) DO UPDATE`` in
+batches of ``BATCH_SIZE``. Rows whose availability did not change are left
+alone, so they neither touch ``updated_at`` nor fire the counter and
+availability-feed triggers.
+
+The bulk write skips model signals, so the response cache, the statistics
+cube and this worker's availability bitmaps are invalidated here instead.
+"""
+from django.db import connection, transaction
+
+from ..models import Inventory, Item, Store
+from .availability_index import availability_index
+from .response_cache import bump_cache_versions
+from .statistics_cube import statistics_cube
+
+BATCH_SIZE = 1000
+
+# Per-row outcomes, in the order the rows were sent
+CREATED = 'created'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+DUPLICATE = 'duplicate'
+INVALID = 'invalid'
+UNKNOWN_STORE = 'unknown_store'
+UNKNOWN_ITEM = 'unknown_item'
+UPSERT_STATUSES = (CREATED, UPDATED, UNCHANGED, DUPLICATE, INVALID, UNKNOWN_STORE, UNKNOWN_ITEM)
+
+UPSERT_SQL = """
+INSERT INTO stores_inventory (store_id, item_id, is_available, created_at, updated_at)
+SELECT store_id, item_id, is_available, now(), now()
+FROM unnest(%s::bigint[], %s::bigint[], %s::boolean[]) AS rows (store_id, item_id, is_available)
+ON CONFLICT (store_id, item_id) DO UPDATE
+    SET is_available = EXCLUDED.is_available, updated_at = EXCLUDED.updated_at
+    WHERE stores_inventory.is_available IS DISTINCT FROM EXCLUDED.is_available
+RETURNING store_id, item_id, xmax = 0
+"""
+
+
+def parse_inventory_row(row):
+    """(store_id, item_id, is_available) from a request row, or None if malformed."""
+    if not isinstance(row, dict):
+        return None
+    store_id, item_id = row.get('store_id'), row.get('item_id')
+    is_available = row.get('is_available', True)
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in (store_id, item_id)):
+        return None
+    if not isinstance(is_available, bool):
+        return None
+    return store_id, item_id, is_available
+
+
+def upsert_inventory(rows, batch_size=BATCH_SIZE):
+    """
+    Create or update inventory entries in bulk.
+
+    Args:
+        rows: Dictionaries with ``store_id``, ``item_id`` and optionally
+            ``is_available`` (default True)
+        batch_size: Rows written per INSERT statement
+
+    Returns:
+        List with one status from UPSERT_STATUSES per row. When the same
+        store and item appear more than once, the last row is applied and
+        the earlier ones are reported as ``duplicate``.
+    """
+    statuses = [None] * len(rows)
+    parsed = {}
+    for index, row in enumerate(rows):
+        values = parse_inventory_row(row)
+        if values is None:
+            statuses[index] = INVALID
+            continue
+        store_id, item_id, is_available = values
+        previous = parsed.get((store_id, item_id))
+        if previous is not None:
+            statuses[previous[0]] = DUPLICATE
+        parsed[(store_id, item_id)] = (index, is_available)
+
+    known_stores = set(Store.objects.filter(  # type: ignore[attribute-defined]
+        id__in={store_id for store_id, _ in parsed}
+    ).values_list('id', flat=True))
+    known_items = set(Item.objects.filter(  # type: ignore[attribute-defined]
+        id__in={item_id for _, item_id in parsed}
+    ).values_list('id', flat=True))
+
+    # Sorted so concurrent syncs lock rows in the same order
+    pending = []
+    for (store_id, item_id), (index, is_available) in sorted(parsed.items()):
+        if store_id not in known_stores:
+            statuses[index] = UNKNOWN_STORE
+        elif item_id not in known_items:
+            statuses[index] = UNKNOWN_ITEM
+        else:
+            statuses[index] = UNCHANGED
+            pending.append((store_id, item_id, is_available, index))
+    if not pending:
+        return statuses
+
+    positions = {(store_id, item_id): index for store_id, item_id, _, index in pending}
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            cursor.execute(UPSERT_SQL, [
+                [store_id for store_id, _, _, _ in batch],
+                [item_id for _, item_id, _, _ in batch],
+                [is_available for _, _, is_available, _ in batch],
+            ])
+            for store_id, item_id, inserted in cursor.fetchall():
+                statuses[positions[(store_id, item_id)]] = CREATED if inserted else UPDATED
+
+        if any(status in (CREATED, UPDATED) for status in statuses):
+            bump_cache_versions(Inventory, Store)
+            transaction.on_commit(statistics_cube.invalidate)
+            transaction.on_commit(availability_index.mark_stale)
+    return statuses
@@ -0,0 +1,143 @@
+"""
+Shared-cache responses for read-heavy endpoints.
+
+Cached responses are keyed by endpoint, request URL and a version stamp per
+model the endpoint reads. Saving or deleting a Store, Item, Inventory, District
+or Review bumps that model's stamp once the transaction commits (see
+``signals.py``), so later requests miss and recompute. Bulk writes that skip
+model signals (``QuerySet.update``, ``bulk_create``) must call
+``bump_cache_versions`` themselves.
+
+Stamps are random tokens rather than counters, so a stamp evicted from the
+cache can never come back with an old value and resurrect stale entries.
+
+To avoid a stampede after an invalidation, only the request that wins a
+short-lived lock recomputes. Concurrent requests get the last computed
+response for the same URL if there is one, and otherwise wait for the winner.
+"""
+import hashlib
+import logging
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = 'stores:response'
+VERSION_KEY_PREFIX = 'stores:response-version'
+DEFAULT_TIMEOUT = 300
+STALE_TIMEOUT = 24 * 60 * 60
+LOCK_TIMEOUT = 30
+WAIT_INTERVAL = 0.05
+
+
+def _version_key(model):
+    return f'{VERSION_KEY_PREFIX}:{model._meta.label_lower}'
+
+
+def bump_cache_versions(*models):
+    """Invalidate cached responses that read ``models``, once the transaction commits."""
+    keys = [_version_key(model) for model in models]
+
+    def publish():
+        try:
+            cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+        except Exception as e:
+            logger.warning('Could not bump response cache versions: %s', e)
+
+    transaction.on_commit(publish)
+
+
+def get_cache_versions(models):
+    """Current version stamps for ``models``, creating missing ones."""
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _hash(*parts):
+    return hashlib.sha1('\x1f'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def cached_response(request, name, models, compute, timeout=DEFAULT_TIMEOUT):
+    """
+    Return a cached response for ``request``, computing it on a miss.
+
+    Args:
+        request: The incoming request; its full URL and renderer are part of the key
+        name: Endpoint name, e.g. ``'store-statistics'``
+        models: Models the response reads; writes to any of them invalidate it
+        compute: Callable returning the Response; only 200 responses are cached
+        timeout: Seconds a fresh response is kept
+
+    Returns:
+        Response
+    """
+    # The renderer can change the payload (e.g. TopoJSON requests GeoJSON boundaries)
+    renderer = getattr(request, 'accepted_renderer', None)
+    url_hash = _hash(request.build_absolute_uri(), getattr(renderer, 'format', ''))
+    try:
+        versions = get_cache_versions(models)
+        key = f'{CACHE_KEY_PREFIX}:{name}:{_hash(*versions)}:{url_hash}'
+        data = cache.get(key)
+    except Exception as e:
+        logger.warning('Response cache unavailable, computing %s: %s', name, e)
+        return compute()
+    if data is not None:
+        return Response(data)
+
+    stale_key = f'{CACHE_KEY_PREFIX}:{name}:stale:{url_hash}'
+    lock_key = f'{key}:lock'
+    try:
+        acquired = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    except Exception:
+        acquired = True
+
+    if not acquired:
+        data = _wait_for(key, stale_key, lock_key)
+        if data is not None:
+            return Response(data)
+        return compute()
+
+    try:
+        response = compute()
+        if response.status_code == status.HTTP_200_OK:
+            try:
+                cache.set(key, response.data, timeout)
+                cache.set(stale_key, response.data, STALE_TIMEOUT)
+            except Exception as e:
+                logger.warning('Could not cache %s response: %s', name, e)
+        return response
+    finally:
+        try:
+            cache.delete(lock_key)
+        except Exception:
+            pass
+
+
+def _wait_for(key, stale_key, lock_key):
+    """Data for a request that lost the recompute lock, or None to compute it anyway."""
+    try:
+        data = cache.get(stale_key)
+        if data is not None:
+            return data
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            data = cache.get(key)
+            if data is not None:
+                return data
+            if cache.get(lock_key) is None:
+                # The winner finished without caching (e.g. an error response)
+                return None
+    except Exception:
+        return None
+    return None
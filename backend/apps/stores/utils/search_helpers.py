@@ -0,0 +1,73 @@
+"""
+Full-text and trigram search helpers for stores.
+
+The search document (``Store.search_vector``) and the trigram indexes are built
+over ``stores_search_fold()``, a lower-cased ``unaccent`` wrapper created in
+migration 0010, so "Quan 1" matches "QUẬN 1".
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Func, Q, TextField, Value
+
+SEARCH_CONFIG = 'simple'
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+class SearchFold(Func):
+    """Accent- and case-folded text, matching the expression used by the trigram indexes."""
+    function = 'stores_search_fold'
+    output_field = TextField()
+
+
+def build_prefix_query(search_text):
+    """
+    Build a prefix-matching tsquery from free text.
+
+    Every word must match the start of a word in the document, so partial input
+    typed in the search box ("circ", "quan 1") already returns results.
+
+    Returns:
+        SearchQuery, or None if the text contains no searchable words
+    """
+    tokens = TOKEN_PATTERN.findall(search_text)
+    if not tokens:
+        return None
+    raw_query = ' & '.join(f'{token}:*' for token in tokens)
+    return SearchQuery(SearchFold(Value(raw_query)), config=SEARCH_CONFIG, search_type='raw')
+
+
+def search_stores(queryset, search_text):
+    """
+    Filter and rank stores by free text using the search indexes.
+
+    A store matches when its search document matches every word (by prefix),
+    its name is trigram-similar to the text, or the text appears inside its
+    name or address. Each of these predicates is backed by a GIN index.
+
+    Args:
+        queryset: Store queryset to filter
+        search_text: Raw text entered by the user
+
+    Returns:
+        QuerySet annotated with ``search_rank`` (higher is more relevant)
+    """
+    folded_text = SearchFold(Value(search_text))
+    query = build_prefix_query(search_text)
+
+    queryset = queryset.annotate(
+        name_folded=SearchFold('name'),
+        address_folded=SearchFold('address'),
+    )
+
+    conditions = (
+        Q(name_folded__trigram_similar=folded_text) |
+        Q(name_folded__contains=folded_text) |
+        Q(address_folded__contains=folded_text)
+    )
+    rank = TrigramSimilarity('name_folded', folded_text)
+    if query is not None:
+        conditions |= Q(search_vector=query)
+        rank = SearchRank(F('search_vector'), query) + rank
+
+    return queryset.filter(conditions).annotate(search_rank=rank)
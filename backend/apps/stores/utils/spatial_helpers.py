@@ -1,17 +1,138 @@
 """
 Spatial utility functions for performance-optimized geographic operations.
 """
+import logging
+import math
+
 from django.contrib.gis.db.models import Extent
 from django.contrib.gis.geos import Point
 from django.db.models import Q, Count, Avg
-from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.db.models.functions import Distance, GeometryDistance
+from django.contrib.gis.measure import D
+from django.db import connection
 from ..models import Store, District, Inventory
+from .availability_index import availability_index
+
+logger = logging.getLogger(__name__)
+
+# Items available in at most this many stores are ranked from their store
+# list; others walk the geography index nearest-first (see below)
+RARE_ITEM_MAX_STORES = 200
+
+NEAREST_STORES_PER_ITEM_SQL = """
+SELECT it.item_id, s.id, s.distance
+FROM unnest(%(item_ids)s::bigint[]) AS it(item_id)
+CROSS JOIN LATERAL (
+    SELECT s.id, ST_Distance(s.location_geog, p.geog) AS distance
+    FROM stores_store s, (SELECT ST_SetSRID(ST_MakePoint(%(lng)s, %(lat)s), 4326)::geography AS geog) p
+    WHERE s.location_geog IS NOT NULL {active}
+      AND EXISTS (
+          SELECT 1 FROM stores_inventory i
+          WHERE i.store_id = s.id AND i.item_id = it.item_id AND i.is_available
+      )
+    ORDER BY s.location_geog <-> p.geog
+    LIMIT %(limit)s
+) s
+"""
+
+# WGS84 ellipsoid, as used by PostGIS geography distances
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+VINCENTY_MAX_ITERATIONS = 200
+VINCENTY_TOLERANCE = 1e-12
+
+STORE_DISTANCES_SQL = """
+SELECT s.id, ST_Distance(s.location_geog, ST_SetSRID(ST_MakePoint(%(lng)s, %(lat)s), 4326)::geography)
+FROM stores_store s
+WHERE s.id = ANY(%(store_ids)s) AND s.location_geog IS NOT NULL {active}
+"""
+
+
+def great_circle_distance(point_a, point_b):
+    """Distance in meters between two lon/lat points on a sphere of the WGS84 mean radius."""
+    lat_a, lat_b = math.radians(point_a.y), math.radians(point_b.y)
+    half_lat = (lat_b - lat_a) / 2
+    half_lon = math.radians(point_b.x - point_a.x) / 2
+    h = math.sin(half_lat) ** 2 + math.cos(lat_a) * math.cos(lat_b) * math.sin(half_lon) ** 2
+    return (2 * WGS84_A + WGS84_B) / 3 * 2 * math.asin(min(1.0, math.sqrt(h)))
+
+
+def vincenty_distance(point_a, point_b):
+    """
+    Distance in meters between two lon/lat points on the WGS84 ellipsoid.
+
+    Vincenty's inverse formula, which matches ST_Distance on geography to well
+    under a meter.
+
+    Returns:
+        The distance, or None if the iteration does not converge (nearly
+        antipodal points)
+    """
+    lat_a, lat_b = math.radians(point_a.y), math.radians(point_b.y)
+    u_a = math.atan((1 - WGS84_F) * math.tan(lat_a))
+    u_b = math.atan((1 - WGS84_F) * math.tan(lat_b))
+    sin_u_a, cos_u_a = math.sin(u_a), math.cos(u_a)
+    sin_u_b, cos_u_b = math.sin(u_b), math.cos(u_b)
+
+    delta_lon = math.radians(point_b.x - point_a.x)
+    lam = delta_lon
+    for _ in range(VINCENTY_MAX_ITERATIONS):
+        sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+        sin_sigma = math.hypot(cos_u_b * sin_lam, cos_u_a * sin_u_b - sin_u_a * cos_u_b * cos_lam)
+        if sin_sigma == 0:
+            return 0.0  # Same point
+        cos_sigma = sin_u_a * sin_u_b + cos_u_a * cos_u_b * cos_lam
+        sigma = math.atan2(sin_sigma, cos_sigma)
+        sin_alpha = cos_u_a * cos_u_b * sin_lam / sin_sigma
+        cos2_alpha = 1 - sin_alpha ** 2
+        cos_2sigma_m = cos_sigma - 2 * sin_u_a * sin_u_b / cos2_alpha if cos2_alpha else 0.0
+        c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+        previous, lam = lam, delta_lon + (1 - c) * WGS84_F * sin_alpha * (
+            sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (2 * cos_2sigma_m ** 2 - 1))
+        )
+        if abs(lam) > math.pi:
+            return None  # Diverging
+        if abs(lam - previous) < VINCENTY_TOLERANCE:
+            break
+    else:
+        return None
+
+    u2 = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    k_a = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    k_b = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = k_b * sin_sigma * (cos_2sigma_m + k_b / 4 * (
+        cos_sigma * (2 * cos_2sigma_m ** 2 - 1)
+        - k_b / 6 * cos_2sigma_m * (4 * sin_sigma ** 2 - 3) * (4 * cos_2sigma_m ** 2 - 3)
+    ))
+    return WGS84_B * k_a * (sigma - delta_sigma)
+
+
+def geodesic_distance(point_a, point_b):
+    """
+    Distance in meters between two lon/lat points, computed without a query.
+
+    Uses ``vincenty_distance``; for nearly antipodal points, where it does not
+    converge, logs a warning and returns the great-circle distance (off by up
+    to about 0.5%).
+    """
+    distance = vincenty_distance(point_a, point_b)
+    if distance is None:
+        logger.warning(
+            'Vincenty distance did not converge for (%s, %s) -> (%s, %s); using the great-circle distance',
+            point_a.x, point_a.y, point_b.x, point_b.y,
+        )
+        distance = great_circle_distance(point_a, point_b)
+    return distance
 
 
 def get_stores_within_radius(center_point, radius_km, store_type=None, is_active=True):
     """
     Get stores within a specified radius with performance optimization.
     
+    Uses ST_DWithin on the geography column, so the radius is exact in meters
+    and the search is bounded by the geography GiST index.
+    
     Args:
         center_point: Point object (longitude, latitude)
         radius_km: Radius in kilometers
@@ -19,13 +140,9 @@ def get_stores_within_radius(center_point, radius_km, store_type=None, is_active
         is_active: Filter for active stores only
     
     Returns:
-        QuerySet of stores within radius, ordered by distance
+        QuerySet of stores within radius, ordered by distance (meters)
     """
-    # Convert km to degrees (approximate)
-    radius_degrees = radius_km / 111.32
-    
-    # Build query with spatial index optimization
-    query: Q = Q(location__distance_lte=(center_point, radius_degrees))
+    query: Q = Q(location_geog__dwithin=(center_point, D(km=radius_km)))
     
     if store_type:
         query &= Q(store_type=store_type)  # type: ignore
@@ -33,7 +150,7 @@ def get_stores_within_radius(center_point, radius_km, store_type=None, is_active
         query = query & Q(is_active=True)  # type: ignore
     
     return Store.objects.filter(query).annotate(  # type: ignore
-        distance=Distance('location', center_point)
+        distance=Distance('location_geog', center_point)
     ).order_by('distance')
 
 
@@ -80,26 +197,89 @@ def get_store_density_by_district():
     ).filter(is_active=True).order_by('-store_count')
 
 
-def get_nearest_stores(target_point, limit=10, store_type=None):
+def get_nearest_stores(target_point, limit=10, store_type=None, is_active=True):
     """
-    Find nearest stores to a target point with performance optimization.
+    Find nearest stores to a target point using the index-assisted KNN operator.
+    
+    Ordering by ``location_geog <-> point`` lets PostGIS walk the geography GiST
+    index and stop after ``limit`` rows, so distances (in meters) are only
+    computed for the returned stores.
     
     Args:
         target_point: Point object (longitude, latitude)
         limit: Maximum number of stores to return
         store_type: Optional store type filter
+        is_active: Filter by active status (None for no filter)
     
     Returns:
-        QuerySet of nearest stores with distances
+        List of nearest stores annotated with ``distance``, closest first
     """
-    query = Q(location__isnull=False) & Q(is_active=True)
+    query = Q(location__isnull=False)
     
+    if is_active is not None:
+        query &= Q(is_active=is_active)  # type: ignore
     if store_type:
         query &= Q(store_type=store_type)  # type: ignore
     
-    return Store.objects.filter(query).annotate(  # type: ignore
-        distance=Distance('location', target_point)
-    ).order_by('distance')[:limit]
+    return list(Store.objects.filter(query).annotate(  # type: ignore
+        distance=Distance('location_geog', target_point)
+    ).order_by(GeometryDistance('location_geog', target_point))[:limit])
+
+
+def get_nearest_stores_per_item(target_point, item_ids, limit=3, is_active=True):
+    """
+    Find, for each item, the nearest stores where it is available.
+
+    Commonly stocked items run one LATERAL subquery each that walks the
+    geography GiST index nearest-first (``<->``) and stops at the ``limit``-th
+    store with the item available, so an item costs a few index probes rather
+    than a radius scan. Items stocked by few stores would make that walk long,
+    so they are ranked from their store list in the availability bitmaps
+    instead; items available nowhere cost nothing.
+
+    Args:
+        target_point: Point object (longitude, latitude)
+        item_ids: Items to look up
+        limit: Stores to return per item
+        is_active: Filter by store active status (None for no filter)
+
+    Returns:
+        Dictionary of item id -> list of (store id, distance in meters), closest first
+    """
+    active = {True: 'AND s.is_active', False: 'AND NOT s.is_active', None: ''}[is_active]
+    params = {'lng': target_point.x, 'lat': target_point.y}
+    nearest = {item_id: [] for item_id in item_ids}
+
+    common, rare = [], {}
+    for item_id in nearest:
+        stores = availability_index.stores_with_item(item_id)
+        if len(stores) > RARE_ITEM_MAX_STORES:
+            common.append(item_id)
+        elif stores:
+            rare[item_id] = stores
+
+    with connection.cursor() as cursor:
+        if common:
+            cursor.execute(
+                NEAREST_STORES_PER_ITEM_SQL.format(active=active),
+                {**params, 'item_ids': common, 'limit': limit},
+            )
+            for item_id, store_id, distance in cursor.fetchall():
+                nearest[item_id].append((store_id, distance))
+        if rare:
+            store_ids = set().union(*rare.values())
+            cursor.execute(
+                STORE_DISTANCES_SQL.format(active=active),
+                {**params, 'store_ids': sorted(store_ids)},
+            )
+            distances = dict(cursor.fetchall())
+            for item_id, stores in rare.items():
+                ranked = sorted((distances[store_id], store_id) for store_id in stores if store_id in distances)
+                nearest[item_id] = [(store_id, distance) for distance, store_id in ranked[:limit]]
+
+    for item_id in common:
+        nearest[item_id].sort(key=lambda entry: entry[1])
+    return nearest
 
 
 def get_spatial_statistics():
@@ -149,6 +329,7 @@ def optimize_spatial_queries():
     return {
         'spatial_indexes': [
             'Store.location (PointField with spatial_index=True)',
+            'Store.location_geog (geography PointField for metric ST_DWithin/KNN)',
             'District.boundary (PolygonField with spatial_index=True)',
         ],
         'composite_indexes': [
@@ -159,10 +340,11 @@ def optimize_spatial_queries():
         ],
         'query_optimizations': [
             'Use spatial indexes for distance and containment queries',
+            'Use ST_DWithin on Store.location_geog for radius filters in meters',
             'Use select_related() for foreign key relationships',
             'Use prefetch_related() for reverse foreign key relationships',
             'Filter by is_active before spatial operations',
-            'Use Distance annotation for nearest neighbor queries',
+            'Order by GeometryDistance (<->) for index-assisted nearest neighbor queries',
         ],
         'performance_tips': [
             'Limit spatial query results with [:limit]',
@@ -0,0 +1,240 @@
+"""
+In-memory OLAP cube of store and inventory counts.
+
+Each worker holds two NumPy arrays of precomputed counts:
+
+* inventory entries by store_type x district x is_active x category x is_available
+* stores by store_type x district x is_active
+
+Slices (filters on any dimension), roll-ups (grouping by any subset of
+dimensions) and top-k queries are answered from these arrays without touching
+the database. The cube is loaded with two GROUP BY queries and rebuilt lazily
+after a store, item, inventory or district write: immediately in the worker
+that made it (see ``signals.py``), and within ``VERSION_CHECK_INTERVAL``
+seconds elsewhere, through the response cache version stamps.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+from django.db import connection
+from rest_framework.exceptions import ValidationError
+
+from ..models import District, Inventory, Item, Store
+from .response_cache import get_cache_versions
+
+logger = logging.getLogger(__name__)
+
+VERSION_CHECK_INTERVAL = 5
+CUBE_MODELS = (Store, Item, Inventory, District)
+
+STORE_DIMENSIONS = ('store_type', 'district', 'is_active')
+INVENTORY_DIMENSIONS = STORE_DIMENSIONS + ('category', 'is_available')
+MEASURES = {
+    'inventory': INVENTORY_DIMENSIONS,
+    'stores': STORE_DIMENSIONS,
+}
+BOOLEAN_DIMENSIONS = ('is_active', 'is_available')
+
+INVENTORY_CUBE_SQL = """
+SELECT s.store_type, s.district_obj_id, s.is_active, it.category, i.is_available, count(*)
+FROM stores_inventory i
+JOIN stores_store s ON s.id = i.store_id
+JOIN stores_item it ON it.id = i.item_id
+GROUP BY 1, 2, 3, 4, 5
+"""
+
+STORE_CUBE_SQL = """
+SELECT store_type, district_obj_id, is_active, count(*)
+FROM stores_store
+GROUP BY 1, 2, 3
+"""
+
+
+def _parse_bool(value):
+    lowered = value.lower()
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise ValueError(value)
+
+
+class StatisticsCube:
+    """Count arrays with the labels of each dimension."""
+
+    def __init__(self, labels, inventory_counts, store_counts, district_names):
+        self.labels = labels
+        self.positions = {
+            dimension: {label: position for position, label in enumerate(values)}
+            for dimension, values in labels.items()
+        }
+        self.counts = {'inventory': inventory_counts, 'stores': store_counts}
+        self.district_names = district_names
+
+    @classmethod
+    def load(cls):
+        """Build the cube from the database."""
+        with connection.cursor() as cursor:
+            cursor.execute(INVENTORY_CUBE_SQL)
+            inventory_rows = cursor.fetchall()
+            cursor.execute(STORE_CUBE_SQL)
+            store_rows = cursor.fetchall()
+        district_names = dict(District.objects.values_list('id', 'name'))  # type: ignore[attribute-defined]
+
+        def labels_for(column, rows, known=()):
+            values = set(known) | {row[column] for row in rows}
+            return sorted(values, key=lambda value: (value is None, value if value is not None else 0))
+
+        store_type_choices = [value for value, _ in Store._meta.get_field('store_type').choices]
+        category_choices = [value for value, _ in Item._meta.get_field('category').choices]
+        labels = {
+            'store_type': labels_for(0, inventory_rows + store_rows, store_type_choices),
+            'district': labels_for(1, inventory_rows + store_rows, district_names),
+            'is_active': [False, True],
+            'category': labels_for(3, inventory_rows, category_choices),
+            'is_available': [False, True],
+        }
+        cube = cls(labels, None, None, district_names)
+
+        inventory_counts = np.zeros([len(labels[d]) for d in INVENTORY_DIMENSIONS], dtype=np.int64)
+        for *values, count in inventory_rows:
+            inventory_counts[cube._cell(INVENTORY_DIMENSIONS, values)] = count
+        store_counts = np.zeros([len(labels[d]) for d in STORE_DIMENSIONS], dtype=np.int64)
+        for *values, count in store_rows:
+            store_counts[cube._cell(STORE_DIMENSIONS, values)] = count
+        cube.counts = {'inventory': inventory_counts, 'stores': store_counts}
+        return cube
+
+    def _cell(self, dimensions, values):
+        return tuple(self.positions[dimension][value] for dimension, value in zip(dimensions, values))
+
+    def parse_filters(self, measure, query_params):
+        """
+        Read dimension filters (comma-separated values) from query parameters.
+
+        Returns:
+            Dictionary of dimension -> list of label positions
+
+        Raises:
+            ValidationError: If a filter value is malformed or the dimension
+                does not apply to the measure
+        """
+        filters = {}
+        for dimension in INVENTORY_DIMENSIONS:
+            raw = query_params.get(dimension)
+            if raw in (None, ''):
+                continue
+            if dimension not in MEASURES[measure]:
+                raise ValidationError({dimension: f'Cannot filter {measure} counts by {dimension}.'})
+            values = [value.strip() for value in raw.split(',') if value.strip()]
+            try:
+                if dimension in BOOLEAN_DIMENSIONS:
+                    values = [_parse_bool(value) for value in values]
+                elif dimension == 'district':
+                    values = [None if value == 'none' else int(value) for value in values]
+            except ValueError:
+                raise ValidationError({dimension: f'Invalid value: {raw}'})
+            positions = self.positions[dimension]
+            filters[dimension] = [positions[value] for value in values if value in positions]
+        return filters
+
+    def query(self, measure='inventory', filters=None, group_by=(), top=None):
+        """
+        Slice, roll up and rank the cube.
+
+        Args:
+            measure: ``'inventory'`` (inventory entries) or ``'stores'``
+            filters: Dictionary of dimension -> label positions to keep
+            group_by: Dimensions to break the counts down by, in output order
+            top: Only return the ``top`` largest groups
+
+        Returns:
+            Tuple of (total count, list of group dictionaries with a ``count``)
+        """
+        dimensions = MEASURES[measure]
+        filters = filters or {}
+        index = [
+            np.asarray(filters[dimension], dtype=np.intp) if dimension in filters
+            else np.arange(len(self.labels[dimension]))
+            for dimension in dimensions
+        ]
+        sliced = self.counts[measure][np.ix_(*index)]
+
+        group_axes = [dimensions.index(dimension) for dimension in group_by]
+        other_axes = tuple(axis for axis in range(len(dimensions)) if axis not in group_axes)
+        rolled = sliced.sum(axis=other_axes)
+        # sum() keeps the grouped axes in cube order; put them in requested order
+        kept = sorted(group_axes)
+        rolled = np.transpose(rolled, [kept.index(axis) for axis in group_axes]) if group_axes else rolled
+        total = int(sliced.sum())
+        if not group_axes:
+            return total, []
+
+        cells = np.argwhere(rolled > 0)
+        values = rolled[tuple(cells.T)]
+        order = np.argsort(-values, kind='stable')
+        if top is not None:
+            order = order[:top]
+
+        groups = []
+        for position in order:
+            group = {}
+            for dimension, axis, label_position in zip(group_by, group_axes, cells[position]):
+                label = self.labels[dimension][index[axis][label_position]]
+                if dimension == 'district':
+                    group['district_id'] = label
+                    group['district'] = self.district_names.get(label) if label is not None else None
+                else:
+                    group[dimension] = label
+            group['count'] = int(values[position])
+            groups.append(group)
+        return total, groups
+
+
+class StatisticsCubeHolder:
+    """Per-worker cube, rebuilt lazily after writes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cube = None
+        self._versions = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        """Rebuild the local cube on next use."""
+        with self._lock:
+            self._cube = None
+
+    def get(self):
+        """The current cube, loading it if needed."""
+        self._check_versions()
+        cube = self._cube
+        if cube is not None:
+            return cube
+        with self._lock:
+            if self._cube is None:
+                self._versions = self._read_versions()
+                self._cube = StatisticsCube.load()
+            return self._cube
+
+    def _read_versions(self):
+        try:
+            return get_cache_versions(CUBE_MODELS)
+        except Exception as e:
+            logger.warning('Could not read statistics cube versions: %s', e)
+            return None
+
+    def _check_versions(self):
+        now = time.monotonic()
+        if now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        versions = self._read_versions()
+        if versions is not None and versions != self._versions:
+            with self._lock:
+                self._cube = None
+
+
+statistics_cube = StatisticsCubeHolder()
@@ -0,0 +1,374 @@
+"""
+Bulk store import.
+
+Store rows (CSV, NDJSON or GeoJSON) are validated one at a time as they are
+read and streamed into a temporary staging table with ``COPY``. Everything
+after that is set-based:
+
+* one ``ST_Contains`` join assigns each staged store its district, and a
+  nearest-boundary (``<->``) lookup covers the stores outside every district;
+* stores are matched to existing ones by name, as ``seed_stores`` does: one
+  UPDATE refreshes the matched stores and one INSERT ... SELECT adds the rest.
+  A store type detected from the name is only used for new stores, so an
+  import without types keeps the types of the stores it updates.
+
+When a name appears more than once in the input, the last row wins. The
+location, search-document and counter triggers run as for any other write.
+Imports take a transaction-level advisory lock just before the UPDATE, so two
+imports cannot insert the same name twice; other writes to ``stores_store``
+(such as the inventory counter triggers) are not blocked by it.
+"""
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+
+from ..models import District, Store
+from .response_cache import bump_cache_versions
+from .statistics_cube import statistics_cube
+
+IMPORT_FORMATS = ('csv', 'ndjson', 'geojson')
+IMPORT_MEDIA_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/geo+json': 'geojson',
+    'application/json': 'geojson',
+}
+STORE_TYPES = {value for value, _ in Store._meta.get_field('store_type').choices}
+DEFAULT_CITY = 'Ho Chi Minh City'
+MAX_REPORTED_ERRORS = 100
+# pg_advisory_xact_lock key serializing the UPDATE/INSERT step of imports
+IMPORT_LOCK_KEY = 0x53544f52
+
+STAGING_COLUMNS = (
+    'line', 'name', 'address', 'phone', 'email', 'store_type', 'detected_store_type',
+    'opening_hours', 'rating', 'is_active', 'city', 'longitude', 'latitude',
+)
+
+CREATE_STAGING_SQL = """
+CREATE TEMP TABLE store_import (
+    line integer PRIMARY KEY,
+    name text NOT NULL,
+    address text,
+    phone text,
+    email text,
+    store_type text,
+    detected_store_type text NOT NULL,
+    opening_hours text,
+    rating numeric(3, 2),
+    is_active boolean,
+    city text,
+    longitude double precision NOT NULL,
+    latitude double precision NOT NULL,
+    geom geometry(Point, 4326) GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)) STORED,
+    district_id bigint,
+    district_name text
+) ON COMMIT DROP
+"""
+
+COPY_SQL = f"COPY store_import ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+DEDUPLICATE_SQL = """
+DELETE FROM store_import a USING store_import b
+WHERE a.name = b.name AND a.line < b.line
+"""
+
+ASSIGN_DISTRICTS_SQL = """
+UPDATE store_import s
+SET district_id = c.district_id, district_name = c.district_name
+FROM (
+    SELECT DISTINCT ON (i.line) i.line, d.id AS district_id, d.name AS district_name
+    FROM store_import i
+    JOIN stores_district d ON ST_Contains(d.boundary, i.geom)
+    ORDER BY i.line, d.id
+) c
+WHERE s.line = c.line
+"""
+
+ASSIGN_NEAREST_DISTRICTS_SQL = """
+UPDATE store_import s
+SET district_id = n.id, district_name = n.name
+FROM store_import u
+CROSS JOIN LATERAL (
+    SELECT d.id, d.name FROM stores_district d
+    WHERE d.boundary IS NOT NULL
+    ORDER BY d.boundary <-> u.geom, d.id
+    LIMIT 1
+) n
+WHERE s.line = u.line AND u.district_id IS NULL
+"""
+
+UPDATE_STORES_SQL = """
+UPDATE stores_store st
+SET address = COALESCE(s.address, st.address),
+    phone = COALESCE(s.phone, st.phone),
+    email = COALESCE(s.email, st.email),
+    store_type = COALESCE(s.store_type, st.store_type),
+    district = COALESCE(s.district_name, st.district),
+    district_obj_id = COALESCE(s.district_id, st.district_obj_id),
+    city = COALESCE(s.city, st.city),
+    opening_hours = COALESCE(s.opening_hours, st.opening_hours),
+    is_active = COALESCE(s.is_active, st.is_active),
+    rating = COALESCE(s.rating, st.rating),
+    location = s.geom,
+    updated_at = now()
+FROM store_import s
+WHERE st.name = s.name
+"""
+
+INSERT_STORES_SQL = """
+INSERT INTO stores_store (
+    name, address, phone, email, store_type, district, district_obj_id, city, opening_hours,
+    is_active, rating, location, inventory_count, available_inventory_count, approved_review_count,
+    created_at, updated_at
+)
+SELECT s.name,
+       COALESCE(s.address, concat_ws(', ', s.district_name, COALESCE(s.city, %(city)s))),
+       s.phone, s.email, COALESCE(s.store_type, s.detected_store_type), s.district_name, s.district_id,
+       COALESCE(s.city, %(city)s),
+       s.opening_hours, COALESCE(s.is_active, true), s.rating, s.geom, 0, 0, 0, now(), now()
+FROM store_import s
+WHERE NOT EXISTS (SELECT 1 FROM stores_store st WHERE st.name = s.name)
+ORDER BY s.line
+"""
+
+
+def detect_store_type_from_name(name):
+    """Detect store type from store name based on brand patterns."""
+    name_lower = name.lower()
+
+    if name.startswith('7-Eleven') or '7-eleven' in name_lower:
+        return '7-eleven'
+    elif name.startswith('MINISTOP') or 'ministop' in name_lower:
+        return 'ministop'
+    elif name.startswith('WinMart') or name.startswith('WIN ') or 'winmart' in name_lower:
+        return 'winmart'
+    elif name.startswith('Circle K') or 'circle k' in name_lower:
+        return 'circle-k'
+    elif name.startswith('FamilyMart') or 'familymart' in name_lower:
+        return 'familymart'
+    elif name.startswith('GS25') or 'gs25' in name_lower:
+        return 'gs25'
+    elif name.startswith('Bách hóa XANH') or name.startswith('Bách Hóa Xanh') or 'bách hóa xanh' in name_lower:
+        return 'bach-hoa-xanh'
+    elif name.startswith('Co.opXtra') or 'co.opxtra' in name_lower or 'coopxtra' in name_lower:
+        return 'coopxtra'
+    elif name.startswith('Satrafoods') or 'satrafoods' in name_lower:
+        return 'satrafoods'
+    else:
+        return 'other'
+
+
+def _text(record, *keys, max_length=None):
+    for key in keys:
+        value = record.get(key)
+        if value is not None and str(value).strip():
+            value = str(value).strip()
+            if max_length is not None and len(value) > max_length:
+                raise ValueError(f'{keys[0]} is longer than {max_length} characters')
+            return value
+    return None
+
+
+def _coordinate(record, keys, limit):
+    value = _text(record, *keys)
+    if value is None:
+        raise ValueError(f'missing {keys[0]}')
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f'invalid {keys[0]}: {value}')
+    if not -limit <= number <= limit:
+        raise ValueError(f'{keys[0]} out of range')
+    return number
+
+
+def _boolean(value):
+    if value is None or isinstance(value, bool):
+        return value
+    lowered = str(value).strip().lower()
+    if lowered in ('', 'none', 'null'):
+        return None
+    if lowered in ('true', '1', 'yes', 't'):
+        return True
+    if lowered in ('false', '0', 'no', 'f'):
+        return False
+    raise ValueError(f'invalid is_active value: {value}')
+
+
+def parse_store_record(record):
+    """
+    Validate one input store.
+
+    Returns:
+        Tuple of staging column values (without the line number)
+
+    Raises:
+        ValueError: If the store is missing a field or a value is invalid
+    """
+    if not isinstance(record, dict):
+        raise ValueError('expected an object')
+    name = _text(record, 'name', max_length=255)
+    if name is None:
+        raise ValueError('missing name')
+    latitude = _coordinate(record, ('latitude', 'lat'), 90)
+    longitude = _coordinate(record, ('longitude', 'lng', 'lon'), 180)
+
+    store_type = _text(record, 'store_type', 'type')
+    if store_type is not None and store_type not in STORE_TYPES:
+        raise ValueError(f'unknown store type: {store_type}')
+    rating = _text(record, 'rating')
+    if rating is not None:
+        try:
+            rating = Decimal(rating)
+        except InvalidOperation:
+            raise ValueError(f'invalid rating: {rating}')
+        if not rating.is_finite() or not 0 <= rating <= 5:
+            raise ValueError('rating must be between 0 and 5')
+        rating = rating.quantize(Decimal('0.01'))
+    is_active = _boolean(record.get('is_active'))
+
+    return (
+        name,
+        _text(record, 'address'),
+        _text(record, 'phone', max_length=20),
+        _text(record, 'email', max_length=254),
+        store_type,
+        detect_store_type_from_name(name),
+        _text(record, 'opening_hours', max_length=100),
+        rating,
+        None if is_active is None else ('t' if is_active else 'f'),
+        _text(record, 'city', max_length=100),
+        longitude,
+        latitude,
+    )
+
+
+def read_store_records(lines, input_format):
+    """
+    Read input stores from an iterable of text lines.
+
+    CSV needs a header row; NDJSON has one object per line; GeoJSON is a
+    FeatureCollection of Point features (a plain JSON array of objects, like
+    ``stores.json``, is accepted too) and is the only format read in full.
+
+    Yields:
+        Tuples of (line or feature number, record dictionary or the
+        ValueError raised while decoding it)
+    """
+    if input_format == 'csv':
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+    elif input_format == 'ndjson':
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, ValueError(f'invalid JSON: {e}')
+    elif input_format == 'geojson':
+        try:
+            document = json.loads(''.join(lines))
+        except ValueError as e:
+            yield 0, ValueError(f'invalid JSON: {e}')
+            return
+        features = document.get('features') if isinstance(document, dict) else document
+        if not isinstance(features, list):
+            yield 0, ValueError('expected a FeatureCollection or an array of stores')
+            return
+        for number, feature in enumerate(features, start=1):
+            if isinstance(feature, dict) and feature.get('type') == 'Feature':
+                geometry = feature.get('geometry') or {}
+                if geometry.get('type') != 'Point' or len(geometry.get('coordinates') or []) < 2:
+                    yield number, ValueError('feature geometry must be a Point')
+                    continue
+                longitude, latitude = geometry['coordinates'][:2]
+                feature = {**(feature.get('properties') or {}), 'longitude': longitude, 'latitude': latitude}
+            yield number, feature
+    else:
+        raise ValueError(f'Unknown import format: {input_format}')
+
+
+class _CopyStream:
+    """File-like object that COPY reads CSV-encoded staging rows from."""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._buffer = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = io.StringIO()
+            csv.writer(line).writerow(row)
+            self._buffer += line.getvalue()
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def import_stores(lines, input_format):
+    """
+    Create or update stores in bulk.
+
+    Args:
+        lines: Iterable of text lines (an open file or a decoded request body)
+        input_format: One of IMPORT_FORMATS
+
+    Returns:
+        Dictionary with the number of stores received, created, updated,
+        rejected and de-duplicated, how many were placed in their nearest
+        district, and the first MAX_REPORTED_ERRORS rejections
+    """
+    result = {
+        'received': 0,
+        'created': 0,
+        'updated': 0,
+        'invalid': 0,
+        'duplicates': 0,
+        'nearest_district': 0,
+        'errors': [],
+    }
+
+    def staged_rows():
+        for number, record in read_store_records(lines, input_format):
+            result['received'] += 1
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                values = parse_store_record(record)
+            except ValueError as e:
+                result['invalid'] += 1
+                if len(result['errors']) < MAX_REPORTED_ERRORS:
+                    result['errors'].append({'line': number, 'error': str(e)})
+                continue
+            yield (number,) + values
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(CREATE_STAGING_SQL)
+        cursor.copy_expert(COPY_SQL, _CopyStream(staged_rows()))
+        cursor.execute('ANALYZE store_import')
+        cursor.execute(DEDUPLICATE_SQL)
+        result['duplicates'] = cursor.rowcount
+
+        cursor.execute(ASSIGN_DISTRICTS_SQL)
+        cursor.execute(ASSIGN_NEAREST_DISTRICTS_SQL)
+        result['nearest_district'] = cursor.rowcount
+
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [IMPORT_LOCK_KEY])
+        cursor.execute(UPDATE_STORES_SQL)
+        result['updated'] = cursor.rowcount
+        cursor.execute(INSERT_STORES_SQL, {'city': DEFAULT_CITY})
+        result['created'] = cursor.rowcount
+
+        if result['created'] or result['updated']:
+            bump_cache_versions(Store, District)
+            transaction.on_commit(statistics_cube.invalidate)
+    return result
@@ -0,0 +1,173 @@
+"""
+Map helpers: store locations as Mapbox Vector Tiles and zoom-aware clusters.
+"""
+import json
+
+from django.db import connection
+
+MVT_LAYER_NAME = 'stores'
+MVT_EXTENT = 4096
+MVT_BUFFER = 64
+MAX_TILE_ZOOM = 22
+
+# Clusters are roughly this many screen pixels wide; from this zoom level on,
+# individual stores are returned instead.
+CLUSTER_RADIUS_PX = 60
+CLUSTER_MAX_ZOOM = 16
+# Viewports holding more stores than this are clustered even when zoomed in
+MAX_UNCLUSTERED_STORES = 2000
+# Clustering coarsens the grid so a bounding box spans at most this many cells
+# per side, however large the box is for the zoom level
+MAX_CLUSTER_CELLS_PER_SIDE = 64
+
+STORE_TILE_SQL = """
+WITH bounds AS (
+    SELECT ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS geom_3857,
+           ST_Transform(ST_TileEnvelope(%(z)s, %(x)s, %(y)s), 4326) AS geom_4326
+),
+tile_stores AS (
+    SELECT ST_AsMVTGeom(ST_Transform(s.location, 3857), bounds.geom_3857, %(extent)s, %(buffer)s, true) AS geom,
+           s.id,
+           s.store_type,
+           s.is_active,
+           s.rating::double precision AS rating
+    FROM stores_store s, bounds
+    WHERE s.location && bounds.geom_4326
+      {filters}
+)
+SELECT ST_AsMVT(tile_stores.*, %(layer)s, %(extent)s, 'geom') FROM tile_stores
+"""
+
+
+def is_valid_tile(z, x, y):
+    """Return True if (z, x, y) addresses an existing XYZ tile."""
+    if z < 0 or z > MAX_TILE_ZOOM:
+        return False
+    tiles_per_side = 2 ** z
+    return 0 <= x < tiles_per_side and 0 <= y < tiles_per_side
+
+
+def get_store_tile(z, x, y, is_active=None, store_type=None):
+    """
+    Render the stores inside one XYZ tile as a Mapbox Vector Tile.
+
+    Only stores intersecting the tile envelope are read (via the GiST index on
+    ``location``), and each feature carries id, store_type, is_active and rating.
+
+    Args:
+        z, x, y: Tile coordinates
+        is_active: Optional active-status filter
+        store_type: Optional store type filter
+
+    Returns:
+        Tile contents as bytes (empty when the tile has no stores)
+    """
+    params = {
+        'z': z,
+        'x': x,
+        'y': y,
+        'extent': MVT_EXTENT,
+        'buffer': MVT_BUFFER,
+        'layer': MVT_LAYER_NAME,
+    }
+    filters = []
+    if is_active is not None:
+        filters.append('AND s.is_active = %(is_active)s')
+        params['is_active'] = is_active
+    if store_type:
+        filters.append('AND s.store_type = %(store_type)s')
+        params['store_type'] = store_type
+
+    with connection.cursor() as cursor:
+        cursor.execute(STORE_TILE_SQL.format(filters=' '.join(filters)), params)
+        row = cursor.fetchone()
+
+    if row is None or row[0] is None:
+        return b''
+    return bytes(row[0])
+
+
+STORE_CLUSTER_SQL = """
+WITH cells AS (
+    SELECT floor(ST_X(s.location) / %(cell_size)s) AS cell_x,
+           floor(ST_Y(s.location) / %(cell_size)s) AS cell_y,
+           s.store_type,
+           count(*) AS store_count,
+           sum(ST_X(s.location)) AS sum_x,
+           sum(ST_Y(s.location)) AS sum_y
+    FROM stores_store s
+    WHERE s.location && ST_MakeEnvelope(%(xmin)s, %(ymin)s, %(xmax)s, %(ymax)s, 4326)
+      {filters}
+    GROUP BY 1, 2, 3
+)
+SELECT sum(store_count)::integer AS store_count,
+       sum(sum_x) / sum(store_count) AS longitude,
+       sum(sum_y) / sum(store_count) AS latitude,
+       jsonb_object_agg(store_type, store_count) AS store_types
+FROM cells
+GROUP BY cell_x, cell_y
+ORDER BY store_count DESC
+"""
+
+
+def get_cluster_cell_size(zoom):
+    """Grid cell size in degrees for clustering at a web-map zoom level."""
+    return CLUSTER_RADIUS_PX * 360.0 / (256 * 2 ** zoom)
+
+
+def get_cluster_zoom(bbox, zoom):
+    """The zoom level to cluster ``bbox`` at: ``zoom``, lowered until the box spans few enough cells."""
+    xmin, ymin, xmax, ymax = bbox
+    span = max(xmax - xmin, ymax - ymin)
+    while zoom > 0 and span / get_cluster_cell_size(zoom) > MAX_CLUSTER_CELLS_PER_SIDE:
+        zoom -= 1
+    return zoom
+
+
+def get_store_clusters(bbox, zoom, is_active=None, store_type=None):
+    """
+    Aggregate stores inside a bounding box into grid clusters in the database.
+
+    Stores are snapped to a grid whose cell size follows the zoom level, and each
+    cell becomes one cluster with its store count, centroid and per-store_type
+    breakdown. Boxes too large for the zoom level are clustered on a coarser
+    grid (see ``get_cluster_zoom``), so the number of clusters stays bounded.
+
+    Args:
+        bbox: (min_longitude, min_latitude, max_longitude, max_latitude)
+        zoom: Web-map zoom level
+        is_active: Optional active-status filter
+        store_type: Optional store type filter
+
+    Returns:
+        List of cluster dictionaries, largest first
+    """
+    xmin, ymin, xmax, ymax = bbox
+    params = {
+        'cell_size': get_cluster_cell_size(get_cluster_zoom(bbox, zoom)),
+        'xmin': xmin,
+        'ymin': ymin,
+        'xmax': xmax,
+        'ymax': ymax,
+    }
+    filters = []
+    if is_active is not None:
+        filters.append('AND s.is_active = %(is_active)s')
+        params['is_active'] = is_active
+    if store_type:
+        filters.append('AND s.store_type = %(store_type)s')
+        params['store_type'] = store_type
+
+    with connection.cursor() as cursor:
+        cursor.execute(STORE_CLUSTER_SQL.format(filters=' '.join(filters)), params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'count': store_count,
+            'latitude': latitude,
+            'longitude': longitude,
+            'store_types': store_types if isinstance(store_types, dict) else json.loads(store_types),
+        }
+        for store_count, longitude, latitude, store_types in rows
+    ]
@@ -2,30 +2,80 @@
 Django REST framework API views for the stores app with spatial querying support.
 """
 
+import codecs
+import copy
+import datetime
+
 from django.shortcuts import render
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from django.contrib.gis.geos import Point
-from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point, Polygon
+from django.contrib.gis.db.models.functions import Centroid, Distance, GeometryDistance
 from django.contrib.gis.measure import D
 from django.db.models import Count, Avg, Q
-from functools import reduce
-import operator
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
+from pyroaring import BitMap
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
 
-from .models import Store, Item, Inventory, District, Review
+from .models import Store, Item, Inventory, District, Review, AnalyticsSnapshot
 from .serializers import (
     StoreSerializer, ItemSerializer, InventorySerializer, DistrictSerializer, 
     StoreListSerializer, InventoryListSerializer, SpatialSearchSerializer, 
     DistrictSearchSerializer, StoreStatisticsSerializer, DistrictStatisticsSerializer, 
-    StoreLocationSerializer, ReviewSerializer, ReviewListSerializer, StoreWithReviewsSerializer
+    StoreLocationSerializer, ReviewSerializer, ReviewListSerializer, StoreWithReviewsSerializer,
+    NearestStoreSearchSerializer, NearestStoreSerializer, StoreClusterSearchSerializer,
+    BasketSearchSerializer, BasketStoreSerializer, NearestItemStoresSearchSerializer,
+)
+from .utils.search_helpers import search_stores
+from .utils.spatial_helpers import get_nearest_stores, get_nearest_stores_per_item
+from .utils.availability_index import availability_index, store_ids_filter
+from .utils.basket_search import find_basket_stores, resolve_basket_items
+from .utils.store_import import IMPORT_FORMATS, IMPORT_MEDIA_TYPES, import_stores
+from .utils.inventory_upsert import UPSERT_STATUSES, upsert_inventory
+from .utils.inventory_events import EventBufferFull, get_event_buffer, get_ingestion_metrics, parse_inventory_event
+from .utils.district_index import district_index
+from .utils.response_cache import cached_response
+from .utils.analytics_counters import build_analytics_payload, get_analytics_counters
+from .utils.statistics_cube import MEASURES as CUBE_MEASURES, statistics_cube
+from .utils.analytics_snapshots import TREND_INTERVALS, TREND_METRICS, choose_interval, get_trends
+from .utils.geometry_encoding import get_coordinate_precision
+from .utils.boundary_helpers import (
+    BOUNDARY_DETAIL_LEVELS, DEFAULT_BOUNDARY_DETAIL, DEFAULT_GEOMETRY_FORMAT,
+    boundary_field_for_detail, get_boundary_options,
+)
+from .utils.tile_helpers import (
+    get_store_tile, is_valid_tile, get_store_clusters, CLUSTER_MAX_ZOOM, MAX_UNCLUSTERED_STORES,
 )
+from .renderers import MVTRenderer, GeometryRenderer, GEOMETRY_RENDERER_CLASSES
+from .parsers import NDJSONParser
+from .fieldsets import SparseFieldsetViewMixin
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(name='fields', type=str, description='Comma-separated fields to return'),
+    OpenApiParameter(name='exclude', type=str, description='Comma-separated fields to leave out'),
+    OpenApiParameter(name='expand', type=str, description='Comma-separated nested objects to include'),
+    OpenApiParameter(name='sideload', type=bool,
+                     description='Return related objects once in a top-level "included" map instead of nesting them'),
+]
+
+GEOMETRY_ENCODING_PARAMETERS = [
+    OpenApiParameter(name='precision', type=int,
+                     description='Decimal places kept per coordinate (0-15)'),
+    OpenApiParameter(name='format', type=str, enum=['json', 'topojson', 'polyline'],
+                     description='Response encoding; also selectable with the Accept header'),
+]
 
-class StoreViewSet(viewsets.ModelViewSet):
+
+@extend_schema_view(
+    list=extend_schema(parameters=FIELDSET_PARAMETERS + GEOMETRY_ENCODING_PARAMETERS),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS + GEOMETRY_ENCODING_PARAMETERS),
+)
+class StoreViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     API endpoint for viewing and editing stores.
     
@@ -39,10 +89,19 @@ class StoreViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'address', 'city']
     ordering_fields = ['name', 'city', 'rating', 'created_at']
     ordering = ['name']
+    keyset_ordering = ('name', 'id')
+    renderer_classes = GEOMETRY_RENDERER_CLASSES
+    topology_object_name = 'stores'
 
     def get_queryset(self):
-        """Optimize queryset with select_related and prefetch_related."""
-        return Store.objects.select_related('district_obj').prefetch_related('inventories')
+        """Optimize queryset with select_related; inventory counts are stored on the row."""
+        return Store.objects.select_related('district_obj')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request is not None:
+            context['coordinate_precision'] = get_coordinate_precision(self.request.query_params)
+        return context
 
     def get_serializer_class(self):
         """Use different serializers for different actions."""
@@ -62,6 +121,9 @@ class StoreViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='statistics')
     def statistics(self, request):
         """Get store statistics."""
+        return cached_response(request, 'store-statistics', (Store, District, Inventory), self.compute_statistics)
+
+    def compute_statistics(self):
         queryset = self.get_queryset()
         
         stats = {
@@ -79,6 +141,7 @@ class StoreViewSet(viewsets.ModelViewSet):
     @extend_schema(
         summary="Get store locations",
         description="Get store locations with minimal data for map display",
+        parameters=GEOMETRY_ENCODING_PARAMETERS,
         responses={200: StoreLocationSerializer(many=True)}
     )
     @action(detail=False, methods=['get'], url_path='locations')
@@ -92,9 +155,176 @@ class StoreViewSet(viewsets.ModelViewSet):
             is_active_bool = is_active.lower() in ['true', '1', 'yes']
             queryset = queryset.filter(is_active=is_active_bool)
         
-        serializer = StoreLocationSerializer(queryset, many=True)
+        serializer = StoreLocationSerializer(queryset, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
 
+    @extend_schema(
+        summary="Find nearest stores",
+        description="Find the N nearest stores to a point using the spatial index (KNN), with distances in meters",
+        parameters=[
+            OpenApiParameter(name='latitude', type=float, required=True, description='Latitude coordinate'),
+            OpenApiParameter(name='longitude', type=float, required=True, description='Longitude coordinate'),
+            OpenApiParameter(name='limit', type=int, description='Number of stores to return (1-100, default 10)'),
+            OpenApiParameter(name='store_type', type=str, description='Filter by store type'),
+            OpenApiParameter(name='is_active', type=bool, description='Filter by active status'),
+        ],
+        responses={200: NearestStoreSerializer(many=True)}
+    )
+    @action(detail=False, methods=['get'], url_path='nearest')
+    def nearest(self, request):
+        """Find the nearest stores to a point, closest first."""
+        serializer = NearestStoreSearchSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        user_location = Point(data['longitude'], data['latitude'], srid=4326)
+        stores = get_nearest_stores(
+            user_location,
+            limit=data['limit'],
+            store_type=data.get('store_type'),
+            is_active=data.get('is_active'),
+        )
+        
+        return Response(NearestStoreSerializer(stores, many=True, context=self.get_serializer_context()).data)
+
+    @extend_schema(
+        summary="Bulk import stores",
+        description=(
+            "Create or update stores from a CSV (with a header row), NDJSON or GeoJSON body. "
+            "Stores are matched to existing ones by name, and districts are assigned from the "
+            "coordinates (the nearest district for stores outside every boundary). The body is "
+            "streamed into the database, so very large files can be sent in one request."
+        ),
+        parameters=[
+            OpenApiParameter(name='input_format', type=str, enum=list(IMPORT_FORMATS),
+                             description='Body format (default: from the Content-Type header)'),
+        ],
+        request={
+            'text/csv': {'type': 'string'},
+            'application/x-ndjson': {'type': 'string'},
+            'application/geo+json': {'type': 'object'},
+        },
+    )
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """Create or update stores in bulk."""
+        media_type = (request.content_type or '').split(';')[0].strip().lower()
+        input_format = request.query_params.get('input_format') or IMPORT_MEDIA_TYPES.get(media_type)
+        if input_format not in IMPORT_FORMATS:
+            return Response(
+                {'error': f'Unsupported import format; use one of: {", ".join(IMPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            result = import_stores(codecs.iterdecode(request.stream or [], 'utf-8'), input_format)
+        except UnicodeDecodeError:
+            return Response(
+                {'error': 'Request body must be UTF-8 encoded'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(result)
+
+    @extend_schema(
+        summary="Basket search",
+        description=(
+            "Find the nearest stores where every item on a shopping list is available, optionally also "
+            "stores missing at most max_missing items. Results are ranked by distance, then by items carried."
+        ),
+        request=BasketSearchSerializer,
+        responses={200: BasketStoreSerializer(many=True)},
+        examples=[
+            OpenApiExample(
+                'Basket of three items',
+                value={'items': [12, 'Coca Cola', 'Instant Noodles'], 'latitude': 10.7769,
+                       'longitude': 106.7009, 'max_missing': 1, 'limit': 5},
+                request_only=True,
+            ),
+        ]
+    )
+    @action(detail=False, methods=['post'], url_path='basket-search')
+    def basket_search(self, request):
+        """Find the nearest stores carrying a basket of items."""
+        serializer = BasketSearchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        items, unknown = resolve_basket_items(data['items'])
+        if unknown:
+            return Response(
+                {'error': 'Unknown items', 'items': unknown},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        stores = find_basket_stores(
+            Point(data['longitude'], data['latitude'], srid=4326),
+            [item.id for item in items],
+            max_missing=min(data['max_missing'], len(items) - 1),
+            limit=data['limit'],
+            radius_km=data.get('radius_km'),
+            is_active=data['is_active'],
+        )
+        return Response({
+            'items': [{'id': item.id, 'name': item.name} for item in items],
+            'results': BasketStoreSerializer(stores, many=True, context=self.get_serializer_context()).data,
+        })
+
+    @extend_schema(
+        summary="Get store clusters",
+        description=(
+            "Get zoom-aware store clusters inside a bounding box, aggregated in the database. "
+            "Each cluster has a count, centroid and per-store_type breakdown; individual stores "
+            f"are returned instead from zoom {CLUSTER_MAX_ZOOM} on, unless the viewport holds more "
+            f"than {MAX_UNCLUSTERED_STORES} of them."
+        ),
+        parameters=[
+            OpenApiParameter(name='bbox', type=str, required=True, description='Bounding box as min_lng,min_lat,max_lng,max_lat'),
+            OpenApiParameter(name='zoom', type=int, required=True, description='Map zoom level (0-22)'),
+            OpenApiParameter(name='store_type', type=str, description='Filter by store type'),
+            OpenApiParameter(name='is_active', type=bool, description='Filter by active status'),
+        ]
+    )
+    @action(detail=False, methods=['get'], url_path='clusters')
+    def clusters(self, request):
+        """Get store clusters (or individual stores when zoomed in) for a map viewport."""
+        serializer = StoreClusterSearchSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        zoom = data['zoom']
+        
+        if zoom >= CLUSTER_MAX_ZOOM:
+            viewport = Polygon.from_bbox(data['bbox'])
+            viewport.srid = 4326
+            queryset = Store.objects.filter(location__bboverlaps=viewport)
+            if data.get('is_active') is not None:
+                queryset = queryset.filter(is_active=data['is_active'])
+            if data.get('store_type'):
+                queryset = queryset.filter(store_type=data['store_type'])
+            stores = list(queryset[:MAX_UNCLUSTERED_STORES + 1])
+            if len(stores) <= MAX_UNCLUSTERED_STORES:
+                return Response({
+                    'zoom': zoom,
+                    'clustered': False,
+                    'clusters': [],
+                    'stores': StoreLocationSerializer(stores, many=True, context=self.get_serializer_context()).data,
+                })
+            # Too many stores to list individually: cluster them instead
+        
+        return Response({
+            'zoom': zoom,
+            'clustered': True,
+            'clusters': get_store_clusters(
+                data['bbox'], min(zoom, CLUSTER_MAX_ZOOM - 1),
+                is_active=data.get('is_active'),
+                store_type=data.get('store_type'),
+            ),
+            'stores': [],
+        })
+
     @extend_schema(
         summary="Get store inventory",
         description="Get all inventory items for a specific store",
@@ -108,6 +338,7 @@ class StoreViewSet(viewsets.ModelViewSet):
         try:
             store = self.get_object()
             inventory_items = store.inventories.all()
+            self.keyset_ordering = ('created_at', 'id')
             
             page = self.paginate_queryset(inventory_items)
             if page is not None:
@@ -126,7 +357,7 @@ class StoreViewSet(viewsets.ModelViewSet):
         summary="Search stores",
         description="Search stores with multiple filters including location, inventory, and other criteria",
         parameters=[
-            OpenApiParameter(name='search', type=str, description='Search by store name, address, or city'),
+            OpenApiParameter(name='search', type=str, description='Search by store name, address, district or city (accent-insensitive, ranked by relevance)'),
             OpenApiParameter(name='district', type=str, description='Filter by district ID or name'),
             OpenApiParameter(name='store_type', type=str, description='Filter by store type'),
             OpenApiParameter(name='is_active', type=bool, description='Filter by active status'),
@@ -136,7 +367,9 @@ class StoreViewSet(viewsets.ModelViewSet):
             OpenApiParameter(name='radius_km', type=float, description='Search radius in kilometers (requires lat/lng)'),
             OpenApiParameter(name='sort_by_distance', type=bool, description='Sort results by distance (requires lat/lng)'),
             OpenApiParameter(name='page', type=int, description='Page number'),
-            OpenApiParameter(name='limit', type=int, description='Number of results per page'),
+            OpenApiParameter(name='page_size', type=int, description='Number of results per page (max 100)'),
+            OpenApiParameter(name='pagination', type=str, description="Set to 'cursor' for keyset pagination keyed on (name, id), or (distance, id) when sorting by distance"),
+            OpenApiParameter(name='cursor', type=str, description='Opaque cursor from the previous keyset page'),
         ],
         examples=[
             OpenApiExample(
@@ -173,16 +406,9 @@ class StoreViewSet(viewsets.ModelViewSet):
         # Start with base queryset
         queryset = self.get_queryset()
 
-        # Apply text search filter
+        # Apply text search filter (full-text + trigram, accent-insensitive, relevance-ranked)
         if search_text:
-            search_conditions = [
-                Q(name__icontains=search_text),
-                Q(address__icontains=search_text),
-                Q(city__icontains=search_text),
-                Q(district__icontains=search_text)
-            ]
-            search_q = reduce(operator.or_, search_conditions)
-            queryset = queryset.filter(search_q)
+            queryset = search_stores(queryset, search_text)
 
         # Apply district filter
         if district:
@@ -205,13 +431,12 @@ class StoreViewSet(viewsets.ModelViewSet):
             is_active_bool = is_active.lower() in ['true', '1', 'yes']
             queryset = queryset.filter(is_active=is_active_bool)
 
-        # Apply inventory filter
+        # Apply inventory filter: stores where any matching item is available,
+        # resolved from the availability bitmaps instead of a join + DISTINCT
         if inventory_item:
-            # Filter stores that have the specific inventory item available
-            queryset = queryset.filter(
-                inventories__item__name__icontains=inventory_item,
-                inventories__is_available=True
-            ).distinct()
+            item_ids = Item.objects.filter(name__icontains=inventory_item).values_list('id', flat=True)
+            store_ids = availability_index.stores_with_any(item_ids)
+            queryset = queryset.filter(store_ids_filter(store_ids))
 
         # Apply location-based filtering and sorting
         if latitude and longitude:
@@ -220,21 +445,24 @@ class StoreViewSet(viewsets.ModelViewSet):
                 lng = float(longitude)
                 user_location = Point(lng, lat, srid=4326)
 
-                # Add distance annotation for sorting
+                # Add distance annotation (meters, on the geography column)
                 queryset = queryset.annotate(
-                    distance=Distance('location', user_location)
+                    distance=Distance('location_geog', user_location)
                 )
 
-                # Apply radius filter if provided
+                # Apply radius filter if provided (index-bounded ST_DWithin in meters)
                 if radius_km:
                     radius = float(radius_km)
                     queryset = queryset.filter(
-                        location__distance_lte=(user_location, D(km=radius))
+                        location_geog__dwithin=(user_location, D(km=radius))
                     )
 
-                # Sort by distance if requested or if no radius is specified (automatic nearby sorting)
+                # Sort by distance if requested, using the index-assisted KNN operator (<->)
                 if sort_by_distance and sort_by_distance.lower() in ['true', '1', 'yes']:
-                    queryset = queryset.order_by('distance')
+                    queryset = queryset.annotate(
+                        knn_distance=GeometryDistance('location_geog', user_location)
+                    ).order_by('knn_distance')
+                    self.keyset_ordering = ('knn_distance', 'id')
 
             except (ValueError, TypeError) as e:
                 return Response(
@@ -242,9 +470,13 @@ class StoreViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        # Apply default ordering if no distance sorting
+        # Apply default ordering if no distance sorting: by relevance when searching, else by name
         if not (latitude and longitude and sort_by_distance and sort_by_distance.lower() in ['true', '1', 'yes']):
-            queryset = queryset.order_by('name')
+            if search_text:
+                queryset = queryset.order_by('-search_rank', 'name')
+                self.keyset_ordering = ('-search_rank', 'id')
+            else:
+                queryset = queryset.order_by('name')
 
         # Paginate results
         page = self.paginate_queryset(queryset)
@@ -286,7 +518,11 @@ class StoreViewSet(viewsets.ModelViewSet):
         })
 
 
-class ItemViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(parameters=FIELDSET_PARAMETERS),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+class ItemViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     API endpoint for viewing and editing items.
     
@@ -300,6 +536,7 @@ class ItemViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description', 'brand', 'barcode']
     ordering_fields = ['name', 'category', 'brand', 'created_at']
     ordering = ['name']
+    keyset_ordering = ('name', 'id')
 
     def get_queryset(self):
         """Optimize queryset with prefetch_related."""
@@ -350,6 +587,9 @@ class ItemViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='statistics')
     def statistics(self, request):
         """Get item statistics."""
+        return cached_response(request, 'item-statistics', (Item, Inventory), self.compute_statistics)
+
+    def compute_statistics(self):
         queryset = self.get_queryset()
         
         stats = {
@@ -357,11 +597,38 @@ class ItemViewSet(viewsets.ModelViewSet):
             'active_items': queryset.filter(is_active=True).count(),
             'items_by_category': dict(queryset.values_list('category').annotate(count=Count('id'))),
             'items_by_brand': dict(queryset.values_list('brand').annotate(count=Count('id'))),
-            'items_in_stock': queryset.filter(inventories__is_available=True).distinct().count(),
+            'items_in_stock': availability_index.items_in_stock(queryset.values_list('id', flat=True)),
         }
         
         return Response(stats)
 
+    @extend_schema(
+        summary="Get item availability",
+        description="Count the stores where this item is available, optionally within one district",
+        parameters=[
+            OpenApiParameter(name='district', type=int, description='Only count stores in this district'),
+        ],
+        responses={200: dict}
+    )
+    @action(detail=True, methods=['get'], url_path='availability')
+    def availability(self, request, pk=None):
+        """Count the stores where this item is available."""
+        item = self.get_object()
+        district = request.query_params.get('district', '').strip()
+        store_ids = None
+        if district:
+            try:
+                district_id = int(district)
+            except ValueError:
+                return Response({'error': 'district must be a district ID'}, status=status.HTTP_400_BAD_REQUEST)
+            store_ids = BitMap(Store.objects.filter(district_obj_id=district_id).values_list('id', flat=True))
+        
+        return Response({
+            'item_id': item.id,
+            'district': int(district) if district else None,
+            'available_store_count': availability_index.count_stores(item.id, store_ids),
+        })
+
     @extend_schema(
         summary="Get stores for item",
         description="Get all stores that stock this item",
@@ -387,7 +654,11 @@ class ItemViewSet(viewsets.ModelViewSet):
             )
 
 
-class InventoryViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(parameters=FIELDSET_PARAMETERS),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+class InventoryViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     API endpoint for viewing and editing inventory entries.
     
@@ -401,6 +672,9 @@ class InventoryViewSet(viewsets.ModelViewSet):
     search_fields = ['item__name', 'store__name', 'item__brand']
     ordering_fields = ['item__name', 'created_at']
     ordering = ['item__name']
+    keyset_ordering = ('created_at', 'id')
+    bulk_upsert_max_rows = 20000
+    ingest_max_events = 10000
 
     def get_queryset(self):
         """Optimize queryset with select_related."""
@@ -412,6 +686,144 @@ class InventoryViewSet(viewsets.ModelViewSet):
             return InventoryListSerializer
         return InventorySerializer
 
+    @extend_schema(
+        summary="Bulk upsert inventory",
+        description=(
+            "Create or update many inventory entries in one request. Rows are validated with one "
+            "query per table and written in batches; the response lists one status per row, in order. "
+            "Accepts a JSON array or newline-delimited JSON."
+        ),
+        request={
+            'application/json': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'store_id': {'type': 'integer'},
+                        'item_id': {'type': 'integer'},
+                        'is_available': {'type': 'boolean', 'default': True},
+                    },
+                    'required': ['store_id', 'item_id'],
+                }
+            }
+        },
+        examples=[
+            OpenApiExample(
+                'Stock sync',
+                value=[
+                    {'store_id': 1, 'item_id': 10, 'is_available': True},
+                    {'store_id': 1, 'item_id': 11, 'is_available': False},
+                ],
+                request_only=True,
+            ),
+        ]
+    )
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk-upsert',
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def bulk_upsert(self, request):
+        """Create or update inventory entries in bulk."""
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {'error': 'Request body must be an array of inventory rows'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > self.bulk_upsert_max_rows:
+            return Response(
+                {'error': f'At most {self.bulk_upsert_max_rows} rows can be upserted per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        statuses = upsert_inventory(rows)
+        counts = {name: 0 for name in UPSERT_STATUSES}
+        for row_status in statuses:
+            counts[row_status] += 1
+        return Response({
+            'count': len(statuses),
+            'counts': counts,
+            'statuses': statuses,
+        })
+
+    @extend_schema(
+        summary="Ingest inventory events",
+        description=(
+            "Queue availability events for the ingestion worker, which coalesces them per store and item "
+            "(latest occurred_at wins) and applies them in batches. Accepts a JSON array or newline-delimited JSON."
+        ),
+        request={
+            'application/json': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'store_id': {'type': 'integer'},
+                        'item_id': {'type': 'integer'},
+                        'is_available': {'type': 'boolean'},
+                        'occurred_at': {'type': 'string', 'format': 'date-time'},
+                    },
+                    'required': ['store_id', 'item_id', 'is_available'],
+                }
+            }
+        },
+    )
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='events',
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def ingest_events(self, request):
+        """Queue inventory availability events."""
+        events = request.data
+        if not isinstance(events, list):
+            return Response(
+                {'error': 'Request body must be an array of inventory events'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(events) > self.ingest_max_events:
+            return Response(
+                {'error': f'At most {self.ingest_max_events} events can be sent per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        parsed = []
+        for index, event in enumerate(events):
+            values = parse_inventory_event(event)
+            if values is None or 'is_available' not in event:
+                return Response(
+                    {'error': f'Invalid inventory event at index {index}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            parsed.append(values)
+
+        try:
+            get_event_buffer().append(parsed)
+        except EventBufferFull as e:
+            return Response(
+                {'error': f'Inventory event backlog is full, retry later: {str(e)}'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '5'},
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'Could not queue inventory events: {str(e)}'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        return Response({'accepted': len(parsed)}, status=status.HTTP_202_ACCEPTED)
+
+    @extend_schema(
+        summary="Inventory ingestion metrics",
+        description="Lag and throughput of the inventory event worker's last flush, totals, and the current backlog",
+    )
+    @action(detail=False, methods=['get'], url_path='events/metrics')
+    def ingestion_metrics(self, request):
+        """Get inventory event ingestion metrics."""
+        return Response(get_ingestion_metrics())
+
     @extend_schema(
         summary="Search inventory by store location",
         description="Find inventory items in stores within a specified radius",
@@ -434,15 +846,17 @@ class InventoryViewSet(viewsets.ModelViewSet):
         category = request.query_params.get('category')
         
         queryset = self.get_queryset().filter(
-            store__location__distance_lte=(user_location, D(km=data['radius_km']))
+            store__location_geog__dwithin=(user_location, D(km=data['radius_km']))
         ).annotate(
-            distance=Distance('store__location', user_location)
+            distance=Distance('store__location_geog', user_location),
+            knn_distance=GeometryDistance('store__location_geog', user_location)
         )
+        self.keyset_ordering = ('knn_distance', 'id')
         
         if category:
-            queryset = queryset.filter(category=category)
+            queryset = queryset.filter(item__category=category)
         
-        queryset = queryset.order_by('distance')
+        queryset = queryset.order_by('knn_distance')
         
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -452,6 +866,58 @@ class InventoryViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    @extend_schema(
+        summary="Nearest stores with an item",
+        description=(
+            "For each requested item, get the nearest stores where it is available, closest first. "
+            "Each item is answered by a nearest-first walk of the store location index."
+        ),
+        parameters=[
+            OpenApiParameter(name='latitude', type=float, required=True, description='Latitude coordinate'),
+            OpenApiParameter(name='longitude', type=float, required=True, description='Longitude coordinate'),
+            OpenApiParameter(name='items', type=str, required=True, description='Comma-separated item IDs (up to 50)'),
+            OpenApiParameter(name='limit', type=int, description='Stores per item (1-20, default 3)'),
+            OpenApiParameter(name='is_active', type=bool, description='Filter by store active status (default true)'),
+        ]
+    )
+    @action(detail=False, methods=['get'], url_path='nearest-stores')
+    def nearest_stores(self, request):
+        """Get the nearest stores where each item is available."""
+        serializer = NearestItemStoresSearchSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        items = Item.objects.in_bulk(data['items'])
+        missing = [item_id for item_id in data['items'] if item_id not in items]
+        if missing:
+            return Response(
+                {'error': 'Unknown items', 'items': missing},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        nearest = get_nearest_stores_per_item(
+            Point(data['longitude'], data['latitude'], srid=4326),
+            data['items'],
+            limit=data['limit'],
+            is_active=data['is_active'],
+        )
+        stores = Store.objects.in_bulk({store_id for entries in nearest.values() for store_id, _ in entries})
+        context = self.get_serializer_context()
+        
+        results = []
+        for item_id in data['items']:
+            item_stores = []
+            for store_id, distance in nearest[item_id]:
+                store = copy.copy(stores[store_id])
+                store.distance = D(m=distance)
+                item_stores.append(store)
+            results.append({
+                'item': {'id': item_id, 'name': items[item_id].name, 'category': items[item_id].category},
+                'stores': NearestStoreSerializer(item_stores, many=True, context=context).data,
+            })
+        return Response({'results': results})
+
     @extend_schema(
         summary="Search inventory by item",
         description="Find inventory items by name, category, or store",
@@ -502,6 +968,9 @@ class InventoryViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='statistics')
     def statistics(self, request):
         """Get inventory statistics."""
+        return cached_response(request, 'inventory-statistics', (Inventory, Item, Store), self.compute_statistics)
+
+    def compute_statistics(self):
         queryset = self.get_queryset()
         
         stats = {
@@ -522,6 +991,9 @@ class InventoryViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='available-items')
     def available_items(self, request):
         """Get list of available inventory items."""
+        return cached_response(request, 'available-items', (Inventory, Item), self.compute_available_items)
+
+    def compute_available_items(self):
         items = self.get_queryset().filter(
             is_available=True
         ).values_list('item__name', flat=True).distinct().order_by('item__name')
@@ -530,7 +1002,22 @@ class InventoryViewSet(viewsets.ModelViewSet):
             'items': list(items)
         })
 
-class DistrictViewSet(viewsets.ModelViewSet):
+BOUNDARY_PARAMETERS = [
+    OpenApiParameter(name='detail', type=str, enum=list(BOUNDARY_DETAIL_LEVELS),
+                     description='Boundary detail level (default full)'),
+    OpenApiParameter(name='zoom', type=int,
+                     description='Web-map zoom level; picks the detail level when detail is not given'),
+    OpenApiParameter(name='geometry', type=str, enum=['wkt', 'geojson', 'both', 'none'],
+                     description='Boundary encoding(s) to include (default both)'),
+    *GEOMETRY_ENCODING_PARAMETERS,
+]
+
+
+@extend_schema_view(
+    list=extend_schema(parameters=FIELDSET_PARAMETERS + BOUNDARY_PARAMETERS),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS + BOUNDARY_PARAMETERS),
+)
+class DistrictViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     API endpoint for viewing and editing districts.
     
@@ -544,10 +1031,61 @@ class DistrictViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'code', 'city']
     ordering_fields = ['name', 'city', 'population', 'area_km2', 'avg_income', 'created_at']
     ordering = ['name']
+    keyset_ordering = ('name', 'id')
+    batch_lookup_max_points = 50000
+    boundary_actions = ('list', 'retrieve', 'search_districts')
+    renderer_classes = GEOMETRY_RENDERER_CLASSES
+    topology_object_name = 'districts'
 
     def get_queryset(self):
-        """Optimize queryset with select_related and prefetch_related."""
-        return District.objects.select_related().prefetch_related('stores')
+        """Load only the boundary detail level being returned; store counts are precomputed."""
+        queryset = District.objects.all()
+        if self.action not in self.boundary_actions:
+            return queryset
+        detail, geometry_format = self.get_boundary_options()
+        display_field = boundary_field_for_detail(detail)
+        unused = [
+            field for field, _ in BOUNDARY_DETAIL_LEVELS.values()
+            if field != display_field or geometry_format == 'none'
+        ]
+        # Centroid of the full boundary, computed in the same query whether or not it is loaded
+        queryset = queryset.annotate(boundary_centroid=Centroid('boundary'))
+        return queryset.defer(*unused)
+
+    def get_boundary_options(self):
+        """Boundary detail level and geometry encoding requested by the client."""
+        if not hasattr(self, '_boundary_options'):
+            if self.request is not None and self.request.method == 'GET':
+                detail, geometry_format = get_boundary_options(self.request.query_params)
+                if isinstance(getattr(self.request, 'accepted_renderer', None), GeometryRenderer):
+                    # TopoJSON and polylines are built from the GeoJSON encoding
+                    geometry_format = 'geojson'
+                self._boundary_options = (detail, geometry_format)
+            else:
+                self._boundary_options = (DEFAULT_BOUNDARY_DETAIL, DEFAULT_GEOMETRY_FORMAT)
+        return self._boundary_options
+
+    def get_field_sources(self, serializer_class):
+        """Point the boundary fields at the detail level being returned."""
+        sources = super().get_field_sources(serializer_class)
+        detail, _ = self.get_boundary_options()
+        display_field = boundary_field_for_detail(detail)
+        sources['boundary'] = sources['boundary_geojson'] = (display_field,)
+        if self.action in self.boundary_actions:
+            sources['centroid'] = ()  # Annotated in get_queryset()
+        return sources
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['boundary_detail'], context['geometry_format'] = self.get_boundary_options()
+        if self.request is not None:
+            context['coordinate_precision'] = get_coordinate_precision(self.request.query_params)
+        return context
+
+    def list(self, request, *args, **kwargs):
+        """List districts; responses are cached until a district or store changes."""
+        compute = super().list
+        return cached_response(request, 'district-list', (District, Store), lambda: compute(request, *args, **kwargs))
 
     @extend_schema(
         summary="Search districts",
@@ -556,6 +1094,7 @@ class DistrictViewSet(viewsets.ModelViewSet):
             OpenApiParameter(name='district_id', type=int, description='District ID'),
             OpenApiParameter(name='district_name', type=str, description='District name'),
             OpenApiParameter(name='district_type', type=str, description='District type (urban/suburban/rural)'),
+            *BOUNDARY_PARAMETERS,
         ],
         examples=[
             OpenApiExample(
@@ -603,6 +1142,9 @@ class DistrictViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='statistics')
     def statistics(self, request):
         """Get district statistics."""
+        return cached_response(request, 'district-statistics', (District,), self.compute_statistics)
+
+    def compute_statistics(self):
         queryset = self.get_queryset()
         
         stats = {
@@ -678,11 +1220,8 @@ class DistrictViewSet(viewsets.ModelViewSet):
             # Create point from coordinates
             point = Point(lng, lat, srid=4326)
             
-            # Find district that contains this point using spatial query
-            district = District.objects.filter(
-                boundary__contains=point,
-                is_active=True
-            ).first()
+            # Find district that contains this point using the in-process boundary index
+            district = district_index.lookup(point)
             
             if district:
                 return Response({
@@ -708,6 +1247,103 @@ class DistrictViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @extend_schema(
+        summary="Batch lookup districts by coordinates",
+        description=(
+            "Resolve the district for many points in one request. The body is a JSON array "
+            "(or an application/x-ndjson stream, one point per line) of "
+            "{\"latitude\": ..., \"longitude\": ...} objects or [latitude, longitude] pairs. "
+            "Results are returned in input order; pass counts=true to also get the number of "
+            "points per district."
+        ),
+        parameters=[
+            OpenApiParameter(name='counts', type=bool, description='Include per-district point counts'),
+        ],
+        request={
+            'application/json': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'latitude': {'type': 'number'},
+                        'longitude': {'type': 'number'},
+                    }
+                }
+            }
+        },
+        examples=[
+            OpenApiExample(
+                'Batch lookup',
+                value=[{'latitude': 10.7769, 'longitude': 106.7009}, [10.8231, 106.6297]],
+                request_only=True,
+                description='Two points, as an object and as a [latitude, longitude] pair'
+            ),
+        ]
+    )
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='lookup-by-coordinates/batch',
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def batch_lookup_by_coordinates(self, request):
+        """Find the district for each of a batch of coordinates."""
+        points = request.data
+        if not isinstance(points, list):
+            return Response(
+                {'error': 'Request body must be an array of coordinates'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(points) > self.batch_lookup_max_points:
+            return Response(
+                {'error': f'At most {self.batch_lookup_max_points} coordinates can be looked up per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        coordinates = []
+        for index, point in enumerate(points):
+            try:
+                if isinstance(point, dict):
+                    lat, lng = float(point['latitude']), float(point['longitude'])
+                else:
+                    lat, lng = (float(value) for value in point)
+            except (KeyError, TypeError, ValueError):
+                return Response(
+                    {'error': f'Invalid coordinates at index {index}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
+                return Response(
+                    {'error': f'Coordinates out of range at index {index}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            coordinates.append((lng, lat))
+
+        districts = district_index.lookup_many(coordinates)
+
+        results = []
+        counts = {}
+        for (lng, lat), district in zip(coordinates, districts):
+            results.append({
+                'latitude': lat,
+                'longitude': lng,
+                'district_id': district.id if district else None,
+                'district': district.name if district else 'Other',
+            })
+            key = district.id if district else None
+            if key not in counts:
+                counts[key] = {'district_id': key, 'district': results[-1]['district'], 'count': 0}
+            counts[key]['count'] += 1
+
+        data = {
+            'count': len(results),
+            'found': sum(1 for district in districts if district is not None),
+            'results': results,
+        }
+        if request.query_params.get('counts', '').lower() in ('true', '1'):
+            data['district_counts'] = sorted(counts.values(), key=lambda entry: -entry['count'])
+        return Response(data)
+
 class ReviewViewSet(viewsets.ModelViewSet):
     """
     API endpoint for store reviews and ratings.
@@ -720,6 +1356,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
     search_fields = ['comment', 'user__username', 'store__name']
     ordering_fields = ['rating', 'created_at', 'updated_at']
     ordering = ['-created_at']
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         """Filter queryset based on permissions."""
@@ -873,7 +1510,9 @@ class AnalyticsView(APIView):
     """
     API endpoint for comprehensive analytics data.
     
-    Provides all analytics calculations in a single endpoint for better performance.
+    Provides all analytics calculations in a single endpoint. The counts are
+    maintained by database triggers as stores, items and inventory change, so
+    a request reads a handful of counter rows instead of aggregating the tables.
     """
     permission_classes = [AllowAny]  # Allow unauthenticated access for analytics
     
@@ -926,91 +1565,9 @@ class AnalyticsView(APIView):
         }
     )
     def get(self, request):
-        """Get comprehensive analytics data."""
+        """Get comprehensive analytics data from the maintained counters."""
         try:
-            # Get basic counts using efficient queries
-            total_stores = Store.objects.count()
-            active_stores = Store.objects.filter(is_active=True).count()
-            inactive_stores = total_stores - active_stores
-            total_districts = District.objects.count()
-            total_inventory_items = Inventory.objects.count()
-            available_inventory_items = Inventory.objects.filter(is_available=True).count()
-            unavailable_inventory_items = total_inventory_items - available_inventory_items
-            total_items = Item.objects.count()
-            
-            # Stores by district - use database aggregation
-            stores_by_district_raw = Store.objects.values('district').annotate(
-                count=Count('id')
-            ).order_by('-count')
-            
-            stores_by_district = {}
-            for item in stores_by_district_raw:
-                district_name = item['district'] or 'Unknown'
-                stores_by_district[district_name] = item['count']
-            
-            # Stores by type/brand - use database aggregation
-            stores_by_type_raw = Store.objects.values('store_type').annotate(
-                count=Count('id')
-            ).order_by('-count')
-            
-            stores_by_type = {}
-            for item in stores_by_type_raw:
-                store_type = item['store_type'] or 'unknown'
-                stores_by_type[store_type] = item['count']
-            
-            # Top districts (top 5)
-            top_districts = [
-                {'name': district, 'count': count}
-                for district, count in sorted(stores_by_district.items(), key=lambda x: x[1], reverse=True)[:5]
-            ]
-            
-            # Top store types with percentages
-            top_store_types = []
-            for store_type, count in sorted(stores_by_type.items(), key=lambda x: x[1], reverse=True):
-                percentage = (count / total_stores * 100) if total_stores > 0 else 0
-                top_store_types.append({
-                    'type': store_type,
-                    'count': count,
-                    'percentage': round(percentage, 1)
-                })
-            
-            # Inventory by category - use database aggregation through join
-            inventory_by_category_raw = Inventory.objects.select_related('item').values(
-                'item__category'
-            ).annotate(count=Count('id')).order_by('-count')
-            
-            inventory_by_category = {}
-            for item in inventory_by_category_raw:
-                category = item['item__category'] or 'other'
-                inventory_by_category[category] = item['count']
-            
-            # Calculate rates and averages
-            average_stores_per_district = total_stores / total_districts if total_districts > 0 else 0
-            inventory_availability_rate = (available_inventory_items / total_inventory_items * 100) if total_inventory_items > 0 else 0
-            average_inventory_per_store = total_inventory_items / total_stores if total_stores > 0 else 0
-            
-            # Prepare response data
-            analytics_data = {
-                'totalStores': total_stores,
-                'activeStores': active_stores,
-                'inactiveStores': inactive_stores,
-                'totalDistricts': total_districts,
-                'totalInventoryItems': total_inventory_items,
-                'availableInventoryItems': available_inventory_items,
-                'unavailableInventoryItems': unavailable_inventory_items,
-                'storesByDistrict': stores_by_district,
-                'storesByType': stores_by_type,
-                'averageStoresPerDistrict': round(average_stores_per_district, 2),
-                'topDistricts': top_districts,
-                'inventoryAvailabilityRate': round(inventory_availability_rate, 1),
-                'topStoreTypes': top_store_types,
-                'inventoryByCategory': inventory_by_category,
-                'totalItems': total_items,
-                'averageInventoryPerStore': round(average_inventory_per_store, 1),
-            }
-            
-            return Response(analytics_data)
-            
+            return Response(build_analytics_payload(get_analytics_counters()))
         except Exception as e:
             return Response(
                 {'error': f'Failed to fetch analytics data: {str(e)}'},
@@ -1018,15 +1575,194 @@ class AnalyticsView(APIView):
             )
 
 
+class AnalyticsTrendView(APIView):
+    """
+    API endpoint for analytics trends over time.
+    
+    Reads the daily snapshots recorded by the ``snapshot_analytics`` command.
+    """
+    permission_classes = [AllowAny]  # Allow unauthenticated access for analytics
+    default_range_days = 30
+    
+    @extend_schema(
+        summary="Get analytics trends",
+        description=(
+            "Get analytics metrics over a date range, overall or per district, store type or item category. "
+            "Long ranges are returned at weekly or monthly resolution (the last snapshot of each interval)."
+        ),
+        parameters=[
+            OpenApiParameter(name='scope', type=str, enum=['total', 'district', 'store_type', 'category'],
+                             description='Series to return (default total)'),
+            OpenApiParameter(name='key', type=str,
+                             description='Comma-separated districts, store types or categories (default all)'),
+            OpenApiParameter(name='start', type=str, description='First day, YYYY-MM-DD (default 30 days before end)'),
+            OpenApiParameter(name='end', type=str, description='Last day, YYYY-MM-DD (default today)'),
+            OpenApiParameter(name='metrics', type=str,
+                             description=f"Comma-separated metrics among {', '.join(TREND_METRICS)} (default all)"),
+            OpenApiParameter(name='interval', type=str, enum=['auto', *TREND_INTERVALS],
+                             description='Resolution of the series (default auto)'),
+        ],
+        responses={200: dict}
+    )
+    def get(self, request):
+        """Get analytics trends."""
+        params = request.query_params
+        scope = params.get('scope', AnalyticsSnapshot.SCOPE_TOTAL)
+        scopes = [value for value, _ in AnalyticsSnapshot._meta.get_field('scope').choices]
+        if scope not in scopes:
+            return Response(
+                {'error': f"scope must be one of: {', '.join(scopes)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            end = datetime.date.fromisoformat(params['end']) if params.get('end') else timezone.localdate()
+            start = (
+                datetime.date.fromisoformat(params['start']) if params.get('start')
+                else end - datetime.timedelta(days=self.default_range_days)
+            )
+        except ValueError:
+            return Response({'error': 'start and end must be dates (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+        if start > end:
+            return Response({'error': 'start must not be after end'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        metrics = [name.strip() for name in params.get('metrics', '').split(',') if name.strip()] or list(TREND_METRICS)
+        unknown = [name for name in metrics if name not in TREND_METRICS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown metrics: {', '.join(unknown)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        interval = params.get('interval', 'auto')
+        if interval == 'auto':
+            interval = choose_interval(start, end)
+        elif interval not in TREND_INTERVALS:
+            return Response(
+                {'error': f"interval must be one of: auto, {', '.join(TREND_INTERVALS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        keys = None
+        if scope == AnalyticsSnapshot.SCOPE_TOTAL:
+            keys = ['']
+        elif params.get('key'):
+            keys = [key.strip() for key in params['key'].split(',') if key.strip()]
+        
+        return Response({
+            'scope': scope,
+            'start': start,
+            'end': end,
+            'interval': interval,
+            'series': get_trends(scope, keys, start, end, metrics, interval),
+        })
+
+
+class StoreTileView(APIView):
+    """
+    API endpoint serving store locations as Mapbox Vector Tiles.
+    
+    Returns only the stores inside the requested XYZ tile, so map payloads scale
+    with what is on screen rather than with the total number of stores.
+    """
+    permission_classes = [AllowAny]  # Allow unauthenticated access for map display
+    renderer_classes = [MVTRenderer]
+    
+    @extend_schema(
+        summary="Get store vector tile",
+        description="Get stores inside an XYZ tile as a Mapbox Vector Tile (layer 'stores' with id, store_type, is_active, rating)",
+        parameters=[
+            OpenApiParameter(name='is_active', type=bool, description='Filter by active status'),
+            OpenApiParameter(name='store_type', type=str, description='Filter by store type'),
+        ],
+        responses={(200, 'application/vnd.mapbox-vector-tile'): bytes}
+    )
+    def get(self, request, z, x, y):
+        """Get the vector tile for (z, x, y)."""
+        if not is_valid_tile(z, x, y):
+            return Response(
+                {'error': f'Tile {z}/{x}/{y} does not exist'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        is_active = request.query_params.get('is_active', '').strip()
+        is_active_bool = is_active.lower() in ['true', '1', 'yes'] if is_active else None
+        store_type = request.query_params.get('store_type', '').strip() or None
+        
+        tile = get_store_tile(z, x, y, is_active=is_active_bool, store_type=store_type)
+        response = Response(tile)
+        response['Cache-Control'] = 'public, max-age=300'
+        return response
+
+
 class StatisticsView(APIView):
-    """Placeholder view for statistics - to be implemented"""
+    """
+    API endpoint for slice-and-dice store and inventory counts.
+    
+    Answers filters, roll-ups and top-k queries from a per-worker cube of
+    precomputed counts (see ``utils/statistics_cube.py``) instead of SQL.
+    """
     permission_classes = [AllowAny]  # Allow unauthenticated access for statistics
+    max_top = 1000
     
+    @extend_schema(
+        summary="Query store and inventory statistics",
+        description=(
+            "Count inventory entries (or stores) filtered by any of store_type, district, is_active, "
+            "category and is_available, broken down by any subset of those dimensions."
+        ),
+        parameters=[
+            OpenApiParameter(name='measure', type=str, enum=list(CUBE_MEASURES),
+                             description='What to count: inventory entries (default) or stores'),
+            OpenApiParameter(name='group_by', type=str,
+                             description='Comma-separated dimensions to break counts down by, e.g. district,category'),
+            OpenApiParameter(name='top', type=int, description='Only return the largest N groups'),
+            OpenApiParameter(name='store_type', type=str, description='Comma-separated store types'),
+            OpenApiParameter(name='district', type=str, description="Comma-separated district IDs ('none' for unassigned)"),
+            OpenApiParameter(name='is_active', type=bool, description='Store active status'),
+            OpenApiParameter(name='category', type=str, description='Comma-separated item categories (inventory only)'),
+            OpenApiParameter(name='is_available', type=bool, description='Inventory availability (inventory only)'),
+        ],
+        responses={200: dict}
+    )
     def get(self, request):
+        """Query the statistics cube."""
+        measure = request.query_params.get('measure', 'inventory')
+        if measure not in CUBE_MEASURES:
+            return Response(
+                {'error': f"measure must be one of: {', '.join(CUBE_MEASURES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        group_by = [name.strip() for name in request.query_params.get('group_by', '').split(',') if name.strip()]
+        invalid = [name for name in group_by if name not in CUBE_MEASURES[measure]]
+        if invalid or len(set(group_by)) != len(group_by):
+            return Response(
+                {'error': f"group_by must be distinct dimensions among: {', '.join(CUBE_MEASURES[measure])}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        top = request.query_params.get('top')
+        if top is not None:
+            try:
+                top = int(top)
+            except ValueError:
+                return Response({'error': 'top must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+            if not 1 <= top <= self.max_top:
+                return Response(
+                    {'error': f'top must be between 1 and {self.max_top}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        cube = statistics_cube.get()
+        filters = cube.parse_filters(measure, request.query_params)
+        total, groups = cube.query(measure, filters, group_by, top)
         return Response({
-            'message': 'Statistics endpoint - to be implemented',
-            'status': 'success'
-        }, status=status.HTTP_200_OK)
+            'measure': measure,
+            'group_by': group_by,
+            'total': total,
+            'results': groups,
+        })
 
 class SpatialSearchView(APIView):
     """Placeholder view for spatial search - to be implemented"""
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',  # GeoDjango
+    'django.contrib.postgres',  # Full-text search, trigram and unaccent lookups
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -160,7 +161,7 @@ SIMPLE_JWT = {
 
 # Django REST Framework settings
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'backend.apps.stores.pagination.KeysetPagination',
     'PAGE_SIZE': 6,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -202,6 +203,15 @@ CACHES = {
     }
 }
 
+# Inventory event ingestion (see apps/stores/utils/inventory_events.py)
+INVENTORY_EVENTS = {
+    'BUFFER': 'redis',  # or 'local' for an in-process queue
+    'REDIS_URL': 'redis://127.0.0.1:6379/2',
+    'WINDOW': 2.0,  # Seconds of events coalesced per flush
+    'BATCH_SIZE': 1000,
+    'MAX_LENGTH': 1000000,  # Unapplied events buffered before new ones are refused (503)
+}
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -8,8 +8,48 @@ import os
 import sys
 import django
 from django.conf import settings
+from django.test.runner import DiscoverRunner, ParallelTestSuite, RemoteTestResult, RemoteTestRunner
 from django.test.utils import get_runner
 
+
+def reset_process_indexes():
+    """
+    Drop the per-process availability bitmaps.
+
+    They follow inventory writes once those commit, which never happens inside
+    a TestCase, so every test starts from a fresh load of its own data.
+    """
+    from backend.apps.stores.utils.availability_index import availability_index
+    availability_index.invalidate()
+
+
+class IndexResetMixin:
+    def startTest(self, test):
+        reset_process_indexes()
+        super().startTest(test)
+
+
+class IndexResetRemoteTestResult(IndexResetMixin, RemoteTestResult):
+    pass
+
+
+class IndexResetRemoteTestRunner(RemoteTestRunner):
+    resultclass = IndexResetRemoteTestResult
+
+
+class IndexResetParallelTestSuite(ParallelTestSuite):
+    runner_class = IndexResetRemoteTestRunner
+
+
+class StoresTestRunner(DiscoverRunner):
+    """Django's test runner, resetting the in-process indexes before each test."""
+
+    parallel_test_suite = IndexResetParallelTestSuite
+
+    def get_resultclass(self):
+        resultclass = super().get_resultclass() or self.test_runner.resultclass
+        return type(f'IndexReset{resultclass.__name__}', (IndexResetMixin, resultclass), {})
+
 if __name__ == "__main__":
     # Set the Django settings module to use test settings
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.test_settings')
@@ -27,7 +67,8 @@ if __name__ == "__main__":
         "backend.tests.stores.test_serializers", 
         "backend.tests.stores.test_views",
         "backend.tests.stores.test_database_comprehensive",
-        "backend.tests.stores.test_advanced_search"
+        "backend.tests.stores.test_advanced_search",
+        "backend.tests.stores.test_geometry_encoding"
     ])
     
     if failures:
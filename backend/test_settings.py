@@ -28,6 +28,12 @@ CACHES = {
     }
 }
 
+# Reset the in-process availability bitmaps before each test
+TEST_RUNNER = 'backend.test_runner.StoresTestRunner'
+
+# Buffer inventory events in-process during testing
+INVENTORY_EVENTS = {**INVENTORY_EVENTS, 'BUFFER': 'local'}
+
 # Disable CORS during testing
 CORS_ALLOW_ALL_ORIGINS = True
 
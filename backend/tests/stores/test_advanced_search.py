@@ -537,4 +537,62 @@ class AdvancedStoreSearchTest(APITestCase):
         
         # Results should be sorted by distance
         for store in response.data['results']:
-            self.assertTrue(store['is_active']) 
\ No newline at end of file
+            self.assertTrue(store['is_active']) 
+    def test_accent_insensitive_search(self):
+        """Test that unaccented input matches Vietnamese diacritics."""
+        Store.objects.create(
+            name="Bách hóa XANH Lê Lợi",
+            address="12 Lê Lợi, QUẬN 1",
+            location=Point(106.701, 10.775, srid=4326),
+            store_type="bach-hoa-xanh",
+            district="QUẬN 1",
+            district_obj=self.district1,
+            city="Ho Chi Minh City",
+            is_active=True
+        )
+        
+        response = self.client.get(self.search_url, {
+            'search': 'Quan 1'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        store_names = [store['name'] for store in response.data['results']]
+        self.assertIn('Bách hóa XANH Lê Lợi', store_names)
+        
+        response = self.client.get(self.search_url, {
+            'search': 'bach hoa'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Bách hóa XANH Lê Lợi')
+
+    def test_prefix_search(self):
+        """Test that partially typed words match."""
+        response = self.client.get(self.search_url, {
+            'search': 'famil'
+        })
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'FamilyMart Saigon')
+
+    def test_search_ranked_by_relevance(self):
+        """Test that name matches rank above address-only matches."""
+        Store.objects.create(
+            name="Le Lai Mart",
+            address="1 Pasteur, District 1",
+            location=Point(106.69, 10.78, srid=4326),
+            store_type="other",
+            district="District 1",
+            district_obj=self.district1,
+            city="Ho Chi Minh City",
+            is_active=True
+        )
+        
+        response = self.client.get(self.search_url, {
+            'search': 'Le Lai'
+        })
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        store_names = [store['name'] for store in response.data['results']]
+        self.assertEqual(store_names[0], 'Le Lai Mart')
+        self.assertIn('FamilyMart Saigon', store_names)  # "456 Le Lai" in address
@@ -0,0 +1,80 @@
+"""
+Unit tests for the compact geometry encodings (TopoJSON and encoded polylines).
+"""
+
+import json
+
+from django.test import SimpleTestCase
+
+from backend.apps.stores.renderers import PolylineRenderer
+from backend.apps.stores.utils.geometry_encoding import (
+    build_topology, encode_geometry_polyline, encode_polyline, round_coordinates,
+)
+
+
+class PolylineEncodingTest(SimpleTestCase):
+    """Test cases for the polyline encoder."""
+
+    def test_encode_polyline_reference_example(self):
+        """Test the reference example of the polyline algorithm (points are lng, lat)."""
+        points = [(-120.2, 38.5), (-120.95, 40.7), (-126.453, 43.252)]
+        self.assertEqual(encode_polyline(points), '_p~iF~ps|U_ulLnnqC_mqNvxq`@')
+
+    def test_nested_geometries_are_dropped(self):
+        """Test that a store's nested district keeps its properties but not its boundary."""
+        store = {
+            'id': 1, 'name': 'Store', 'latitude': 10.77, 'longitude': 106.7,
+            'district_obj': {
+                'id': 2, 'name': 'District 1', 'boundary': 'MULTIPOLYGON (...)',
+                'boundary_geojson': {'type': 'MultiPolygon', 'coordinates': []},
+            },
+        }
+        data = json.loads(PolylineRenderer().render(store))
+        self.assertEqual(data['district_obj'], {'id': 2, 'name': 'District 1'})
+        self.assertEqual(data['geometry']['type'], 'Point')
+
+    def test_encode_polygon_keeps_rings(self):
+        """Test that each polygon ring becomes its own polyline."""
+        polygon = {
+            'type': 'Polygon',
+            'coordinates': [
+                [[106.6, 10.7], [106.7, 10.7], [106.7, 10.8], [106.6, 10.7]],
+                [[106.65, 10.72], [106.66, 10.72], [106.66, 10.73], [106.65, 10.72]],
+            ],
+        }
+        encoded = encode_geometry_polyline(polygon, precision=5)
+        self.assertEqual(encoded['type'], 'Polygon')
+        self.assertEqual(len(encoded['polylines']), 2)
+
+
+class TopologyTest(SimpleTestCase):
+    """Test cases for the TopoJSON builder."""
+
+    def setUp(self):
+        """Two unit squares sharing the border x=1."""
+        self.left = {'type': 'Polygon', 'coordinates': [[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]]}
+        self.right = {'type': 'Polygon', 'coordinates': [[[1, 0], [2, 0], [2, 1], [1, 1], [1, 0]]]}
+
+    def test_shared_border_is_stored_once(self):
+        """Test that adjacent polygons reference the shared arc in opposite directions."""
+        topology = build_topology('districts', [(1, self.left, {}), (2, self.right, {})], precision=0)
+        geometries = topology['objects']['districts']['geometries']
+        left_arcs = geometries[0]['arcs'][0]
+        right_arcs = geometries[1]['arcs'][0]
+
+        self.assertEqual(len(topology['arcs']), 3)
+        shared = set(left_arcs) & {~index for index in right_arcs}
+        self.assertEqual(len(shared), 1)
+
+    def test_arcs_are_quantized_and_delta_encoded(self):
+        """Test that arc coordinates are integer deltas on the quantization grid."""
+        topology = build_topology('districts', [(1, self.left, {'name': 'Left'})], precision=2)
+        self.assertEqual(topology['transform']['scale'], [0.01, 0.01])
+        arc = topology['arcs'][0]
+        self.assertTrue(all(isinstance(value, int) for point in arc for value in point))
+        self.assertEqual(sum(dx for dx, _ in arc[1:]), 0)  # Closed ring returns to its start
+        self.assertEqual(topology['objects']['districts']['geometries'][0]['properties'], {'name': 'Left'})
+
+    def test_round_coordinates(self):
+        """Test rounding nested coordinate arrays."""
+        self.assertEqual(round_coordinates([[1.23456, 2.34567]], 2), [[1.23, 2.35]])
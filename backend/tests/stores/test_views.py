@@ -2,14 +2,23 @@
 Unit tests for the stores app API views.
 """
 
-from django.test import TestCase
-from django.contrib.gis.geos import Point, Polygon
+import base64
+import datetime
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from decimal import Decimal
 
 from backend.apps.stores.models import District, Store, Inventory, Item
+from backend.apps.stores.utils.analytics_snapshots import take_snapshot
+from backend.apps.stores.utils.inventory_events import InventoryEventWorker, get_event_buffer
 
 
 class DistrictViewSetTest(APITestCase):
@@ -90,6 +99,121 @@ class DistrictViewSetTest(APITestCase):
         self.assertEqual(response.data['total_districts'], 1)
         self.assertEqual(response.data['active_districts'], 1)
 
+    def test_lookup_by_coordinates_follows_boundary_changes(self):
+        """Test coordinate lookup sees boundary edits without a restart."""
+        url = f"{self.list_url}lookup-by-coordinates/"
+        self.district.boundary = MultiPolygon(Polygon(((106.6, 10.7), (106.7, 10.7), (106.7, 10.8), (106.6, 10.8), (106.6, 10.7))))
+        self.district.save()
+
+        response = self.client.get(url, {'latitude': 10.75, 'longitude': 106.65})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['found'])
+        self.assertEqual(response.data['district_id'], self.district.id)
+
+        self.district.boundary = MultiPolygon(Polygon(((106.8, 10.7), (106.9, 10.7), (106.9, 10.8), (106.8, 10.8), (106.8, 10.7))))
+        self.district.save()
+
+        response = self.client.get(url, {'latitude': 10.75, 'longitude': 106.65})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['found'])
+
+    def test_list_districts_with_simplified_boundary(self):
+        """Test requesting a coarse boundary in a single encoding."""
+        self.district.boundary = MultiPolygon(Point(106.7, 10.8, srid=4326).buffer(0.05, quadsegs=256))
+        self.district.save()
+
+        response = self.client.get(self.list_url, {'zoom': 9, 'geometry': 'geojson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['results'][0]
+        self.assertNotIn('boundary', result)
+        coarse_ring = result['boundary_geojson']['coordinates'][0][0]
+        self.assertLess(len(coarse_ring), len(self.district.boundary[0].exterior_ring))
+        self.assertAlmostEqual(result['centroid']['longitude'], 106.7, places=4)
+
+        response = self.client.get(self.detail_url, {'detail': 'full', 'geometry': 'wkt'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('boundary', response.data)
+        self.assertNotIn('boundary_geojson', response.data)
+
+        response = self.client.get(self.list_url, {'detail': 'tiny'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_centroids_without_boundaries_query_count_is_constant(self):
+        """Test districts without a boundary do not load their centroid one row at a time."""
+        def count_list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.list_url, {'zoom': 9})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries), response
+
+        one_district_queries, _ = count_list_queries()
+        for i in range(3):
+            District.objects.create(name=f'Unbounded District {i}', code=f'UD{i}')
+        many_district_queries, response = count_list_queries()
+
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertIsNone(response.data['results'][0]['centroid'])
+        self.assertEqual(one_district_queries, many_district_queries)
+
+    def test_list_districts_as_topojson(self):
+        """Test the TopoJSON encoding of the district list."""
+        self.district.boundary = MultiPolygon(Polygon(((106.6, 10.7), (106.7, 10.7), (106.7, 10.8), (106.6, 10.8), (106.6, 10.7))))
+        self.district.save()
+
+        response = self.client.get(self.list_url, {'format': 'topojson', 'precision': 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        topology = response.json()
+        self.assertEqual(topology['type'], 'Topology')
+        self.assertEqual(topology['transform']['scale'], [0.0001, 0.0001])
+        geometry = topology['objects']['districts']['geometries'][0]
+        self.assertEqual(geometry['id'], self.district.id)
+        self.assertEqual(geometry['type'], 'MultiPolygon')
+        self.assertEqual(geometry['properties']['name'], 'Test District')
+        self.assertNotIn('boundary', geometry['properties'])
+
+    def test_retrieve_district_as_polyline(self):
+        """Test the encoded polyline encoding selected with the Accept header."""
+        self.district.boundary = MultiPolygon(Polygon(((106.6, 10.7), (106.7, 10.7), (106.7, 10.8), (106.6, 10.8), (106.6, 10.7))))
+        self.district.save()
+
+        response = self.client.get(self.detail_url, HTTP_ACCEPT='application/vnd.polyline+json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['geometry']['type'], 'MultiPolygon')
+        self.assertIsInstance(data['geometry']['polylines'][0][0], str)
+        self.assertNotIn('boundary_geojson', data)
+
+    def test_batch_lookup_by_coordinates(self):
+        """Test resolving many coordinates in one request, with per-district counts."""
+        self.district.boundary = MultiPolygon(Polygon(((106.6, 10.7), (106.7, 10.7), (106.7, 10.8), (106.6, 10.8), (106.6, 10.7))))
+        self.district.save()
+        url = f"{self.list_url}lookup-by-coordinates/batch/?counts=true"
+        points = [
+            {'latitude': 10.75, 'longitude': 106.65},
+            [10.72, 106.61],
+            {'latitude': 10.75, 'longitude': 106.95},
+        ]
+
+        response = self.client.post(url, points, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(response.data['found'], 2)
+        self.assertEqual(
+            [result['district_id'] for result in response.data['results']],
+            [self.district.id, self.district.id, None]
+        )
+        self.assertEqual(response.data['district_counts'][0], {
+            'district_id': self.district.id, 'district': 'Test District', 'count': 2
+        })
+
+        ndjson = '{"latitude": 10.75, "longitude": 106.65}\n[10.75, 106.95]\n'
+        response = self.client.post(url, ndjson, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['found'], 1)
+
+        response = self.client.post(url, [{'latitude': 95, 'longitude': 106.65}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class StoreViewSetTest(APITestCase):
     """Test cases for StoreViewSet."""
@@ -199,6 +323,202 @@ class StoreViewSetTest(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 0)  # No inventory items yet
+    
+    def test_list_stores_with_sparse_fieldset(self):
+        """Test fields/exclude/expand on the store list."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, {'fields': 'id,name,latitude'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name', 'latitude'})
+        self.assertAlmostEqual(response.data['results'][0]['latitude'], 10.8)
+        self.assertFalse(any('stores_district' in query['sql'] for query in queries.captured_queries))
+
+        response = self.client.get(self.list_url, {'exclude': 'location,location_geojson'})
+        result = response.data['results'][0]
+        self.assertNotIn('location', result)
+        self.assertIn('district_obj', result)
+
+        response = self.client.get(self.list_url, {'fields': 'id,name', 'expand': 'district_obj'})
+        result = response.data['results'][0]
+        self.assertEqual(set(result), {'id', 'name', 'district_obj'})
+        self.assertEqual(result['district_obj']['name'], 'Test District')
+
+    def test_list_stores_with_sideloaded_districts(self):
+        """Test that sideloading emits each district once under "included"."""
+        Store.objects.create(
+            name='Second Store',
+            address='456 Test Street',
+            district='Test District',
+            district_obj=self.district,
+            location=Point(106.71, 10.81, srid=4326)
+        )
+
+        response = self.client.get(self.list_url, {'sideload': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(result['district_obj'] == self.district.id for result in results))
+        districts = response.data['included']['districts']
+        self.assertEqual(list(districts), [str(self.district.id)])
+        self.assertEqual(districts[str(self.district.id)]['name'], 'Test District')
+
+        response = self.client.get(self.detail_url, {'sideload': 'true'})
+        self.assertEqual(response.data['district_obj'], self.district.id)
+        self.assertIn(str(self.district.id), response.data['included']['districts'])
+
+    def test_nearest_stores(self):
+        """Test nearest stores are returned closest first with distances in meters."""
+        Store.objects.create(
+            name='Far Store',
+            address='789 Far Street, Ho Chi Minh City',
+            store_type='gs25',
+            is_active=True,
+            location=Point(106.75, 10.85, srid=4326)
+        )
+        Store.objects.create(
+            name='Closed Store',
+            address='1 Closed Street, Ho Chi Minh City',
+            store_type='gs25',
+            is_active=False,
+            location=Point(106.701, 10.801, srid=4326)
+        )
+        
+        url = f"{self.list_url}nearest/"
+        response = self.client.get(url, {'latitude': 10.8, 'longitude': 106.7, 'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([s['name'] for s in response.data], ['Test Store', 'Closed Store'])
+        self.assertAlmostEqual(response.data[0]['distance_m'], 0, places=0)
+        self.assertGreater(response.data[1]['distance_m'], 100)
+        
+        response = self.client.get(url, {
+            'latitude': 10.8, 'longitude': 106.7, 'store_type': 'gs25', 'is_active': 'true'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([s['name'] for s in response.data], ['Far Store'])
+    
+    def test_import_stores(self):
+        """Test bulk import updates stores by name, creates the rest and assigns districts."""
+        self.district.boundary = MultiPolygon(Polygon(((106.6, 10.7), (106.7, 10.7), (106.7, 10.8), (106.6, 10.8), (106.6, 10.7))))
+        self.district.save()
+        body = (
+            'name,latitude,longitude,rating\n'
+            'Test Store,10.75,106.65,3.5\n'
+            'Circle K Import,10.74,106.66,\n'
+            'GS25 Outside,10.75,106.75,\n'
+            'Broken Store,north,106.65,\n'
+        )
+        response = self.client.generic('POST', f"{self.list_url}import/", body, content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['invalid'], 1)
+        self.assertEqual(response.data['errors'][0]['line'], 5)
+        self.assertEqual(response.data['nearest_district'], 1)
+        
+        self.store.refresh_from_db()
+        self.assertEqual(self.store.rating, Decimal('3.5'))
+        self.assertAlmostEqual(self.store.location.y, 10.75)
+        # No type in the input: the curated type is kept, not replaced by one detected from the name
+        self.assertEqual(self.store.store_type, 'convenience')
+        created = Store.objects.get(name='Circle K Import')
+        self.assertEqual(created.store_type, 'circle-k')
+        self.assertEqual(created.district_obj, self.district)
+        self.assertEqual(Store.objects.get(name='GS25 Outside').district, 'Test District')
+    
+    def test_nearest_stores_requires_coordinates(self):
+        """Test nearest stores rejects missing or out-of-range coordinates."""
+        url = f"{self.list_url}nearest/"
+        response = self.client.get(url, {'latitude': 10.8})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {'latitude': 95, 'longitude': 106.7})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StoreListQueryCountTest(APITestCase):
+    """Test that store list pages run a constant number of queries."""
+
+    def setUp(self):
+        """Set up districts with boundaries and stores."""
+        self.url = reverse('stores:store-list')
+        self.districts = [
+            District.objects.create(
+                name=f'District {i}',
+                code=f'D{i}',
+                boundary=MultiPolygon(Polygon((
+                    (106.6 + i * 0.1, 10.7), (106.7 + i * 0.1, 10.7),
+                    (106.7 + i * 0.1, 10.8), (106.6 + i * 0.1, 10.8), (106.6 + i * 0.1, 10.7),
+                ))),
+            )
+            for i in range(4)
+        ]
+
+    def create_stores(self, count):
+        for i in range(count):
+            district = self.districts[i % len(self.districts)]
+            Store.objects.create(
+                name=f'Store {Store.objects.count()}',
+                address='Address',
+                district=district.name,
+                district_obj=district,
+                location=Point(106.65 + (i % len(self.districts)) * 0.1, 10.75, srid=4326),
+            )
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'page_size': 20})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response
+
+    def test_store_list_query_count_is_constant(self):
+        """Test the query count does not grow with the page size."""
+        self.create_stores(2)
+        small_page_queries, _ = self.count_list_queries()
+
+        self.create_stores(10)
+        large_page_queries, response = self.count_list_queries()
+
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertEqual(small_page_queries, large_page_queries)
+        self.assertEqual(response.data['results'][0]['district_obj']['store_count'], 4)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ResponseCacheTest(APITestCase):
+    """Test that read-heavy endpoints are cached until a model they read changes."""
+
+    def setUp(self):
+        """Set up a district and a store."""
+        self.url = reverse('stores:store-statistics')
+        self.district = District.objects.create(name='Cached District', code='CD')
+        Store.objects.create(
+            name='Cached Store',
+            address='Address',
+            district=self.district.name,
+            district_obj=self.district,
+            location=Point(106.7, 10.77, srid=4326),
+        )
+
+    def test_repeated_request_is_served_from_cache(self):
+        """Test the second request runs no queries."""
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_stores'], 1)
+        self.assertEqual(len(queries), 0)
+
+    def test_saving_a_store_invalidates_cached_response(self):
+        """Test a committed store write expires the cached statistics."""
+        self.assertEqual(self.client.get(self.url).data['total_stores'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Store.objects.create(
+                name='Another Store',
+                address='Address',
+                district=self.district.name,
+                district_obj=self.district,
+                location=Point(106.71, 10.77, srid=4326),
+            )
+        self.assertEqual(self.client.get(self.url).data['total_stores'], 2)
 
 
 class ItemViewSetTest(APITestCase):
@@ -373,6 +693,443 @@ class InventoryViewSetTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['total_items'], 1)
         self.assertEqual(response.data['available_items'], 1)
+    
+    def test_bulk_upsert_inventory(self):
+        """Test bulk upsert creates, updates and reports each row."""
+        new_item = Item.objects.create(name='Bulk Product', category='snacks')
+        url = f"{self.list_url}bulk-upsert/"
+        rows = [
+            {'store_id': self.store.id, 'item_id': self.item.id, 'is_available': False},
+            {'store_id': self.store.id, 'item_id': new_item.id},
+            {'store_id': self.store.id, 'item_id': 999999},
+            {'store_id': 'x', 'item_id': new_item.id},
+        ]
+        response = self.client.post(url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['statuses'], ['updated', 'created', 'unknown_item', 'invalid'])
+        self.assertEqual(response.data['counts']['created'], 1)
+        self.inventory.refresh_from_db()
+        self.assertFalse(self.inventory.is_available)
+        self.assertTrue(Inventory.objects.get(store=self.store, item=new_item).is_available)
+        
+        response = self.client.post(url, rows[:2], format='json')
+        self.assertEqual(response.data['statuses'], ['unchanged', 'unchanged'])
+    
+    def test_ingest_inventory_events(self):
+        """Test queued events are coalesced per store and item, latest first."""
+        url = f"{self.list_url}events/"
+        events = [
+            {'store_id': self.store.id, 'item_id': self.item.id, 'is_available': False,
+             'occurred_at': '2024-01-01T10:00:03+07:00'},
+            {'store_id': self.store.id, 'item_id': self.item.id, 'is_available': True,
+             'occurred_at': '2024-01-01T10:00:01+07:00'},
+            {'store_id': self.store.id, 'item_id': self.item.id, 'is_available': True,
+             'occurred_at': '2024-01-01T10:00:02+07:00'},
+        ]
+        response = self.client.post(url, events, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['accepted'], 3)
+        
+        flush = InventoryEventWorker(get_event_buffer(), window=0).run_once()
+        self.assertEqual(flush['events'], 3)
+        self.assertEqual(flush['coalesced_rows'], 1)
+        self.inventory.refresh_from_db()
+        self.assertFalse(self.inventory.is_available)
+        
+        response = self.client.post(url, [{'store_id': self.store.id, 'item_id': self.item.id}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        # A full buffer refuses new events instead of dropping queued ones
+        with mock.patch.object(get_event_buffer(), 'max_length', 2):
+            response = self.client.post(url, events, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(get_event_buffer().backlog(), 0)
+
+
+class BasketSearchTest(APITestCase):
+    """Test cases for the basket search endpoint."""
+
+    def setUp(self):
+        """Set up three stores at increasing distance with different baskets."""
+        self.url = reverse('stores:store-basket-search')
+        self.milk = Item.objects.create(name='Basket Milk', category='dairy')
+        self.bread = Item.objects.create(name='Basket Bread', category='snacks')
+        self.near, self.middle, self.far = [
+            Store.objects.create(name=f'Basket Store {i}', address='Address', location=Point(106.70 + i * 0.01, 10.77, srid=4326))
+            for i in range(3)
+        ]
+        Inventory.objects.create(store=self.near, item=self.milk, is_available=True)
+        Inventory.objects.create(store=self.near, item=self.bread, is_available=False)
+        Inventory.objects.create(store=self.middle, item=self.milk, is_available=True)
+        Inventory.objects.create(store=self.middle, item=self.bread, is_available=True)
+        Inventory.objects.create(store=self.far, item=self.milk, is_available=True)
+        Inventory.objects.create(store=self.far, item=self.bread, is_available=True)
+
+    def search(self, **data):
+        payload = {'latitude': 10.77, 'longitude': 106.69, **data}
+        return self.client.post(self.url, payload, format='json')
+
+    def test_stores_with_whole_basket_nearest_first(self):
+        """Test only stores carrying every item are returned, closest first."""
+        response = self.search(items=[self.milk.id, 'basket bread'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([store['id'] for store in response.data['results']], [self.middle.id, self.far.id])
+        self.assertEqual(response.data['results'][0]['missing_item_ids'], [])
+
+    def test_partial_baskets(self):
+        """Test max_missing admits stores missing some items and reports them."""
+        response = self.search(items=[self.milk.id, self.bread.id], max_missing=1, limit=2)
+        self.assertEqual([store['id'] for store in response.data['results']], [self.near.id, self.middle.id])
+        self.assertEqual(response.data['results'][0]['matched_item_count'], 1)
+        self.assertEqual(response.data['results'][0]['missing_item_ids'], [self.bread.id])
+
+    def test_unknown_items_are_rejected(self):
+        """Test unknown item names are reported."""
+        response = self.search(items=['Basket Milk', 'Caviar'])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['items'], ['Caviar'])
+
+    @mock.patch('backend.apps.stores.utils.basket_search.SCAN_FACTOR', 1)
+    @mock.patch('backend.apps.stores.utils.basket_search.MAX_ID_FILTER', 0)
+    def test_nearest_first_scan_continues_across_batches(self):
+        """Test the nearest-first scan reads further batches after the last store instead of restarting."""
+        response = self.search(items=[self.milk.id, self.bread.id], limit=2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([store['id'] for store in response.data['results']], [self.middle.id, self.far.id])
+
+
+class NearestItemStoresTest(APITestCase):
+    """Test cases for the nearest stores per item endpoint."""
+
+    def setUp(self):
+        """Set up three stores at increasing distance stocking different items."""
+        self.url = reverse('stores:inventory-nearest-stores')
+        self.milk = Item.objects.create(name='Nearest Milk', category='dairy')
+        self.bread = Item.objects.create(name='Nearest Bread', category='snacks')
+        self.stores = [
+            Store.objects.create(name=f'Nearest Store {i}', address='Address', location=Point(106.70 + i * 0.01, 10.77, srid=4326))
+            for i in range(3)
+        ]
+        for store in self.stores:
+            Inventory.objects.create(store=store, item=self.milk, is_available=True)
+        Inventory.objects.create(store=self.stores[0], item=self.bread, is_available=False)
+        Inventory.objects.create(store=self.stores[2], item=self.bread, is_available=True)
+
+    def test_nearest_stores_for_each_item(self):
+        """Test each item gets its nearest stores with the item available."""
+        response = self.client.get(self.url, {
+            'latitude': 10.77, 'longitude': 106.69, 'items': f'{self.milk.id},{self.bread.id}', 'limit': 2,
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        milk, bread = response.data['results']
+        self.assertEqual(milk['item']['id'], self.milk.id)
+        self.assertEqual([store['id'] for store in milk['stores']], [self.stores[0].id, self.stores[1].id])
+        self.assertLess(milk['stores'][0]['distance_m'], milk['stores'][1]['distance_m'])
+        self.assertEqual([store['id'] for store in bread['stores']], [self.stores[2].id])
+
+    @mock.patch('backend.apps.stores.utils.spatial_helpers.RARE_ITEM_MAX_STORES', 0)
+    def test_nearest_stores_through_index_walk(self):
+        """Test the nearest-first index walk used for widely stocked items skips inactive stores."""
+        Store.objects.filter(id=self.stores[1].id).update(is_active=False)
+        response = self.client.get(self.url, {
+            'latitude': 10.77, 'longitude': 106.69, 'items': f'{self.milk.id},{self.bread.id}', 'limit': 2,
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        milk, bread = response.data['results']
+        self.assertEqual([store['id'] for store in milk['stores']], [self.stores[0].id, self.stores[2].id])
+        self.assertLess(milk['stores'][0]['distance_m'], milk['stores'][1]['distance_m'])
+        self.assertEqual([store['id'] for store in bread['stores']], [self.stores[2].id])
+
+        response = self.client.get(self.url, {
+            'latitude': 10.77, 'longitude': 106.69, 'items': str(self.milk.id), 'limit': 3, 'is_active': 'false',
+        })
+        self.assertEqual([store['id'] for store in response.data['results'][0]['stores']], [self.stores[1].id])
+
+    def test_unknown_items_are_rejected(self):
+        """Test unknown item IDs are reported."""
+        response = self.client.get(self.url, {'latitude': 10.77, 'longitude': 106.69, 'items': '999999'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['items'], [999999])
+
+
+class StatisticsViewTest(APITestCase):
+    """Test cases for the statistics cube endpoint."""
+
+    def setUp(self):
+        """Set up stores of two types with inventory."""
+        self.url = reverse('stores:statistics')
+        self.district = District.objects.create(name='Cube District', code='CB')
+        self.stores = [
+            Store.objects.create(
+                name=f'Cube Store {i}',
+                address='Address',
+                store_type=store_type,
+                district_obj=self.district,
+                is_active=is_active,
+                location=Point(106.7, 10.77, srid=4326),
+            )
+            for i, (store_type, is_active) in enumerate([('gs25', True), ('gs25', False), ('circle-k', True)])
+        ]
+        milk = Item.objects.create(name='Cube Milk', category='dairy')
+        chips = Item.objects.create(name='Cube Chips', category='snacks')
+        Inventory.objects.create(store=self.stores[0], item=milk, is_available=True)
+        Inventory.objects.create(store=self.stores[0], item=chips, is_available=False)
+        Inventory.objects.create(store=self.stores[2], item=milk, is_available=True)
+
+    def test_slice_and_roll_up(self):
+        """Test filters and group_by are answered from the cube."""
+        response = self.client.get(self.url, {'group_by': 'category', 'is_available': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(response.data['results'], [{'category': 'dairy', 'count': 2}])
+
+        response = self.client.get(self.url, {'measure': 'stores', 'group_by': 'store_type,district', 'top': 1})
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['results'], [
+            {'store_type': 'gs25', 'district_id': self.district.id, 'district': 'Cube District', 'count': 2},
+        ])
+
+    def test_cube_follows_writes(self):
+        """Test a write is reflected in the next query."""
+        self.stores[1].is_active = True
+        self.stores[1].save()
+        response = self.client.get(self.url, {'measure': 'stores', 'is_active': 'true'})
+        self.assertEqual(response.data['total'], 3)
+
+    def test_invalid_queries(self):
+        """Test invalid measures, dimensions and filters are rejected."""
+        self.assertEqual(self.client.get(self.url, {'measure': 'sales'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'group_by': 'brand'}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'measure': 'stores', 'category': 'dairy'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AnalyticsTrendViewTest(APITestCase):
+    """Test cases for analytics snapshots and trends."""
+
+    def setUp(self):
+        """Set up a store and snapshots on three days."""
+        self.url = reverse('stores:analytics-trends')
+        Store.objects.create(name='Trend Store', address='Address', district='District 1', store_type='gs25')
+        take_snapshot(datetime.date(2026, 1, 1))
+        Store.objects.create(name='Trend Store 2', address='Address', district='District 1', is_active=False)
+        take_snapshot(datetime.date(2026, 1, 2))
+        take_snapshot(datetime.date(2026, 2, 1))
+
+    def test_daily_totals(self):
+        """Test the total series at daily resolution."""
+        response = self.client.get(self.url, {
+            'start': '2026-01-01', 'end': '2026-01-31', 'metrics': 'totalStores,activeStores',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['interval'], 'day')
+        self.assertEqual(response.data['series'][0]['points'], [
+            {'date': datetime.date(2026, 1, 1), 'totalStores': 1, 'activeStores': 1},
+            {'date': datetime.date(2026, 1, 2), 'totalStores': 2, 'activeStores': 1},
+        ])
+
+    def test_monthly_series_per_district(self):
+        """Test monthly points keep the last snapshot of each month."""
+        response = self.client.get(self.url, {
+            'scope': 'district', 'key': 'District 1', 'start': '2026-01-01', 'end': '2026-02-28',
+            'interval': 'month', 'metrics': 'totalStores',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['series'], [{'key': 'District 1', 'points': [
+            {'date': datetime.date(2026, 1, 2), 'totalStores': 2},
+            {'date': datetime.date(2026, 2, 1), 'totalStores': 2},
+        ]}])
+
+    def test_invalid_parameters(self):
+        """Test invalid scopes, dates and metrics are rejected."""
+        for params in ({'scope': 'brand'}, {'start': 'yesterday'}, {'metrics': 'revenue'},
+                       {'start': '2026-02-01', 'end': '2026-01-01'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StoreTileViewTest(APITestCase):
+    """Test cases for the store vector tile endpoint."""
+    
+    def setUp(self):
+        """Set up test data."""
+        Store.objects.create(
+            name='Tile Store',
+            address='1 Tile Street, Ho Chi Minh City',
+            store_type='circle-k',
+            is_active=True,
+            rating=Decimal('4.5'),
+            location=Point(106.7, 10.8, srid=4326)
+        )
+    
+    def test_tile_with_store(self):
+        """Test a tile covering the store returns a non-empty vector tile."""
+        url = reverse('stores:store-tiles', kwargs={'z': 10, 'x': 815, 'y': 481})
+        response = self.client.get(url, HTTP_ACCEPT='application/vnd.mapbox-vector-tile')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/vnd.mapbox-vector-tile')
+        self.assertGreater(len(response.content), 0)
+    
+    def test_tile_without_stores(self):
+        """Test a tile far from any store is empty."""
+        url = reverse('stores:store-tiles', kwargs={'z': 10, 'x': 0, 'y': 0})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.content), 0)
+    
+    def test_invalid_tile(self):
+        """Test tile coordinates outside the zoom level are rejected."""
+        url = reverse('stores:store-tiles', kwargs={'z': 2, 'x': 4, 'y': 0})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StoreClusterTest(APITestCase):
+    """Test cases for the store clustering endpoint."""
+    
+    def setUp(self):
+        """Set up test data."""
+        for i, store_type in enumerate(['circle-k', 'circle-k', 'gs25']):
+            Store.objects.create(
+                name=f'Cluster Store {i}',
+                address=f'{i} Cluster Street, Ho Chi Minh City',
+                store_type=store_type,
+                is_active=True,
+                location=Point(106.7 + i * 0.001, 10.8, srid=4326)
+            )
+        Store.objects.create(
+            name='Outside Store',
+            address='1 Far Street',
+            store_type='gs25',
+            is_active=True,
+            location=Point(105.0, 10.0, srid=4326)
+        )
+        self.url = reverse('stores:store-clusters')
+        self.bbox = '106.5,10.6,106.9,11.0'
+    
+    def test_clusters_at_city_zoom(self):
+        """Test nearby stores are aggregated with a per-type breakdown."""
+        response = self.client.get(self.url, {'bbox': self.bbox, 'zoom': 11})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['clustered'])
+        self.assertEqual(len(response.data['clusters']), 1)
+        cluster = response.data['clusters'][0]
+        self.assertEqual(cluster['count'], 3)
+        self.assertEqual(cluster['store_types'], {'circle-k': 2, 'gs25': 1})
+        self.assertAlmostEqual(cluster['longitude'], 106.701, places=4)
+    
+    def test_individual_stores_at_street_zoom(self):
+        """Test individual stores are returned once zoomed in."""
+        response = self.client.get(self.url, {'bbox': self.bbox, 'zoom': 17})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['clustered'])
+        self.assertEqual(len(response.data['stores']), 3)
+    
+    @mock.patch('backend.apps.stores.views.MAX_UNCLUSTERED_STORES', 2)
+    def test_crowded_viewport_is_clustered_at_street_zoom(self):
+        """Test a zoomed-in viewport with too many stores falls back to clusters."""
+        response = self.client.get(self.url, {'bbox': '-180,-90,180,90', 'zoom': 17})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['clustered'])
+        self.assertEqual(response.data['stores'], [])
+        self.assertEqual(sum(cluster['count'] for cluster in response.data['clusters']), 4)
+    
+    def test_invalid_bbox(self):
+        """Test malformed bounding boxes are rejected."""
+        response = self.client.get(self.url, {'bbox': '106.9,10.6,106.5', 'zoom': 11})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class KeysetPaginationTest(APITestCase):
+    """Test cases for opt-in keyset (cursor) pagination."""
+    
+    def setUp(self):
+        """Set up test data."""
+        for i in range(8):
+            Store.objects.create(
+                name=f'Store {i}',
+                address=f'{i} Test Street, Ho Chi Minh City',
+                store_type='convenience',
+                is_active=True,
+                location=Point(106.7 + i * 0.01, 10.8, srid=4326)
+            )
+        self.list_url = reverse('stores:store-list')
+        self.search_url = reverse('stores:store-search')
+    
+    def _collect(self, url, params):
+        """Follow next links and return all result names."""
+        names = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            names.extend(store['name'] for store in response.data['results'])
+            if not response.data['next']:
+                return names
+            response = self.client.get(response.data['next'])
+    
+    def test_cursor_pages_by_name(self):
+        """Test paging through stores by (name, id) without gaps or duplicates."""
+        names = self._collect(self.list_url, {'pagination': 'cursor', 'page_size': 3})
+        self.assertEqual(names, [f'Store {i}' for i in range(8)])
+    
+    def test_cursor_pages_by_distance(self):
+        """Test paging through distance-sorted search by (distance, id)."""
+        names = self._collect(self.search_url, {
+            'pagination': 'cursor',
+            'page_size': 3,
+            'latitude': 10.8,
+            'longitude': 106.77,
+            'sort_by_distance': 'true',
+        })
+        self.assertEqual(names[0], 'Store 7')
+        self.assertEqual(len(names), 8)
+        self.assertEqual(len(set(names)), 8)
+    
+    def test_cursor_pages_by_relevance(self):
+        """Test text search keeps relevance order across cursor pages."""
+        for name in ['Alpha Corner', 'Beta Corner', 'Yen Pasteur Shop', 'Zeta Pasteur Mart']:
+            address = 'Pasteur Street' if 'Corner' in name else 'Other Street'
+            Store.objects.create(name=name, address=f'1 {address}', location=Point(106.7, 10.8, srid=4326))
+        response = self.client.get(self.search_url, {'search': 'Pasteur', 'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = {store['name'] for store in response.data['results']}
+        response = self.client.get(response.data['next'])
+        second = {store['name'] for store in response.data['results']}
+        self.assertEqual(first, {'Yen Pasteur Shop', 'Zeta Pasteur Mart'})
+        self.assertEqual(second, {'Alpha Corner', 'Beta Corner'})
+    
+    def test_cursor_pages_by_requested_ordering(self):
+        """Test ?ordering= becomes the keyset in cursor mode."""
+        names = self._collect(self.list_url, {'pagination': 'cursor', 'page_size': 3, 'ordering': '-name'})
+        self.assertEqual(names, [f'Store {i}' for i in reversed(range(8))])
+        
+        response = self.client.get(self.list_url, {'pagination': 'cursor', 'ordering': 'district_obj__name'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_page_size_is_capped(self):
+        """Test page_size is honoured within the server cap."""
+        response = self.client.get(self.list_url, {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['count'], 8)
+        
+        Store.objects.bulk_create([
+            Store(name=f'Extra Store {i}', address='Address', location=Point(106.7, 10.8, srid=4326))
+            for i in range(100)
+        ])
+        response = self.client.get(self.list_url, {'page_size': 500})
+        self.assertEqual(len(response.data['results']), 100)
+        self.assertEqual(response.data['count'], 108)
+    
+    def test_invalid_cursor(self):
+        """Test an undecodable cursor is rejected."""
+        response = self.client.get(self.list_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_tampered_cursor(self):
+        """Test a decodable cursor with values of the wrong type is rejected."""
+        cursor = base64.urlsafe_b64encode(json.dumps(['x', 'y']).encode()).decode()
+        response = self.client.get(self.list_url, {'cursor': cursor})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
 class APIFilteringTest(APITestCase):
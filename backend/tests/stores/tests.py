@@ -12,7 +12,11 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from backend.apps.stores.models import District, Store, Inventory
 
-from backend.apps.stores.models import Store, District, Inventory, Item
+from backend.apps.stores.models import Store, District, Inventory, Item, Review
+from backend.apps.stores.utils.availability_index import availability_index
+from backend.apps.stores.utils.analytics_counters import get_analytics_counters, verify_analytics_counters
+from backend.apps.stores.management.commands.seed_pipeline import ITEMS_PER_SCALE, SeedPipeline
+from backend.apps.stores.management.commands.seed_utils import PRODUCT_CATALOG
 
 
 class DistrictModelTest(TestCase):
@@ -242,6 +246,47 @@ class StoreModelTest(TestCase):
         self.assertIsNotNone(distance)
         self.assertGreater(distance, 0)
 
+    def test_store_distance_is_metric(self):
+        """Test distance_to returns geodesic meters rather than scaled degrees."""
+        store_data = self.store_data.copy()
+        store_data["location"] = Point(106.7, 10.8, srid=4326)
+        store = Store.objects.create(**store_data)  # type: ignore[attribute-defined]
+
+        # 0.05 degrees of longitude at 10.8N is ~5.47 km, not 5.57 km
+        distance = store.distance_to(Point(106.75, 10.8, srid=4326))
+        self.assertAlmostEqual(distance, 5470, delta=15)
+
+    def test_location_geography_is_maintained(self):
+        """Test the geography column follows location on create and update."""
+        store_data = self.store_data.copy()
+        store_data["location"] = Point(106.7, 10.8, srid=4326)
+        store = Store.objects.create(**store_data)  # type: ignore[attribute-defined]
+        store.refresh_from_db()
+        self.assertAlmostEqual(store.location_geog.x, 106.7)
+
+        store.set_location(10.9, 106.8)
+        store.save()
+        store.refresh_from_db()
+        self.assertAlmostEqual(store.location_geog.x, 106.8)
+        self.assertAlmostEqual(store.location_geog.y, 10.9)
+
+    def test_stores_within_radius_uses_meters(self):
+        """Test radius search is exact in meters away from the equator."""
+        from backend.apps.stores.utils import get_stores_within_radius
+
+        center = Point(106.7, 10.8, srid=4326)
+        inside_data = self.store_data.copy()
+        inside_data["name"] = "Inside Store"
+        inside_data["location"] = Point(106.7455, 10.8, srid=4326)  # ~4.98 km east
+        Store.objects.create(**inside_data)  # type: ignore[attribute-defined]
+        outside_data = self.store_data.copy()
+        outside_data["name"] = "Outside Store"
+        outside_data["location"] = Point(106.7, 10.8455, srid=4326)  # ~5.03 km north
+        Store.objects.create(**outside_data)  # type: ignore[attribute-defined]
+
+        names = [store.name for store in get_stores_within_radius(center, 5)]
+        self.assertEqual(names, ["Inside Store"])
+
     def test_store_validation_constraints(self):
         """Test store field validation constraints."""
         # Test invalid rating (too high)
@@ -677,6 +722,93 @@ class ModelIntegrationTest(TestCase):
         store_count = self.district.get_store_count()
         self.assertEqual(store_count, 2)
 
+    def test_store_counters_are_maintained(self):
+        """Test the per-store inventory and review counters follow writes, including bulk ones."""
+        self.store1.refresh_from_db()
+        self.assertEqual(self.store1.inventory_count, 1)
+        self.assertEqual(self.store1.available_inventory_count, 1)
+
+        Inventory.objects.filter(store=self.store1).update(is_available=False)  # type: ignore[attribute-defined]
+        Inventory.objects.bulk_create([  # type: ignore[attribute-defined]
+            Inventory(store=self.store1, item=self.item2, is_available=True),
+        ])
+        Review.objects.create(store=self.store1, guest_name="Guest", rating=5)  # type: ignore[attribute-defined]
+        Review.objects.create(store=self.store1, guest_name="Hidden", rating=1, is_approved=False)  # type: ignore[attribute-defined]
+
+        # A full save from a stale instance must not overwrite the counters
+        self.store1.name = "Store 1 renamed"
+        self.store1.save()
+
+        self.store1.refresh_from_db()
+        self.assertEqual(self.store1.inventory_count, 2)
+        self.assertEqual(self.store1.available_inventory_count, 1)
+        self.assertEqual(self.store1.approved_review_count, 1)
+
+        Inventory.objects.filter(store=self.store1).delete()  # type: ignore[attribute-defined]
+        self.store1.refresh_from_db()
+        self.assertEqual(self.store1.inventory_count, 0)
+        self.assertEqual(self.store1.available_inventory_count, 0)
+
+    def test_district_store_counts_are_maintained(self):
+        """Test the precomputed district store counts follow store writes."""
+        self.district.refresh_from_db()
+        self.assertEqual(self.district.total_store_count, 2)
+        self.assertEqual(self.district.active_store_count, 2)
+
+        Store.objects.filter(pk=self.store1.pk).update(is_active=False)  # type: ignore[attribute-defined]
+        self.district.refresh_from_db()
+        self.assertEqual(self.district.total_store_count, 2)
+        self.assertEqual(self.district.active_store_count, 1)
+
+        self.store2.location = Point(107.5, 11.5, srid=4326)  # Outside the boundary
+        self.store2.save()
+        self.district.refresh_from_db()
+        self.assertEqual(self.district.total_store_count, 1)
+        self.assertEqual(self.district.active_store_count, 0)
+
+        self.store1.delete()
+        self.district.refresh_from_db()
+        self.assertEqual(self.district.total_store_count, 0)
+        self.assertEqual(self.district.total_store_count, self.district.get_store_count())
+
+    def test_analytics_counters_are_maintained(self):
+        """Test the analytics counters follow writes and match a recount."""
+        counters = get_analytics_counters()
+        self.assertEqual(counters['total']['stores'], 2)
+        self.assertEqual(counters['district']['District 1'], 2)
+        self.assertEqual(counters['category']['beverages'], 1)
+
+        Store.objects.filter(pk=self.store1.pk).update(is_active=False, store_type="gs25")  # type: ignore[attribute-defined]
+        Inventory.objects.bulk_create([  # type: ignore[attribute-defined]
+            Inventory(store=self.store2, item=self.item2, is_available=False),
+        ])
+        self.item1.category = "dairy"
+        self.item1.save()
+
+        counters = get_analytics_counters()
+        self.assertEqual(counters['total']['active_stores'], 1)
+        self.assertEqual(counters['store_type']['gs25'], 1)
+        self.assertEqual(counters['total']['inventory'], 2)
+        self.assertEqual(counters['total']['available_inventory'], 1)
+        self.assertEqual(counters['category'], {'dairy': 1, 'snacks': 1})
+        self.assertEqual(verify_analytics_counters(), [])
+
+    def test_availability_index_follows_inventory_writes(self):
+        """Test the availability bitmaps replay bulk inventory writes from the change feed."""
+        availability_index.invalidate()
+        self.assertEqual(set(availability_index.stores_with_item(self.item1.id)), {self.store1.id})
+
+        Inventory.objects.bulk_create([  # type: ignore[attribute-defined]
+            Inventory(store=self.store2, item=self.item1, is_available=True),
+            Inventory(store=self.store2, item=self.item2, is_available=True),
+        ])
+        Inventory.objects.filter(store=self.store1).update(is_available=False)  # type: ignore[attribute-defined]
+        availability_index.mark_stale()
+
+        self.assertEqual(set(availability_index.stores_with_item(self.item1.id)), {self.store2.id})
+        self.assertEqual(set(availability_index.stores_with_all([self.item1.id, self.item2.id])), {self.store2.id})
+        self.assertEqual(availability_index.items_in_stock(), 2)
+
     def test_store_inventory_relationship(self):
         """Test the relationship between store and inventory."""
         store1_inventory = self.store1.inventories.all()
@@ -722,3 +854,36 @@ class ModelIntegrationTest(TestCase):
             Inventory.objects.get(store_id=store_id)  # type: ignore[attribute-defined]
         # District should still exist
         self.assertTrue(District.objects.filter(id=self.district.id).exists())  # type: ignore[attribute-defined]
+
+
+class SeedPipelineTest(TestCase):
+    """Test cases for the seed pipeline."""
+
+    def setUp(self):
+        """Set up a few stores to seed around."""
+        for i in range(3):
+            Store.objects.create(name=f'Seed Store {i}', address='Address', location=Point(106.7, 10.8, srid=4326))  # type: ignore[attribute-defined]
+
+    def seeded_inventory(self):
+        return set(Inventory.objects.values_list('store__name', 'item__name', 'is_available'))  # type: ignore[attribute-defined]
+
+    def test_same_seed_gives_same_data(self):
+        """Test items, inventory and reviews are reproducible from the seed."""
+        pipeline = SeedPipeline(scale=2, seed=7, min_items=5, max_items=10)
+        counts = pipeline.run(['items', 'inventory', 'reviews'])
+        self.assertEqual(counts['items'], len(PRODUCT_CATALOG) + ITEMS_PER_SCALE)
+        self.assertEqual(counts['inventory'], Inventory.objects.count())  # type: ignore[attribute-defined]
+        first = self.seeded_inventory()
+        reviews = list(Review.objects.order_by('store__name', 'id').values_list('store__name', 'rating'))  # type: ignore[attribute-defined]
+
+        pipeline.clear(['inventory', 'reviews'])
+        pipeline.run(['inventory', 'reviews'])
+        self.assertEqual(self.seeded_inventory(), first)
+        self.assertEqual(
+            list(Review.objects.order_by('store__name', 'id').values_list('store__name', 'rating')),  # type: ignore[attribute-defined]
+            reviews,
+        )
+
+        pipeline.clear(['inventory'])
+        SeedPipeline(scale=2, seed=8, min_items=5, max_items=10).run(['inventory'])
+        self.assertNotEqual(self.seeded_inventory(), first)